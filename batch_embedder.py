@@ -0,0 +1,287 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pathway import udfs
+from pathway.xpacks.llm.embedders import BaseEmbedder
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute, shared by all batches of an embedder,
+    including those of different Pathway worker threads and their event loops.
+
+    Attributes:
+        requests_per_minute (Optional[float]): Request limit; None for no limit.
+        tokens_per_minute (Optional[float]): Token limit; None for no limit.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Args:
+            requests_per_minute (Optional[float], optional): Request limit. Defaults to None.
+            tokens_per_minute (Optional[float], optional): Token limit. Defaults to None.
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute or 0.0
+        self._tokens = tokens_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        # takes the request from the buckets and returns 0, or returns the seconds to wait
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._paused_until - now)
+            if self.requests_per_minute and self._requests < 1:
+                wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+            if self.tokens_per_minute:
+                needed = min(tokens, self.tokens_per_minute)
+                if self._tokens < needed:
+                    wait = max(wait, (needed - self._tokens) * 60 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= min(tokens, self.tokens_per_minute)
+            return 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Waits until one request of `tokens` tokens fits in both limits and takes it from the buckets.
+
+        Args:
+            tokens (int): Tokens of the request; requests above the per-minute limit wait for a full bucket.
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds all requests for `seconds`, e.g. after the API answered 429 with a Retry-After.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _LoopState:
+    # batching state of one event loop; asyncio primitives cannot be shared between loops
+
+    def __init__(self, embedder: "BatchedOpenAIEmbedder"):
+        import openai
+
+        self.client = openai.AsyncOpenAI(api_key=embedder.api_key, base_url=embedder.base_url, max_retries=0)
+        self.in_flight = asyncio.Semaphore(embedder.max_in_flight)
+        # kwargs -> [(text, tokens, future), ...] waiting to be sent
+        self.pending: Dict[Tuple, List[Tuple[str, int, asyncio.Future]]] = {}
+        self.pending_tokens: Dict[Tuple, int] = {}
+        self.flush_handles: Dict[Tuple, asyncio.TimerHandle] = {}
+        self.tasks = set()
+
+
+class BatchedOpenAIEmbedder(BaseEmbedder):
+    """
+    OpenAI embedder that coalesces the chunks Pathway embeds concurrently into batched requests.
+
+    Pathway starts the asynchronous UDF for all rows of a commit at once. Each call queues its
+    text, and after `max_wait` seconds (or as soon as a batch is full) the queue is packed into
+    batches of at most `max_items` texts and `max_batch_tokens` tokens, which are sent with up to
+    `max_in_flight` requests outstanding and within the requests and tokens per minute limits. A
+    failed batch is retried with exponential backoff on its own, so the other batches' results
+    are kept; 429 answers pause all requests for their Retry-After time. Rows whose batch still
+    fails raise the error, like a failed `OpenAIEmbedder` call.
+
+    With several Pathway workers, the rate limits are shared by the threads of a process and
+    split evenly between the processes started by `pathway spawn`.
+
+    Use it with `cache_strategy=DiskCache()` as `OpenAIEmbedder`; cached texts are not sent. Do
+    not set `capacity`, which would limit the rows per batch.
+
+    Attributes:
+        max_items (int): Maximum number of texts per request (2048 for the OpenAI API).
+        max_batch_tokens (int): Maximum number of tokens per request.
+        max_in_flight (int): Maximum number of outstanding requests per event loop, i.e. per Pathway process.
+        max_wait (float): Seconds a text waits for other texts before its batch is sent.
+        max_retries (int): Retries of a failed batch.
+        stats (Dict[str, int]): Requests, texts, tokens, retries and failed batches so far.
+        limiter (RateLimiter): Rate limits of this process.
+    """
+
+    def __init__(self, *, model: Optional[str] = "text-embedding-ada-002", max_items: int = 512,
+                 max_batch_tokens: int = 100_000, max_in_flight: int = 4, requests_per_minute: Optional[float] = 3000,
+                 tokens_per_minute: Optional[float] = 1_000_000, max_wait: float = 0.05, max_retries: int = 6,
+                 api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 cache_strategy: Optional[udfs.CacheStrategy] = None, **openai_kwargs):
+        """
+        Args:
+            model (Optional[str], optional): Embedding model. Defaults to "text-embedding-ada-002".
+            max_items (int, optional): Maximum number of texts per request. Defaults to 512.
+            max_batch_tokens (int, optional): Maximum number of tokens per request. Defaults to 100000.
+            max_in_flight (int, optional): Maximum number of outstanding requests. Defaults to 4.
+            requests_per_minute (Optional[float], optional): Request rate limit; None for no limit. Defaults to 3000.
+            tokens_per_minute (Optional[float], optional): Token rate limit; None for no limit. Defaults to 1000000.
+            max_wait (float, optional): Seconds a text waits for others before its batch is sent. Defaults to 0.05.
+            max_retries (int, optional): Retries of a failed batch. Defaults to 6.
+            api_key (Optional[str], optional): OpenAI API key. Defaults to the OPENAI_API_KEY variable.
+            base_url (Optional[str], optional): API base URL. Defaults to the OPENAI_BASE_URL variable or OpenAI.
+            cache_strategy (Optional[udfs.CacheStrategy], optional): Cache of embeddings, e.g. `DiskCache()`.
+            **openai_kwargs: Other arguments of `embeddings.create`, e.g. `dimensions`.
+        """
+        super().__init__(executor=udfs.async_executor(), cache_strategy=cache_strategy)
+        self.kwargs = dict(openai_kwargs)
+        if model is not None:
+            self.kwargs["model"] = model
+        self.max_items = max_items
+        self.max_batch_tokens = max_batch_tokens
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.api_key = api_key
+        self.base_url = base_url
+        self.stats = {"requests": 0, "texts": 0, "tokens": 0, "retries": 0, "failed_batches": 0}
+        self._stats_lock = threading.Lock()
+        # one limiter for all worker threads; `pathway spawn` processes each get their share
+        processes = max(1, int(os.environ.get("PATHWAY_PROCESSES", "1")))
+        self.limiter = RateLimiter(
+            requests_per_minute / processes if requests_per_minute else None,
+            tokens_per_minute / processes if tokens_per_minute else None,
+        )
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            self._encoding = None
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Args:
+            text (str): A text to embed.
+
+        Returns:
+            int: Its number of tokens, or an upper estimate if tiktoken is not installed.
+        """
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return len(text) // 3 + 1
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self)
+        return state
+
+    def _count(self, **counts: int) -> None:
+        with self._stats_lock:
+            for name, count in counts.items():
+                self.stats[name] += count
+
+    async def __wrapped__(self, input, **kwargs) -> np.ndarray:
+        state = self._state()
+        loop = asyncio.get_running_loop()
+        key = tuple(sorted({**self.kwargs, **kwargs}.items()))
+        text = input or "."
+        tokens = self.count_tokens(text)
+        future = loop.create_future()
+        state.pending.setdefault(key, []).append((text, tokens, future))
+        state.pending_tokens[key] = state.pending_tokens.get(key, 0) + tokens
+
+        if len(state.pending[key]) >= self.max_items or state.pending_tokens[key] >= self.max_batch_tokens:
+            self._flush(state, key)
+        elif key not in state.flush_handles:
+            state.flush_handles[key] = loop.call_later(self.max_wait, self._flush, state, key)
+        return await future
+
+    def _flush(self, state: _LoopState, key: Tuple) -> None:
+        handle = state.flush_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+        pending = state.pending.pop(key, [])
+        state.pending_tokens.pop(key, None)
+        batch, batch_tokens = [], 0
+        for item in pending:
+            if batch and (len(batch) >= self.max_items or batch_tokens + item[1] > self.max_batch_tokens):
+                self._start(state, key, batch)
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += item[1]
+        if batch:
+            self._start(state, key, batch)
+
+    def _start(self, state: _LoopState, key: Tuple, batch: List) -> None:
+        task = asyncio.get_running_loop().create_task(self._send(state, dict(key), batch))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+    async def _send(self, state: _LoopState, kwargs: Dict, batch: List) -> None:
+        import openai
+
+        texts = [text for text, _, _ in batch]
+        tokens = sum(count for _, count, _ in batch)
+        async with state.in_flight:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(tokens)
+                try:
+                    response = await state.client.embeddings.create(input=texts, **kwargs)
+                except (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError) as e:
+                    if attempt == self.max_retries:
+                        self._fail(batch, e)
+                        return
+                    delay = min(60.0, 2 ** attempt) * (0.5 + random.random() / 2)
+                    if isinstance(e, openai.RateLimitError):
+                        retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+                        try:
+                            delay = max(delay, float(retry_after))
+                        except (TypeError, ValueError):
+                            pass
+                        self.limiter.pause(delay)
+                    self._count(retries=1)
+                    logger.info(f"BatchedOpenAIEmbedder: batch of {len(batch)} texts failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                except Exception as e:
+                    self._fail(batch, e)
+                    return
+                self._count(requests=1, texts=len(batch), tokens=tokens)
+                for item in response.data:
+                    future = batch[item.index][2]
+                    if not future.done():
+                        future.set_result(np.array(item.embedding))
+                missing = [item for item in batch if not item[2].done()]
+                if missing:
+                    self._fail(missing, ValueError(f"No embedding returned for {len(missing)} of {len(batch)} texts"))
+                return
+
+    def _fail(self, batch: List, error: Exception) -> None:
+        self._count(failed_batches=1)
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(error)
@@ -0,0 +1,131 @@
+"""
+Measures recall@k, query latency and peak memory of the vector index backends at several corpus sizes.
+
+    python -m benchmarks.bench_ann [--sizes 10000 50000] [--dimensions 256] [--backends usearch bruteforce lsh]
+                                   [--expansion-search 64 256] [--queries 200] [--k 5]
+
+Synthetic embeddings (normalized vectors around a few hundred cluster centres, like chunks of
+related documents) are indexed by Pathway with the factory built by `indexing.ann_factory`.
+Queries are then streamed into the running pipeline one at a time, and each is timed from
+submission until its answer arrives, as a question to the document server would be. Recall@k is
+measured against exact cosine search with numpy. Every configuration runs in its own process, so
+the reported peak RSS is that of one index (plus the corpus held by the benchmark itself).
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import threading
+import subprocess
+
+import numpy as np
+import pathway as pw
+
+from indexing import ann_factory
+
+
+def synthetic_embeddings(count: int, dimensions: int, seed: int, clusters: int = 256) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimensions))
+    vectors = centres[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+class QuerySubject(pw.io.python.ConnectorSubject):
+    """
+    Sends the queries one at a time and waits for each answer, recording the latency.
+    """
+
+    def __init__(self, queries: np.ndarray, answers: dict, answered: threading.Event):
+        super().__init__()
+        self.queries = queries
+        self.answers = answers
+        self.answered = answered
+        self.latencies = []
+
+    def ask(self, query_id: int) -> float:
+        self.answered.clear()
+        start = time.perf_counter()
+        self.next(query_id=query_id, vector=self.queries[query_id])
+        self.answered.wait()
+        return time.perf_counter() - start
+
+    def run(self):
+        # the first query waits until the corpus is indexed, so it is not timed
+        self.ask(0)
+        self.latencies = [self.ask(query_id) for query_id in range(1, len(self.queries))]
+
+
+def run_worker(config: dict) -> dict:
+    corpus = synthetic_embeddings(config["size"], config["dimensions"], seed=0)
+    queries = synthetic_embeddings(config["queries"] + 1, config["dimensions"], seed=1)
+
+    answers, answered = {}, threading.Event()
+    subject = QuerySubject(queries, answers, answered)
+    docs = pw.debug.table_from_rows(
+        pw.schema_from_types(doc_id=int, vector=np.ndarray), [(i, vector) for i, vector in enumerate(corpus)]
+    )
+    query_table = pw.io.python.read(subject, schema=pw.schema_from_types(query_id=int, vector=np.ndarray),
+                                    autocommit_duration_ms=1)
+    factory = ann_factory(backend=config["backend"], dimensions=config["dimensions"], reserved_space=config["size"],
+                          expansion_search=config["expansion_search"])
+    index = factory.build_index(docs.vector, docs)
+    results = index.query_as_of_now(query_table.vector, number_of_matches=config["k"]).select(pw.left.query_id, pw.right.doc_id)
+
+    def on_change(key, row, time, is_addition):
+        if is_addition:
+            answers[row["query_id"]] = list(row["doc_id"] or ())
+            answered.set()
+
+    start = time.perf_counter()
+    pw.io.subscribe(results, on_change=on_change)
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    elapsed = time.perf_counter() - start
+
+    exact = np.argsort(-(queries[1:] @ corpus.T), axis=1)[:, :config["k"]]
+    recall = np.mean([len(set(answers.get(i + 1, [])) & set(row)) / config["k"] for i, row in enumerate(exact)])
+    latencies = np.array(subject.latencies) * 1000
+    return {
+        **config,
+        "recall": recall,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "total_s": elapsed,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--backends", nargs="+", default=["usearch", "bruteforce"])
+    parser.add_argument("--expansion-search", type=int, nargs="+", default=[64, 256], help="usearch only")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    print("{:<11} {:>5} {:>8} {:>9} {:>9} {:>9} {:>9}".format("backend", "ef", "size", "recall@" + str(args.k), "p50 ms", "p95 ms", "RSS MB"))
+    for size in args.sizes:
+        for backend in args.backends:
+            for expansion_search in (args.expansion_search if backend == "usearch" else [0]):
+                config = {"backend": backend, "size": size, "dimensions": args.dimensions, "queries": args.queries,
+                          "k": args.k, "expansion_search": expansion_search}
+                output = subprocess.run([sys.executable, "-m", "benchmarks.bench_ann", "--worker", json.dumps(config)],
+                                        capture_output=True, text=True)
+                if output.returncode != 0:
+                    print("{:<11} {:>5} {:>8} failed: {}".format(backend, expansion_search or "-", size, output.stderr.strip().splitlines()[-1:]))
+                    continue
+                r = json.loads(output.stdout.strip().splitlines()[-1])
+                print("{:<11} {:>5} {:>8} {:>9.3f} {:>9.2f} {:>9.2f} {:>9.0f}".format(
+                    backend, expansion_search or "-", size, r["recall"], r["p50_ms"], r["p95_ms"], r["rss_mb"]))
+
+
+if __name__ == "__main__":
+    main()
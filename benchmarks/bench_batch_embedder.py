@@ -0,0 +1,151 @@
+"""
+Measures embedding throughput of OpenAIEmbedder (one request per chunk) against BatchedOpenAIEmbedder.
+
+    python -m benchmarks.bench_batch_embedder [--chunks 2000] [--latency 0.2] [--rpm 3000] [--tpm 1000000]
+                                              [--failure-rate 0.05] [--in-flight 1 4 8]
+
+A local stand-in of the OpenAI embeddings endpoint answers after `latency` seconds (plus a small
+per-text cost), enforces the requests and tokens per minute limits with 429 answers and a
+Retry-After header, and fails a share of the requests with 500 answers. Chunks of about 400
+tokens are embedded by a Pathway pipeline, without a cache, and every result is checked. The
+baseline sends `--capacity` requests at a time; unbounded, it exhausts its retries on 429s.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pathway as pw
+from pathway.xpacks.llm import embedders
+
+from batch_embedder import BatchedOpenAIEmbedder
+
+DIMENSIONS = 64
+
+
+def vector(text):
+    rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+    return rng.standard_normal(DIMENSIONS).round(4).tolist()
+
+
+class MockEmbeddings:
+    def __init__(self, latency, per_text, rpm, tpm, failure_rate):
+        self.latency, self.per_text, self.rpm, self.tpm, self.failure_rate = latency, per_text, rpm, tpm, failure_rate
+        self.lock = threading.Lock()
+        self.window = []  # (time, tokens) of the requests within the last minute
+        self.counts = {"requests": 0, "rate_limited": 0, "failed": 0}
+
+    def admit(self, tokens):
+        now = time.monotonic()
+        with self.lock:
+            self.window = [(t, n) for t, n in self.window if now - t < 60]
+            if (self.rpm and len(self.window) >= self.rpm) or (self.tpm and sum(n for _, n in self.window) + tokens > self.tpm):
+                self.counts["rate_limited"] += 1
+                return False
+            self.window.append((now, tokens))
+            self.counts["requests"] += 1
+            return True
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, payload, headers=()):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                texts = request["input"] if isinstance(request["input"], list) else [request["input"]]
+                tokens = sum(len(text) // 4 + 1 for text in texts)
+                if not mock.admit(tokens):
+                    return self.reply(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, [("Retry-After", "1")])
+                time.sleep(mock.latency + mock.per_text * len(texts))
+                if random.random() < mock.failure_rate:
+                    with mock.lock:
+                        mock.counts["failed"] += 1
+                    return self.reply(500, {"error": {"message": "Internal error", "type": "server_error"}})
+                self.reply(200, {
+                    "object": "list", "model": request.get("model", "mock"),
+                    "data": [{"object": "embedding", "index": i, "embedding": vector(text)} for i, text in enumerate(texts)],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                })
+
+        return Handler
+
+
+def chunks(count, seed=0):
+    rng = random.Random(seed)
+    words = ("revenue", "income", "segment", "margin", "liquidity", "capital", "fiscal", "growth", "risk", "services")
+    return [f"chunk {i}: " + " ".join(rng.choice(words) for _ in range(300)) for i in range(count)]
+
+
+def embed_all(embedder, texts):
+    pw.internals.parse_graph.G.clear()
+    table = pw.debug.table_from_rows(pw.schema_from_types(text=str), [(text,) for text in texts])
+    start = time.perf_counter()
+    frame = pw.debug.table_to_pandas(table.select(pw.this.text, embedding=embedder(pw.this.text)))
+    elapsed = time.perf_counter() - start
+    wrong = sum(1 for row in frame.itertuples() if row.embedding is None or not np.allclose(row.embedding, vector(row.text)))
+    return elapsed, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--per-text", type=float, default=0.0005, help="additional seconds per text")
+    parser.add_argument("--rpm", type=int, default=3000, help="requests per minute of the mock")
+    parser.add_argument("--tpm", type=int, default=1_000_000, help="tokens per minute of the mock")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--max-items", type=int, default=128)
+    parser.add_argument("--capacity", type=int, default=8, help="concurrent requests of the baseline")
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    mock = MockEmbeddings(args.latency, args.per_text, args.rpm, args.tpm, args.failure_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    texts = chunks(args.chunks)
+    print("{} chunks, {:.0f} ms per request, limits {} requests/min and {} tokens/min, {:.0%} failures".format(
+        len(texts), args.latency * 1000, args.rpm, args.tpm, args.failure_rate))
+
+    runs = []
+    if not args.skip_baseline:
+        runs.append(("OpenAIEmbedder", lambda: embedders.OpenAIEmbedder(
+            capacity=args.capacity, retry_strategy=pw.udfs.ExponentialBackoffRetryStrategy(max_retries=8, initial_delay=1000))))
+    for in_flight in args.in_flight:
+        runs.append((f"batched in_flight={in_flight}", lambda in_flight=in_flight: BatchedOpenAIEmbedder(
+            max_items=args.max_items, max_in_flight=in_flight, requests_per_minute=args.rpm, tokens_per_minute=args.tpm)))
+
+    for name, make in runs:
+        before = dict(mock.counts)
+        try:
+            elapsed, wrong = embed_all(make(), texts)
+        except Exception as e:
+            print("{:<22} failed: {}".format(name, type(e).__name__))
+            continue
+        counts = {key: mock.counts[key] - before[key] for key in mock.counts}
+        print("{:<22} {:>8.1f} chunks/s  {:>6.1f}s  requests={:<5} 429s={:<4} 500s={:<4} wrong={}".format(
+            name, len(texts) / elapsed, elapsed, counts["requests"], counts["rate_limited"], counts["failed"], wrong))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
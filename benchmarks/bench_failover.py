@@ -0,0 +1,106 @@
+"""
+Exercises SearchRouter against local stand-in Serper and SerpApi servers that inject failures and delays.
+
+    python -m benchmarks.bench_failover [--requests 10] [--timeout 1.0]
+
+Every scenario reports the mean search latency, which provider served the searches and the
+final health and breaker state of both providers. No API keys or network access are needed.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraper import ContentScraper, GoogleSerperAPI
+from search_provider import SearchRouter, SerperProvider, SerpApiProvider
+from serpapi import AsyncSerpApiClient
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # behaviour is read from the server: mode is "ok" or "fail", delay is in seconds
+
+    def reply(self, payload):
+        time.sleep(self.server.delay)
+        if self.server.mode == "fail":
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # Serper.dev: a JSON list of queries gets a list of results
+        queries = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if isinstance(queries, dict):
+            self.reply({"organic": [{"snippet": "serper snippet for " + queries["q"]}]})
+        else:
+            self.reply([{"organic": [{"snippet": "serper snippet for " + query["q"]}]} for query in queries])
+
+    def do_GET(self):
+        # SerpApi: an AI overview snippet is enough for a usable context
+        self.reply({"ai_overview": {"text_blocks": [{"snippet": "serpapi overview"}]}})
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(mode="ok", delay=0.0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.mode = mode
+    server.delay = delay
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_scenario(name, serper_server, serpapi_server, requests, timeout, latency_budget, race=False):
+    serper_server.mode, serper_server.delay = serper_server.scenario
+    serpapi_server.mode, serpapi_server.delay = serpapi_server.scenario
+    serper = GoogleSerperAPI("stand-in", base_url="http://127.0.0.1:{}".format(serper_server.server_port))
+    router = SearchRouter(
+        [SerperProvider(serper), SerpApiProvider(ContentScraper("stand-in"))],
+        timeout=timeout,
+        latency_budget=latency_budget,
+        reset_timeout=60,
+    )
+    served = {}
+    start = time.perf_counter()
+    for i in range(requests):
+        router.search(["query {} a".format(i), "query {} b".format(i)], race=race)
+        served[router.last_provider] = served.get(router.last_provider, 0) + 1
+    mean_ms = (time.perf_counter() - start) / requests * 1000
+    serper.close()
+
+    print("{:<28} {:>9.1f} ms  served by {}".format(name, mean_ms, served))
+    for provider, stats in router.stats().items():
+        p50 = "-" if stats["p50_latency"] is None else "{:.0f} ms".format(stats["p50_latency"] * 1000)
+        print("    {:<8} calls={:<3} error_rate={:.2f} p50={:<7} breaker={}".format(
+            provider, stats["calls"], stats["error_rate"], p50, stats["state"]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=1.0, help="router timeout per provider in seconds")
+    parser.add_argument("--latency-budget", type=float, default=0.4, help="median latency that demotes a provider")
+    args = parser.parse_args()
+
+    serper_server = start_server()
+    serpapi_server = start_server()
+    AsyncSerpApiClient.BACKEND = "http://127.0.0.1:{}".format(serpapi_server.server_port)
+
+    scenarios = [
+        ("healthy serper", ("ok", 0.05), ("ok", 0.2), False),
+        ("failing serper", ("fail", 0.05), ("ok", 0.2), False),
+        ("serper slower than timeout", ("ok", args.timeout * 2), ("ok", 0.2), False),
+        ("slow serper", ("ok", 0.5), ("ok", 0.2), False),
+        ("slow serper, raced", ("ok", 0.5), ("ok", 0.2), True),
+    ]
+    for name, serper_scenario, serpapi_scenario, race in scenarios:
+        serper_server.scenario = serper_scenario
+        serpapi_server.scenario = serpapi_scenario
+        run_scenario(name, serper_server, serpapi_server, args.requests, args.timeout, args.latency_budget, race)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Compares the recall of dense, BM25 and hybrid retrieval on a synthetic financial corpus, offline.
+
+    python -m benchmarks.bench_hybrid_recall [--companies 40] [--k 1 3 5] [--bm25-weight 1] [--vector-weight 1]
+
+Every document is one statement of a company's metric for a fiscal year, e.g. "Apple Inc (AAPL)
+reported net sales of $383,285 million for fiscal 2023, see Item 7 of the Form 10-K".
+Two kinds of questions are asked, each with exactly one relevant document:
+
+    exact       "AAPL net sales 2023": tickers, years and figures, as in analyst queries
+    paraphrase  "how much did Apple Inc sell in 2023": no ticker, the metric in other words
+
+The stand-in embedder maps words to concepts (so "sell" is close to "net sales") but, like real
+embedding models, blurs tickers and numbers. The indexes are Pathway's usearch and tantivy
+indexes, run in-process; the hybrid index is the WeightedHybridIndexFactory used by main.py.
+"""
+import re
+import zlib
+import random
+import argparse
+
+import numpy as np
+import pathway as pw
+from pathway.internals.parse_graph import G
+from pathway.stdlib.indexing import TantivyBM25Factory, UsearchKnnFactory
+
+from indexing import WeightedHybridIndexFactory
+
+DIMENSIONS = 256
+YEARS = (2021, 2022, 2023)
+# metric -> (phrase in the filings, words a user would use instead)
+METRICS = {
+    "revenue": ("net sales", "how much did {company} sell"),
+    "income": ("net income", "what profit did {company} make"),
+    "margin": ("gross margin", "how large was the markup of {company} on its products"),
+    "cash": ("cash and cash equivalents", "how much money did {company} hold at the bank"),
+    "debt": ("long-term debt", "what do {company} owe to lenders over many years"),
+    "rnd": ("research and development expenses", "how much did {company} spend on innovation labs"),
+}
+CONCEPTS = {
+    "revenue": {"sales", "sell", "sold", "revenue"},
+    "income": {"income", "profit", "earnings", "make"},
+    "margin": {"margin", "markup"},
+    "cash": {"cash", "equivalents", "money", "bank"},
+    "debt": {"debt", "owe", "lenders", "borrowings"},
+    "rnd": {"research", "development", "innovation", "labs"},
+}
+WORD_CONCEPT = {word: concept for concept, words in CONCEPTS.items() for word in words}
+NAMES = ("Apex", "Birch", "Cobalt", "Delta", "Ember", "Falcon", "Granite", "Harbor", "Iris", "Juniper",
+         "Keystone", "Lumen", "Meridian", "Nimbus", "Orion", "Pinnacle", "Quartz", "Redwood", "Summit", "Tidal")
+SUFFIXES = ("Inc", "Corp", "Holdings", "Group")
+
+
+def bucket(token: str) -> int:
+    return zlib.crc32(token.encode()) % DIMENSIONS
+
+
+@pw.udf(deterministic=True)
+def embed(text: str) -> np.ndarray:
+    # concepts and names are embedded, tickers (all caps), numbers and filler words are blurred away
+    vector = np.zeros(DIMENSIONS)
+    for word in re.findall(r"[A-Za-z]+", text):
+        if word.isupper() and len(word) > 1:
+            continue
+        concept = WORD_CONCEPT.get(word.lower())
+        if concept:
+            vector[bucket("concept:" + concept)] += 2.0
+        elif word[0].isupper():
+            vector[bucket("name:" + word.lower())] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def synthetic_corpus(companies: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = [f"{a} {b}" for a in NAMES for b in NAMES if a != b]
+    rng.shuffle(names)
+    docs, queries = [], []
+    tickers = set()
+    for name in names[:companies]:
+        company = f"{name} {rng.choice(SUFFIXES)}"
+        ticker = "".join(word[0] for word in name.split()) + rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        while ticker in tickers:
+            ticker = ticker[:-1] + rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        tickers.add(ticker)
+        for metric, (phrase, paraphrase) in METRICS.items():
+            for year in YEARS:
+                value = "{:,}".format(rng.randint(1000, 400000))
+                doc_id = len(docs)
+                docs.append(f"{company} ({ticker}) reported {phrase} of ${value} million for fiscal {year}, "
+                            f"see Item {rng.choice(('7', '7A', '8'))} of the Form 10-K.")
+                queries.append(("exact", f"{ticker} {phrase} {year}", doc_id))
+                queries.append(("paraphrase", paraphrase.format(company=company) + f" in {year}", doc_id))
+    return docs, queries
+
+
+def retrieve(factory, docs, queries, k):
+    G.clear()
+    doc_table = pw.debug.table_from_rows(pw.schema_from_types(doc_id=int, text=str), [(i, text) for i, text in enumerate(docs)])
+    query_table = pw.debug.table_from_rows(pw.schema_from_types(query_id=int, query=str), [(i, q) for i, (_, q, _) in enumerate(queries)])
+    index = factory.build_index(doc_table.text, doc_table)
+    results = index.query_as_of_now(query_table.query, number_of_matches=k).select(pw.left.query_id, pw.right.doc_id)
+    frame = pw.debug.table_to_pandas(results)
+    return {row.query_id: list(row.doc_id or ()) for row in frame.itertuples()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=40)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--bm25-weight", type=float, default=1.0)
+    parser.add_argument("--vector-weight", type=float, default=1.0)
+    parser.add_argument("--candidates", type=int, default=2)
+    args = parser.parse_args()
+
+    docs, queries = synthetic_corpus(args.companies)
+    print("{} documents, {} queries".format(len(docs), len(queries)))
+    systems = {
+        "dense": lambda: UsearchKnnFactory(dimensions=DIMENSIONS, embedder=embed),
+        "bm25": lambda: TantivyBM25Factory(),
+        "hybrid": lambda: WeightedHybridIndexFactory(
+            [TantivyBM25Factory(), UsearchKnnFactory(dimensions=DIMENSIONS, embedder=embed)],
+            [args.bm25_weight, args.vector_weight], candidates=args.candidates),
+    }
+    kinds = sorted({kind for kind, _, _ in queries})
+    print("{:<8} {:<11}".format("index", "queries") + "".join("  recall@{:<3}".format(k) for k in args.k) + "     MRR")
+    for name, factory in systems.items():
+        found = retrieve(factory(), docs, queries, max(args.k))
+        for kind in kinds + ["all"]:
+            selected = [(i, doc_id) for i, (q_kind, _, doc_id) in enumerate(queries) if kind in ("all", q_kind)]
+            recalls = [np.mean([doc_id in found.get(i, [])[:k] for i, doc_id in selected]) for k in args.k]
+            mrr = np.mean([1 / (found[i].index(doc_id) + 1) if doc_id in found.get(i, []) else 0.0 for i, doc_id in selected])
+            print("{:<8} {:<11}".format(name, kind) + "".join("  {:>9.3f}".format(r) for r in recalls) + "  {:>6.3f}".format(mrr))
+
+
+if __name__ == "__main__":
+    main()
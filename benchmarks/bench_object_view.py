@@ -0,0 +1,54 @@
+"""
+Compares SerpApiClient.make_pyobj with the lazy ObjectView returned by get_object.
+
+    python -m benchmarks.bench_object_view [--response recorded.json] [--repeat 50]
+"""
+import argparse
+import time
+import tracemalloc
+
+from serpapi import SerpApiClient, ObjectView
+from benchmarks.serp_fixture import load_response
+
+def touch_fields(obj):
+    # the fields ContentScraper and typical callers read
+    obj.knowledge_graph.description
+    for question in obj.related_questions:
+        question.link
+    for result in obj.organic_results:
+        result.link
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--response", help="recorded SerpApi JSON response (default: synthetic large response)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    node = load_response(args.response)
+    client = SerpApiClient({}, engine="google")
+
+    cases = {
+        "make_pyobj": lambda: client.make_pyobj("response", node),
+        "ObjectView": lambda: ObjectView(node),
+        "make_pyobj + access": lambda: touch_fields(client.make_pyobj("response", node)),
+        "ObjectView + access": lambda: touch_fields(ObjectView(node)),
+    }
+    print("{:<22} {:>12} {:>14}".format("case", "ms / call", "peak KiB"))
+    for name, fn in cases.items():
+        print("{:<22} {:>12.3f} {:>14.1f}".format(name, timed(fn, args.repeat), peak_memory(fn)))
+
+if __name__ == "__main__":
+    main()
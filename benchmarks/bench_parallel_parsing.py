@@ -0,0 +1,107 @@
+"""
+Measures the throughput of the parallel parsing stage versus the number of worker processes.
+
+    python -m benchmarks.bench_parallel_parsing [--documents 8] [--pages 40] [--workers 1 2 4] [--table-latency 0.5]
+
+A synthetic corpus of report-like PDFs (paragraphs of text, every fifth page with a ruled table)
+is generated with PyMuPDF. It is first inspected by PageInspector alone, the CPU-bound part of
+CachedOpenParse, and then parsed end to end by CachedOpenParse without a parse cache. OpenParse
+and its LLM are replaced by a stand-in table parser that renders the page (CPU work) and waits
+`--table-latency` seconds (the LLM call), so no API key is needed.
+"""
+import os
+import argparse
+import random
+import time
+
+import fitz
+
+from pdf_parsing import CachedOpenParse, PageInspector, TableParser
+
+WORDS = ("revenue", "income", "quarter", "segment", "operating", "margin", "growth", "risk",
+         "liquidity", "capital", "expenses", "fiscal", "net", "sales", "services", "products")
+
+def draw_table(page, rng, top=420, rows=8, cols=5):
+    left, width, height = 60, 480, 22
+    for r in range(rows + 1):
+        page.draw_line((left, top + r * height), (left + width, top + r * height))
+    for c in range(cols + 1):
+        x = left + c * width / cols
+        page.draw_line((x, top), (x, top + rows * height))
+    for r in range(rows):
+        for c in range(cols):
+            value = rng.choice(WORDS) if c == 0 else "{:,}".format(rng.randint(100, 99999))
+            page.insert_text((left + c * width / cols + 4, top + r * height + 15), value, fontsize=9)
+
+def synthetic_pdf(pages, seed):
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        text = "\n".join(" ".join(rng.choice(WORDS) for _ in range(14)) for _ in range(30))
+        page.insert_textbox(fitz.Rect(60, 60, 540, 400 if number % 5 == 0 else 780), text, fontsize=9)
+        if number % 5 == 0:
+            draw_table(page, rng)
+    contents = doc.tobytes()
+    doc.close()
+    return contents
+
+class StandInTableParser(TableParser):
+    """
+    Table parser with the cost profile of OpenParse: a page render and an LLM round trip.
+    """
+
+    def __init__(self, latency):
+        super().__init__(table_args={"stand_in": True, "latency": latency})
+        self.latency = latency
+
+    def parse(self, pdf):
+        with fitz.open(stream=pdf, filetype="pdf") as doc:
+            pixmap = doc[0].get_pixmap(dpi=150)
+            text = doc[0].get_text()
+        time.sleep(self.latency)
+        return [[text, {"width": pixmap.width}]]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=40, help="pages per document")
+    parser.add_argument("--pages-per-range", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--table-latency", type=float, default=0.5, help="seconds of the stand-in LLM call per table page")
+    args = parser.parse_args()
+
+    corpus = [synthetic_pdf(args.pages, seed) for seed in range(args.documents)]
+    total = args.documents * args.pages
+    print("{} documents, {} pages, {} CPUs".format(args.documents, total, os.cpu_count()))
+
+    print("page inspection")
+    baseline = None
+    for workers in args.workers:
+        inspector = PageInspector(workers, args.pages_per_range)
+        # start the worker processes outside of the measurement
+        inspector.inspect(corpus[0])
+        start = time.perf_counter()
+        tables = sum(page["tables"] for contents in corpus for page in inspector.inspect(contents))
+        elapsed = time.perf_counter() - start
+        inspector.close()
+        rate = total / elapsed
+        baseline = baseline or rate
+        print("workers={:<3} {:>8.1f} pages/s  speedup {:>4.2f}x  ({} tables found)".format(workers, rate, rate / baseline, tables))
+
+    print("end-to-end parsing (table latency {}s)".format(args.table_latency))
+    baseline = None
+    for workers in args.workers:
+        parser = CachedOpenParse(cache_dir=None, workers=workers, pages_per_range=args.pages_per_range,
+                                 table_parser=StandInTableParser(args.table_latency))
+        parser.__wrapped__(corpus[0])
+        start = time.perf_counter()
+        chunks = sum(len(parser.__wrapped__(contents)) for contents in corpus)
+        elapsed = time.perf_counter() - start
+        parser.inspector.close()
+        rate = total / elapsed
+        baseline = baseline or rate
+        print("workers={:<3} {:>8.1f} pages/s  speedup {:>4.2f}x  ({} chunks)".format(workers, rate, rate / baseline, chunks))
+
+if __name__ == "__main__":
+    main()
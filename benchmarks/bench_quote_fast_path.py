@@ -0,0 +1,69 @@
+"""
+Measures the latency of quote questions answered by `QuoteFastPath`.
+
+    python -m benchmarks.bench_quote_fast_path [--questions 5000] [--tickers 20] [--search-ms 1500] [--ttl 30]
+
+A stand-in `get_stock_price` answers after `--search-ms`, like a SERP API search. Questions are
+drawn from quote templates over `--tickers` companies (a skewed mix, as in real traffic) and
+from analytical questions that must fall through to the pipeline. The first question about a
+ticker pays one search; the others within the TTL are served from the cache.
+"""
+import time
+import random
+import argparse
+
+import numpy as np
+
+from quote_fast_path import DEFAULT_ALIASES, QuoteFastPath
+
+TEMPLATES = ("what is {} trading at?", "What's the price of {} stock today?", "{} stock price", "how much is {} worth",
+             "quote for {}", "What is the current share price of {}?")
+OTHER = ("Why did {} stock fall after the last earnings call?", "Compare the revenue growth of {} and its peers",
+         "What are the main risk factors in the latest 10-K of {}?")
+
+
+class StandInScraper:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.searches = 0
+
+    def get_stock_price(self, query):
+        self.searches += 1
+        time.sleep(self.seconds)
+        return [f"According to NASDAQ, the stock price is USD {random.uniform(10, 500):.2f} for {query.split()[0]}."]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--search-ms", type=float, default=1500.0)
+    parser.add_argument("--ttl", type=float, default=30.0)
+    parser.add_argument("--quote-share", type=float, default=0.6, help="share of quote questions")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    companies = sorted(set(DEFAULT_ALIASES))[:args.tickers]
+    weights = [1 / (rank + 1) for rank in range(len(companies))]
+    scraper = StandInScraper(args.search_ms / 1000)
+    fast_path = QuoteFastPath(scraper, ttl=args.ttl)
+
+    latencies = {"quote": [], "fall through": []}
+    for _ in range(args.questions):
+        company = rng.choices(companies, weights)[0]
+        quote = rng.random() < args.quote_share
+        question = rng.choice(TEMPLATES if quote else OTHER).format(company)
+        start = time.perf_counter()
+        answer = fast_path.answer(question)
+        latencies["quote" if answer else "fall through"].append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.questions} questions, {len(companies)} companies, {args.search_ms:.0f} ms per search, TTL {args.ttl:.0f}s")
+    for name, values in latencies.items():
+        if values:
+            print("{:<13} {:>6} questions  p50 {:>8.3f} ms  p99 {:>9.3f} ms  max {:>9.1f} ms".format(
+                name, len(values), np.percentile(values, 50), np.percentile(values, 99), max(values)))
+    print("searches:", scraper.searches, fast_path.metrics())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares the get_dict decode path with selective-key decoding of SerpApi responses.
+
+    python -m benchmarks.bench_selective_decode [--response recorded.json] [--repeat 50]
+
+The streaming case needs ijson, the fast decoder case needs orjson; missing ones are skipped.
+"""
+import argparse
+import io
+import json
+import time
+
+from serpapi import selective_decode
+from benchmarks.serp_fixture import load_raw_response
+from scraper import ContentScraper
+
+def get_dict_path(body, keys):
+    # response.text -> json.loads -> dict() copy, as in SerpApiClient.get_dict
+    store = dict(json.loads(body.decode("utf-8")))
+    return {key: store[key] for key in keys if key in store}
+
+def decode_keys_json(body, keys):
+    orjson = selective_decode.orjson
+    selective_decode.orjson = None
+    try:
+        return selective_decode.decode_keys(body, keys)
+    finally:
+        selective_decode.orjson = orjson
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--response", help="recorded SerpApi JSON response (default: synthetic large response)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    body = load_raw_response(args.response)
+    print("response size: {:.1f} KiB".format(len(body) / 1024))
+
+    cases = {"get_dict": get_dict_path, "decode_keys (json)": decode_keys_json}
+    if selective_decode.orjson is not None:
+        cases["decode_keys (orjson)"] = selective_decode.decode_keys
+    if selective_decode.ijson is not None:
+        cases["stream_decode_keys (ijson)"] = lambda body, keys: selective_decode.stream_decode_keys(io.BytesIO(body), keys)
+
+    for label, keys in (("search_google", ContentScraper.SEARCH_KEYS), ("get_stock_price", ContentScraper.STOCK_KEYS)):
+        expected = get_dict_path(body, keys)
+        print("\n{} keys: {}".format(label, ", ".join(keys)))
+        print("{:<28} {:>10}".format("case", "ms / call"))
+        for name, fn in cases.items():
+            assert fn(body, keys) == expected, name
+            print("{:<28} {:>10.3f}".format(name, timed(lambda: fn(body, keys), args.repeat)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Measures ingestion throughput of the indexing pipeline against the number of Pathway workers.
+
+    python -m benchmarks.bench_workers [--documents 200] [--threads 1 2 4 8] [--processes 1 2 4]
+                                       [--parse-ms 20] [--embed-ms 200] [--in-flight 4]
+
+Synthetic documents go through the stages of `index_server.py` with stand-ins for the costly
+calls: a CPU-bound Python parser (`--parse-ms` of tokenizing and hashing per document), a
+splitter into chunks of 300 words, deduplication of the chunks by hash, and an asynchronous embedder that answers
+after `--embed-ms` with `--in-flight` requests outstanding per process, like batched OpenAI
+requests. Every configuration runs in fresh processes,
+started with `pathway spawn --threads T --processes P`, and the time from start until all chunks
+are embedded is reported.
+
+The Python UDFs of a process share its interpreter (and the asynchronous ones its event loop),
+so threads only split the Rust-side work (grouping, joins, indexing); parsing and embedding scale
+with the number of processes, each with its own interpreter and embedding requests.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import asyncio
+import hashlib
+import argparse
+import subprocess
+
+import pathway as pw
+
+from dedup_store import chunk_hash
+from passages import tokenize
+
+WORDS = ("revenue", "income", "segment", "margin", "liquidity", "capital", "fiscal", "growth", "risk", "services",
+         "dividend", "guidance", "operating", "cash", "flow", "quarter", "expenses", "assets", "debt", "equity")
+
+
+def documents(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    boilerplate = "Forward-looking statements involve risks and uncertainties. " * 20
+    return [(f"doc {i}: " + " ".join(rng.choice(WORDS) for _ in range(3000)) + " " + boilerplate,) for i in range(count)]
+
+
+def run_worker(config: dict) -> dict:
+    parse_seconds = config["parse_ms"] / 1000
+    embed_seconds = config["embed_ms"] / 1000
+
+    @pw.udf(deterministic=True)
+    def parse(text: str) -> str:
+        # stand-in of OpenParse: CPU-bound Python work for about parse_ms per document
+        deadline = time.perf_counter() + parse_seconds
+        digest = b""
+        while time.perf_counter() < deadline:
+            digest = hashlib.sha1(digest + " ".join(tokenize(text[:2000])).encode()).digest()
+        return text
+
+    # like BatchedOpenAIEmbedder, each process keeps at most `in_flight` requests outstanding
+    @pw.udf(executor=pw.udfs.async_executor(capacity=config["in_flight"]))
+    async def embed(text: str) -> float:
+        await asyncio.sleep(embed_seconds)
+        return float(zlib.crc32(text.encode()) % 997)
+
+    @pw.udf(deterministic=True)
+    def split(text: str) -> list:
+        words = text.split()
+        return [" ".join(words[i:i + 300]) for i in range(0, len(words), 300)]
+
+    docs = pw.debug.table_from_rows(pw.schema_from_types(text=str), documents(config["documents"]))
+    parsed = docs.select(text=parse(pw.this.text))
+    chunks = parsed.select(text=split(pw.this.text)).flatten(pw.this.text)
+    unique = chunks.with_columns(hash=pw.apply_with_type(chunk_hash, str, pw.this.text)).groupby(pw.this.hash).reduce(
+        text=pw.reducers.min(pw.this.text)
+    )
+    embedded = unique.select(embedding=embed(pw.this.text))
+    # the checksum uses the embeddings (one number per chunk), so they cannot be skipped
+    stats = embedded.reduce(chunks=pw.reducers.count(), checksum=pw.reducers.sum(pw.this.embedding))
+
+    results = {}
+    pw.io.subscribe(stats, on_change=lambda key, row, time, is_addition: is_addition and results.update(row))
+    start = time.perf_counter()
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE)
+    return {"seconds": time.perf_counter() - start, "chunks": results.get("chunks", 0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--parse-ms", type=float, default=20.0, help="CPU time of parsing one document")
+    parser.add_argument("--embed-ms", type=float, default=200.0, help="latency of one embedding request")
+    parser.add_argument("--in-flight", type=int, default=4, help="outstanding embedding requests per worker")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(json.loads(args.worker))
+        # every process prints its own timing; the parent keeps the slowest
+        print(json.dumps(result))
+        return
+
+    print("{} documents, {:.0f} ms parsing per document, {:.0f} ms per embedding, {} CPUs".format(
+        args.documents, args.parse_ms, args.embed_ms, os.cpu_count()))
+    print("{:>9} {:>7} {:>8} {:>9} {:>8} {:>8}".format("processes", "threads", "workers", "seconds", "docs/s", "speedup"))
+    baseline = None
+    for processes in args.processes:
+        for threads in args.threads:
+            config = {"documents": args.documents, "parse_ms": args.parse_ms, "embed_ms": args.embed_ms,
+                      "in_flight": args.in_flight}
+            command = [sys.executable, "-m", "pathway", "spawn", "--threads", str(threads), "--processes", str(processes),
+                       sys.executable, "-m", "benchmarks.bench_workers", "--worker", json.dumps(config)]
+            try:
+                output = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+            except subprocess.TimeoutExpired:
+                print("{:>9} {:>7} {:>8} timed out".format(processes, threads, processes * threads))
+                continue
+            lines = [line for line in output.stdout.splitlines() if line.startswith("{")]
+            if output.returncode != 0 or not lines:
+                print("{:>9} {:>7} {:>8} failed: {}".format(processes, threads, processes * threads, [
+                    line for line in output.stderr.splitlines() if "Error" in line][-1:]))
+                continue
+            seconds = max(json.loads(line)["seconds"] for line in lines)
+            baseline = baseline or seconds
+            print("{:>9} {:>7} {:>8} {:>9.2f} {:>8.1f} {:>7.1f}x".format(
+                processes, threads, processes * threads, seconds, args.documents / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import random
+
+def load_response(path = None, seed = 0):
+    """
+    Loads a recorded SerpApi response, or builds a synthetic one with the same shape.
+
+    Args:
+        path (str, optional): Path to a JSON file saved from `get_raw_json()`. If not provided,
+            a large synthetic Google/Google Finance response is generated.
+        seed (int, optional): Seed for the synthetic response. Defaults to 0.
+
+    Returns:
+        dict: The parsed response.
+    """
+    if path:
+        with open(path) as f:
+            return json.load(f)
+    return synthetic_response(seed=seed)
+
+def load_raw_response(path = None, seed = 0):
+    """
+    Same as `load_response`, but returns the response body as bytes.
+    """
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    return json.dumps(synthetic_response(seed=seed)).encode()
+
+def synthetic_response(organic_results = 100, related_questions = 8, seed = 0):
+    """
+    Builds a synthetic response shaped like a large SerpApi Google result page.
+
+    Args:
+        organic_results (int, optional): Number of organic results. Defaults to 100.
+        related_questions (int, optional): Number of related questions. Defaults to 8.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: The synthetic response.
+    """
+    rng = random.Random(seed)
+    words = ["revenue", "margin", "guidance", "quarter", "filing", "segment", "cash", "flow",
+             "dividend", "growth", "operating", "income", "shares", "market", "analyst", "forecast"]
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    def link(i):
+        return "https://www.example{}.com/{}/{}".format(i % 37, text(2).replace(" ", "-"), i)
+
+    response = {
+        "search_metadata": {"id": "6578a1b2c3d4e5f6", "status": "Success", "created_at": "2024-12-01 10:00:00 UTC",
+                            "processed_at": "2024-12-01 10:00:00 UTC", "total_time_taken": 1.93,
+                            "json_endpoint": "https://serpapi.com/searches/6578a1b2c3d4e5f6.json"},
+        "search_parameters": {"engine": "google", "q": "AAPL stock price", "google_domain": "google.com",
+                              "hl": "en", "gl": "us", "device": "desktop", "num": str(organic_results)},
+        "search_information": {"organic_results_state": "Results for exact spelling", "total_results": 412000000,
+                               "time_taken_displayed": 0.41, "query_displayed": "AAPL stock price"},
+        "answer_box": {"type": "finance_results", "title": "Apple Inc", "exchange": "NASDAQ", "stock": "AAPL",
+                       "currency": "USD", "price": 242.84, "previous_close": 239.59,
+                       "price_movement": {"percentage": 1.36, "value": 3.25, "movement": "Up"},
+                       "table": [{"name": text(1), "value": str(rng.random())} for _ in range(12)],
+                       "list": [text(10) for _ in range(5)]},
+        "knowledge_graph": {"title": "Apple Inc.", "type": "Technology company", "description": text(60),
+                            "source": {"name": "Wikipedia", "link": link(0)},
+                            "stock_price": "242.84 USD", "founded": "April 1, 1976",
+                            "profiles": [{"name": text(1), "link": link(i)} for i in range(6)],
+                            "people_also_search_for": [{"name": text(2), "link": link(i), "image": link(i)}
+                                                       for i in range(10)]},
+        "ai_overview": {"text_blocks": [{"type": "paragraph", "snippet": text(40),
+                                         "list": [{"title": text(3), "snippet": text(25)} for _ in range(4)]}
+                                        for _ in range(6)]},
+        "related_questions": [{"question": text(8) + "?", "snippet": text(45), "title": text(6),
+                               "link": link(i), "displayed_link": link(i), "next_page_token": "x" * 120}
+                              for i in range(related_questions)],
+        "top_stories": [{"title": text(9), "link": link(i), "source": text(1), "date": "2 hours ago",
+                         "thumbnail": "data:image/jpeg;base64," + "A" * 600} for i in range(10)],
+        "inline_images": [{"link": link(i), "source": link(i), "title": text(5),
+                           "thumbnail": "data:image/jpeg;base64," + "B" * 900} for i in range(20)],
+        "organic_results": [],
+        "related_searches": [{"query": text(4), "link": link(i)} for i in range(8)],
+        "pagination": {"current": 1, "next": link(999), "other_pages": {str(i): link(i) for i in range(2, 11)}},
+        "serpapi_pagination": {"current": 1, "next_link": link(998), "next": link(997)},
+    }
+    for i in range(organic_results):
+        response["organic_results"].append({
+            "position": i + 1, "title": text(8), "link": link(i), "redirect_link": link(i + 1000),
+            "displayed_link": link(i), "snippet": text(35), "snippet_highlighted_words": [text(1), text(2)],
+            "sitelinks": {"inline": [{"title": text(2), "link": link(i * 10 + j)} for j in range(4)]},
+            "rich_snippet": {"top": {"detected_extensions": {"rating": round(rng.random() * 5, 1)},
+                                     "extensions": [text(2), text(3)]}},
+            "about_this_result": {"source": {"description": text(30), "icon": link(i)}},
+            "cached_page_link": link(i + 2000), "source": text(1),
+        })
+    return response
@@ -0,0 +1,277 @@
+import re
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+GLOB_CHARS = re.compile(r"[*?\[]")
+
+# Rank constant of the reciprocal rank fusion across collections, as in Pathway's hybrid index
+RRF_K = 60
+
+
+class Collection:
+    """
+    A named document collection served by its own document server.
+
+    Attributes:
+        name (str): Name of the collection.
+        client (RAGClient): Client of the collection's server.
+        path (Optional[str]): Folder of the collection's documents, used to route path filters.
+        keywords (List[str]): Lowercased words and phrases (client names, tickers, filing types)
+            that route a question to the collection.
+        always (bool): Whether every routed question also searches this collection.
+    """
+
+    def __init__(self, name: str, client, path: Optional[str] = None, keywords: Iterable[str] = (), always: bool = False):
+        """
+        Args:
+            name (str): Name of the collection.
+            client (RAGClient): Client of the collection's server.
+            path (Optional[str], optional): Folder of the documents. Defaults to None.
+            keywords (Iterable[str], optional): Words and phrases routing a question here. Defaults to ().
+            always (bool, optional): Search this collection for every routed question, e.g. the web
+                result cache. Defaults to False.
+        """
+        self.name = name
+        self.client = client
+        self.path = normalize_path(path) if path else None
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.always = always
+        self._patterns = [re.compile(r"(?<!\w)" + re.escape(keyword) + r"(?!\w)") for keyword in self.keywords]
+
+    def keyword_score(self, query: str) -> int:
+        """
+        Args:
+            query (str): The question.
+
+        Returns:
+            int: Number of the collection's keywords found in the question as whole words.
+        """
+        query = query.lower()
+        return sum(1 for pattern in self._patterns if pattern.search(query))
+
+
+def normalize_path(path: str) -> str:
+    # "./data/acme" and "data/acme/" name the same folder
+    path = path.replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.rstrip("/") + "/"
+
+
+class QueryRouter:
+    """
+    Picks the collections a retrieval is sent to.
+
+    A file path glob or a metadata filter naming collections (by name or folder) routes to those
+    collections only. Otherwise a keyword classifier routes the question to every collection
+    whose keywords it mentions, so a question comparing two clients searches both; a question
+    matching no collection is fanned out to all of them. Collections marked `always` are added to
+    classified questions.
+
+    Attributes:
+        collections (Dict[str, Collection]): The collections by name.
+    """
+
+    def __init__(self, collections: Sequence[Collection]):
+        """
+        Args:
+            collections (Sequence[Collection]): The collections.
+        """
+        self.collections = {collection.name: collection for collection in collections}
+
+    def route(self, query: str, metadata_filter: Optional[str] = None,
+              filepath_globpattern: Optional[str] = None) -> List[str]:
+        """
+        Args:
+            query (str): The question.
+            metadata_filter (Optional[str], optional): JMESPath metadata filter. Defaults to None.
+            filepath_globpattern (Optional[str], optional): Glob pattern of file paths. Defaults to None.
+
+        Returns:
+            List[str]: Names of the collections to search, in configuration order.
+        """
+        prefix = GLOB_CHARS.split(filepath_globpattern or "", 1)[0]
+        if prefix:
+            # the collections whose folder contains, or lies within, the fixed part of the glob
+            fixed = normalize_path(prefix)
+            prefix = fixed if prefix.endswith("/") else fixed[:-1]  # "data/acm*" matches data/acme/
+            names = [name for name, collection in self.collections.items()
+                     if collection.path and (collection.path.startswith(prefix) or prefix.startswith(collection.path))]
+            if names:
+                return names
+        if metadata_filter:
+            literals = set(re.findall(r"[`'\"]([^`'\"]+)[`'\"]", metadata_filter))
+            names = [name for name, collection in self.collections.items()
+                     if name in literals or (collection.path and any(normalize_path(literal) == collection.path for literal in literals))]
+            if names:
+                return names
+
+        scores = {name: collection.keyword_score(query) for name, collection in self.collections.items()}
+        names = [name for name, score in scores.items() if score > 0]
+        if not names:
+            return list(self.collections)
+        return [name for name, collection in self.collections.items() if name in names or collection.always]
+
+
+class ShardedRAGClient:
+    """
+    One retrieval API over several collections, each indexed and served separately.
+
+    `retrieve` routes the question with a `QueryRouter` (or to the collections given), queries
+    the routed collections' servers in parallel, and merges their results with reciprocal rank
+    fusion: the hybrid `dist` is a rank-based score relative to its own collection and cannot be
+    compared across collections, so a chunk scores 1 / (`RRF_K` + rank) in every collection that
+    returned it, and ties are broken by `dist`. Chunks returned by several collections are kept
+    once. The documents keep the `dist` of their own collection, so rank them by their position
+    in the list, as `ContextSelector` does. Every document gets the name of its collection under `collection`. A collection whose
+    server fails is skipped with a warning, unless all fail.
+
+    `statistics` sums the file and chunk counts of the collections (all of them, or those a
+    question is routed to, see `route`) and reports the latest modification and indexing time,
+    so `CachedRAGClient` and `wait_until_ready` work unchanged.
+
+    Attributes:
+        collections (Dict[str, Collection]): The collections by name.
+        router (QueryRouter): Picks the collections of a retrieval.
+        counts (Dict[str, int]): Retrievals, collections queried, fan-outs and failed collection queries.
+    """
+
+    def __init__(self, collections: Sequence[Collection], router: Optional[QueryRouter] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            collections (Sequence[Collection]): The collections.
+            router (Optional[QueryRouter], optional): The router. Defaults to a `QueryRouter` over the collections.
+            max_workers (Optional[int], optional): Collections queried at once. Defaults to the number of collections.
+        """
+        self.collections = {collection.name: collection for collection in collections}
+        self.router = router or QueryRouter(collections)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or len(self.collections), thread_name_prefix="shard")
+        self._lock = threading.Lock()
+        self.counts = {"retrievals": 0, "collections_queried": 0, "fanned_out": 0, "failed": 0}
+
+    def _gather(self, names: List[str], call) -> Dict[str, object]:
+        # runs call(client) for every collection, in parallel if there are several
+        if len(names) == 1:
+            return {names[0]: call(self.collections[names[0]].client)}
+        futures = {name: self._pool.submit(call, self.collections[name].client) for name in names}
+        results, errors = {}, []
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.warning(f"ShardedRAGClient: collection {name} failed: {type(e).__name__}: {e}")
+                errors.append(e)
+        with self._lock:
+            self.counts["failed"] += len(errors)
+        if not results:
+            raise errors[0]
+        return results
+
+    def route(self, query: str, metadata_filter: Optional[str] = None, filepath_globpattern: Optional[str] = None,
+              collections: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Args:
+            query (str): The query.
+            metadata_filter (Optional[str], optional): JMESPath metadata filter. Defaults to None.
+            filepath_globpattern (Optional[str], optional): Glob pattern of file paths. Defaults to None.
+            collections (Optional[Sequence[str]], optional): Collections to search instead of routing. Defaults to None.
+
+        Returns:
+            List[str]: Names of the collections `retrieve` searches for the query.
+
+        Raises:
+            KeyError: If an unknown collection is given.
+        """
+        names = list(collections) if collections else self.router.route(query, metadata_filter, filepath_globpattern)
+        for name in names:
+            if name not in self.collections:
+                raise KeyError(f"Unknown collection {name!r}, expected one of {list(self.collections)}")
+        return names
+
+    def retrieve(self, query: str, k: int = 3, metadata_filter: Optional[str] = None,
+                 filepath_globpattern: Optional[str] = None, collections: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Args:
+            query (str): The query.
+            k (int, optional): Number of documents. Defaults to 3.
+            metadata_filter (Optional[str], optional): JMESPath metadata filter. Defaults to None.
+            filepath_globpattern (Optional[str], optional): Glob pattern of file paths. Defaults to None.
+            collections (Optional[Sequence[str]], optional): Collections to search instead of routing. Defaults to None.
+
+        Returns:
+            List[Dict]: The `k` best documents of the searched collections by reciprocal rank
+            fusion, with their text, metadata, distance and collection.
+
+        Raises:
+            KeyError: If an unknown collection is given.
+        """
+        names = self.route(query, metadata_filter, filepath_globpattern, collections)
+        with self._lock:
+            self.counts["retrievals"] += 1
+            self.counts["collections_queried"] += len(names)
+            self.counts["fanned_out"] += len(names) > 1
+
+        results = self._gather(names, lambda client: client.retrieve(
+            query, k=k, metadata_filter=metadata_filter, filepath_globpattern=filepath_globpattern))
+        # each collection returns its documents best first; a chunk found by several collections
+        # sums their scores and keeps its best ranked copy
+        merged: Dict[str, Dict] = {}
+        ranks: Dict[str, int] = {}
+        scores: Dict[str, float] = {}
+        for name in names:
+            for rank, doc in enumerate(results.get(name, []), start=1):
+                if rank < ranks.get(doc["text"], rank + 1):
+                    merged[doc["text"]], ranks[doc["text"]] = {**doc, "collection": name}, rank
+                scores[doc["text"]] = scores.get(doc["text"], 0.0) + 1 / (RRF_K + rank)
+        ranked = sorted(merged, key=lambda text: (-scores[text], merged[text].get("dist", 0.0)))
+        return [merged[text] for text in ranked[:k]]
+
+    def statistics(self, collections: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Args:
+            collections (Optional[Sequence[str]], optional): Collections to report, e.g. those a
+                question is routed to; a retrieval cache then asks only their servers. Defaults to all.
+
+        Returns:
+            Dict: The summed file and chunk counts, latest `last_modified` and `last_indexed`, the
+            statistics of every collection under `collections` and the collections that did not
+            answer under `unavailable`.
+        """
+        names = list(collections) if collections else list(self.collections)
+        results = self._gather(names, lambda client: client.statistics())
+        totals: Dict = {"file_count": 0, "last_modified": None, "last_indexed": None}
+        for stats in results.values():
+            totals["file_count"] += stats.get("file_count", 0)
+            for field in ("last_modified", "last_indexed"):
+                if stats.get(field) is not None:
+                    totals[field] = max(totals[field] or 0, stats[field])
+            for field in ("indexed_file_count", "chunk_count", "unique_chunk_count"):
+                if field in stats:
+                    totals[field] = totals.get(field, 0) + stats[field]
+        if totals.get("chunk_count"):
+            totals["dedup_ratio"] = 1 - totals["unique_chunk_count"] / totals["chunk_count"]
+        totals["collections"] = results
+        totals["unavailable"] = [name for name in names if name not in results]
+        return totals
+
+    def pw_list_documents(self, **kwargs) -> List[Dict]:
+        """
+        Returns:
+            List[Dict]: The documents of all collections, each with its collection.
+        """
+        results = self._gather(list(self.collections), lambda client: client.pw_list_documents(**kwargs))
+        return [{**doc, "collection": name} for name, docs in results.items() for doc in docs]
+
+    def routing_metrics(self) -> Dict:
+        """
+        Returns:
+            Dict: The counts and the mean number of collections queried per retrieval.
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        counts["collections_per_retrieval"] = counts["collections_queried"] / counts["retrievals"] if counts["retrievals"] else 0.0
+        return counts
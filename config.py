@@ -9,6 +9,7 @@ class key:
         self.openai_api_key = openai_api_key
         self.serper_api_key = serper_api_key
         pw.set_license_key(license_key)
+        os.environ["PATHWAY_LICENSE_KEY"] = license_key  # for the index server process
         os.environ['GEMINI_API_KEY'] = gemini_api_key
         os.environ["TESSDATA_PREFIX"] = "/usr/share/tesseract/tessdata/"
         os.environ["OPENAI_API_KEY"] = openai_api_key
@@ -0,0 +1,163 @@
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from passages import tokenize
+
+
+def hashed_vectors(texts: List[str], dimensions: int = 4096) -> np.ndarray:
+    """
+    Embeds texts as L2-normalized counts of their word unigrams and bigrams hashed into
+    `dimensions` buckets. Overlapping chunks of the same section share most of their bigrams, so
+    their cosine similarity is close to 1.
+
+    Args:
+        texts (List[str]): The texts.
+        dimensions (int, optional): Number of hash buckets. Defaults to 4096.
+
+    Returns:
+        np.ndarray: One row per text.
+    """
+    vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        features = tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+        buckets = [zlib.crc32(feature.encode()) % dimensions for feature in features]
+        if buckets:
+            vectors[row] = np.bincount(buckets, minlength=dimensions)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class ContextSelector:
+    """
+    Post-retrieval selection of the chunks passed to the LLM.
+
+    `candidates` chunks are retrieved and reduced to at most `max_k`: near-duplicates of a better
+    ranked chunk are dropped, the rest are picked by maximal marginal relevance (relevance to the
+    query minus similarity to the chunks already picked), and the number of chunks is cut at the
+    largest drop of the relevance scores, so a query with one clearly relevant chunk gets one.
+
+    Relevance is the retrieval score normalized over the candidates, or the rank for chunks of
+    several collections. Similarity between chunks is
+    the cosine of `embed_fn` vectors if given, otherwise of hashed lexical vectors, since the
+    server returns the chunks without their embeddings.
+
+    Attributes:
+        candidates (int): Number of chunks retrieved before selection.
+        max_k (int): Maximum number of chunks returned.
+        min_k (int): Minimum number of chunks returned, if available.
+        diversity (float): Weight of the redundancy penalty in MMR, between 0 (relevance only) and 1.
+        gap (float): Minimum drop of the normalized relevance at which the chunks are cut.
+        duplicate_threshold (float): Similarity above which a chunk counts as a duplicate.
+        embed_fn (Optional[Callable[[List[str]], np.ndarray]]): Embeds the chunk texts.
+    """
+
+    def __init__(self, candidates: int = 8, max_k: int = 3, min_k: int = 1, diversity: float = 0.3, gap: float = 0.35,
+                 duplicate_threshold: float = 0.9, embed_fn: Optional[Callable[[List[str]], np.ndarray]] = None):
+        """
+        Args:
+            candidates (int, optional): Number of chunks retrieved before selection. Defaults to 8.
+            max_k (int, optional): Maximum number of chunks returned. Defaults to 3.
+            min_k (int, optional): Minimum number of chunks returned. Defaults to 1.
+            diversity (float, optional): Weight of the redundancy penalty in MMR. Defaults to 0.3.
+            gap (float, optional): Minimum drop of the normalized relevance at which the chunks are cut;
+                values above 1 disable adaptive k. Defaults to 0.35.
+            duplicate_threshold (float, optional): Similarity above which a chunk is a duplicate. Defaults to 0.9.
+            embed_fn (Optional[Callable[[List[str]], np.ndarray]], optional): Embeds the chunk texts. Defaults to hashed lexical vectors.
+        """
+        self.candidates = max(candidates, max_k)
+        self.max_k = max_k
+        self.min_k = min_k
+        self.diversity = diversity
+        self.gap = gap
+        self.duplicate_threshold = duplicate_threshold
+        self.embed_fn = embed_fn
+
+    def relevance(self, docs: List[Dict]) -> np.ndarray:
+        """
+        Args:
+            docs (List[Dict]): Retrieved chunks with their `dist` (lower is better), best first.
+
+        Returns:
+            np.ndarray: Relevance scaled to [0, 1] over the candidates; ranks if distances are
+            missing or come from several collections, whose distances cannot be compared (the
+            list order is then the fused ranking of `ShardedRAGClient`).
+        """
+        collections = {doc.get("collection") for doc in docs}
+        if len(collections) <= 1 and all("dist" in doc for doc in docs):
+            scores = -np.array([doc["dist"] for doc in docs], dtype=np.float64)
+        else:
+            scores = -np.arange(len(docs), dtype=np.float64)
+        spread = scores.max() - scores.min()
+        return (scores - scores.min()) / spread if spread > 0 else np.ones(len(docs))
+
+    def adaptive_k(self, relevance: np.ndarray) -> int:
+        """
+        Args:
+            relevance (np.ndarray): Normalized relevance of the candidates.
+
+        Returns:
+            int: The number of chunks above the largest relevance drop among the first `max_k`,
+            or `max_k` if no drop reaches `gap`.
+        """
+        ordered = np.sort(relevance)[::-1][:self.max_k + 1]
+        if len(ordered) < 2:
+            return len(ordered)
+        drops = ordered[:-1] - ordered[1:]
+        cut = int(np.argmax(drops))
+        if drops[cut] < self.gap:
+            return min(self.max_k, len(relevance))
+        return max(self.min_k, min(cut + 1, self.max_k))
+
+    def select(self, docs: List[Dict]) -> List[Dict]:
+        """
+        Args:
+            docs (List[Dict]): Retrieved chunks, as returned by `RAGClient.retrieve`.
+
+        Returns:
+            List[Dict]: The selected chunks, most relevant first.
+        """
+        if len(docs) <= 1:
+            return list(docs)
+        texts = [doc["text"] for doc in docs]
+        vectors = np.asarray(self.embed_fn(texts), dtype=np.float32) if self.embed_fn else hashed_vectors(texts)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        similarity = vectors @ vectors.T
+        relevance = self.relevance(docs)
+
+        # drop chunks nearly identical to a more relevant one
+        order = np.argsort(-relevance, kind="stable")
+        keep = np.ones(len(docs), dtype=bool)
+        for position, i in enumerate(order):
+            if keep[i] and (similarity[i, order[:position]][keep[order[:position]]] >= self.duplicate_threshold).any():
+                keep[i] = False
+        k = min(self.adaptive_k(relevance[keep]), int(keep.sum()))
+
+        # maximal marginal relevance over the remaining chunks
+        selected: List[int] = []
+        redundancy = np.zeros(len(docs))
+        available = keep.copy()
+        for _ in range(k):
+            mmr = np.where(available, (1 - self.diversity) * relevance - self.diversity * redundancy, -np.inf)
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            available[best] = False
+            redundancy = np.maximum(redundancy, similarity[best])
+        return [docs[i] for i in selected]
+
+    def retrieve(self, client, query: str, **kwargs) -> List[Dict]:
+        """
+        Retrieves `candidates` chunks for the query and selects among them.
+
+        Args:
+            client (RAGClient): Client of the document server.
+            query (str): The query.
+            **kwargs: Other arguments of `client.retrieve`, e.g. `metadata_filter`.
+
+        Returns:
+            List[Dict]: The selected chunks.
+        """
+        return self.select(client.retrieve(query, k=self.candidates, **kwargs))
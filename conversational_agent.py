@@ -1,5 +1,6 @@
 import openai
 from openai import OpenAI  
+from subtask_stream import SubtaskStreamParser
 
 
 
@@ -38,6 +39,56 @@ class ConversationalPipeline:
         )
         return response.choices[0].message.content
 
+
+    def stream_openai(self, prompt):
+        """
+        Sends a prompt to the OpenAI API and yields the response as it is generated.
+
+        Args:
+            prompt (str): The prompt to send to the model.
+
+        Yields:
+            str: The next piece of the response.
+        """
+        stream = self.client.chat.completions.create(
+            messages=[{"role": "system", "content": "You are a helpful assistant."},
+                        {"role": "user", "content": prompt}],
+            model=self.model,
+            stream=True,
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+    def stream_subtasks(self, prompt, labels, on_subtask=None):
+        """
+        Streams a decomposition prompt and parses its subtasks while they are generated.
+
+        Each subtask is passed to `on_subtask` as soon as the next label is written, so work on it (a
+        retrieval or web search) can start while the model is still writing the next one.
+
+        Args:
+            prompt (str): The decomposition prompt.
+            labels (tuple): The subtask labels of the output format, e.g. ("Subtask 1:", "Subtask 2:").
+            on_subtask (callable, optional): Called with the index and the cleaned text of every subtask.
+
+        Returns:
+            list: The subtasks, stripped.
+
+        Raises:
+            ValueError: If a label is missing from the response.
+        """
+        parser = SubtaskStreamParser(labels)
+        for delta in self.stream_openai(prompt):
+            for index, subtask in parser.feed(delta):
+                if on_subtask is not None:
+                    on_subtask(index, self.clean_subtask(subtask))
+        for index, subtask in parser.close():
+            if on_subtask is not None:
+                on_subtask(index, self.clean_subtask(subtask))
+        return parser.subtasks
+
     def analyst_task(self, query, context):
         """
         Analyzes a query using the provided document context.
@@ -60,6 +111,28 @@ class ConversationalPipeline:
         return self.call_openai(analyst_prompt)
 
 
+    def answer_simple(self, query, context):
+        """
+        Answers a simple query in a single call over the retrieved context, without analysts or a leader.
+
+        Args:
+            query (str): The user query.
+            context (list or str): The retrieved context.
+
+        Returns:
+            str: The final response.
+        """
+        simple_prompt = f"""
+        You are a financial agent. Answer the following query using the provided document context:
+
+        Query: {query}
+        Document Context: {context}
+
+        Provide a concise, accurate and informative response. If the context does not contain the answer, say what is missing.
+        """
+        return self.call_openai(simple_prompt)
+
+
     def leader_task(self, response_1, response_2, query, context):
         """
         Unifies and summarizes responses from multiple analysts.
@@ -111,7 +184,23 @@ class ConversationalPipeline:
         return self.call_openai(follow_up_prompt).strip()
 
     
-    def divide_correct_task_into_subtasks(self, query, context):
+    def clean_subtask(self, subtask):
+        """
+        Normalizes a subtask the model left empty ("[]", "Empty", "N/A", ...) to an empty string.
+
+        Args:
+            subtask (str): The subtask as returned by the model.
+
+        Returns:
+            str: The stripped subtask, or "" if it is empty.
+        """
+        subtask = subtask.strip()
+        if subtask.strip("[]()\"'.").strip().lower() in ("", "empty", "none", "n/a", "na", "-", "null"):
+            return ""
+        return subtask
+
+
+    def divide_correct_task_into_subtasks(self, query, context, on_subtask=None):
         """
         Divides a query into two distinct subtasks based on the provided context if the query has been classified as correct, i.e, 
         it can be solved using the context provided.
@@ -119,6 +208,7 @@ class ConversationalPipeline:
         Args:
             query (str): The user query.
             context (str): The document context.
+            on_subtask (callable, optional): Called with the index and text of each subtask as soon as it is generated.
 
         Returns:
             tuple: Two distinct subtasks (subtask_1, subtask_2).
@@ -144,12 +234,11 @@ class ConversationalPipeline:
         Subtask 1: [In case of simple query, keep the initial query here else in case of complex query keep the first independent subtask with clear and actionable instructions]
         Subtask 2: [In case of simple query, keep this empty else in case of complex query keep the second distinct subtask that complements the first]
         """
-        response = self.call_openai(divide_prompt)
-        subtask_1, subtask_2 = response.split("Subtask 1:")[1].split("Subtask 2:")
-        return subtask_1.strip(), subtask_2.strip()
+        subtask_1, subtask_2 = self.stream_subtasks(divide_prompt, ("Subtask 1:", "Subtask 2:"), on_subtask)
+        return subtask_1, self.clean_subtask(subtask_2)
 
 
-    def divide_incorrect_task_into_subtasks(self, query):
+    def divide_incorrect_task_into_subtasks(self, query, on_subtask=None):
 
         """
         Divides a query into two distinct subtasks based on the provided context if the query has been classified as incorrect, i.e, it cannot 
@@ -158,6 +247,7 @@ class ConversationalPipeline:
         Args:
             query (str): The user query.
             context (str): The document context.
+            on_subtask (callable, optional): Called with the index and text of each subtask as soon as it is generated.
 
         Returns:
             tuple: Two distinct subtasks (subtask_1, subtask_2).
@@ -183,11 +273,10 @@ class ConversationalPipeline:
         Subtask 1: [In case of simple query, keep the initial query here else in case of complex query keep the first independent subtask with clear and actionable instructions]
         Subtask 2: [In case of simple query, keep this empty else in case of complex query keep the second distinct subtask that complements the first]
         """
-        response = self.call_openai(divide_prompt)
-        subtask_1, subtask_2 = response.split("Subtask 1:")[1].split("Subtask 2:")
-        return subtask_1.strip(), subtask_2.strip()
+        subtask_1, subtask_2 = self.stream_subtasks(divide_prompt, ("Subtask 1:", "Subtask 2:"), on_subtask)
+        return subtask_1, self.clean_subtask(subtask_2)
 
-    def generate_new_subtasks(self, query, subtask_1, subtask_2, context):
+    def generate_new_subtasks(self, query, subtask_1, subtask_2, context, on_subtask=None):
         """
         Generates two new subtasks (Subtask 3 and Subtask 4) based on a query, context, 
         and two existing subtasks. The new subtasks address unexplored aspects of the query.
@@ -197,6 +286,7 @@ class ConversationalPipeline:
             subtask_1 (str): The first subtask derived from the query.
             subtask_2 (str): The second subtask derived from the query.
             context (str): Additional information or document context related to the query.
+            on_subtask (callable, optional): Called with the index and text of each new subtask as soon as it is generated.
 
         Returns:
             tuple: A tuple containing two strings - Subtask 3 and Subtask 4, both distinct 
@@ -229,14 +319,12 @@ class ConversationalPipeline:
         Subtask 4: [Fourth independent subtask, distinct from Subtask 1, Subtask 2, and Subtask 3, complementing the overall solution]
         """
 
-        # Calls the OpenAI API with the generated prompt.
-        response = self.call_openai(generate_new_subtasks_prompt)
-
-        # Splits the response from the API into Subtask 3 and Subtask 4 based on the prompt format.
-        subtask_3, subtask_4 = response.split("Subtask 3:")[1].split("Subtask 4:")
+        # Streams the response of the OpenAI API and splits it into Subtask 3 and Subtask 4 based on the
+        # prompt format, handing each one to on_subtask as soon as it is complete.
+        subtask_3, subtask_4 = self.stream_subtasks(generate_new_subtasks_prompt, ("Subtask 3:", "Subtask 4:"), on_subtask)
 
-        # Returns the new subtasks after stripping any extra whitespace.
-        return subtask_3.strip(), subtask_4.strip()
+        # Returns the new subtasks, already stripped of any extra whitespace.
+        return subtask_3, subtask_4
 
 
     def run_pipeline(self, query, context_a, context_b, subtask_1, subtask_2):
@@ -244,6 +332,9 @@ class ConversationalPipeline:
         Orchestrates the pipeline for generating responses from two Analyst tasks for distinct subtasks 
         and consolidates them into a final response using a Leader task.
 
+        A simple query (empty Subtask 2) is answered with one `answer_simple` call over context_a
+        instead, since there is nothing to unify.
+
         Args:
             query (str): The original query to be addressed.
             context_a (str): Contextual information for Subtask 1.
@@ -255,6 +346,10 @@ class ConversationalPipeline:
             str: A final unified response from the Leader after analyzing both Analyst responses.
         """
 
+        # A simple query needs neither a second analyst nor the leader.
+        if not subtask_2:
+            return self.answer_simple(query, context_a)
+
         # Generate response for Subtask 1 using the context_a document.
         response_1 = self.analyst_task(subtask_1, context_a)
 
@@ -0,0 +1,151 @@
+import re
+import heapq
+import hashlib
+from typing import Dict, Tuple
+
+import pathway as pw
+from pathway.xpacks.llm.document_store import DocumentStore
+
+
+def chunk_hash(text: str) -> str:
+    """
+    Args:
+        text (str): A chunk.
+
+    Returns:
+        str: The SHA-1 hex digest of the chunk lowercased with whitespace collapsed, so copies of
+        boilerplate that differ only in line breaks or case get the same hash.
+    """
+    return hashlib.sha1(re.sub(r"\s+", " ", text).strip().lower().encode()).hexdigest()
+
+
+# Most source paths a deduplicated chunk can list under "sources"
+MAX_SOURCES = 5
+
+
+class ChunkCopies(pw.BaseCustomAccumulator):
+    """
+    The copies of a chunk, kept incrementally: adding or removing a copy updates a count per
+    (path, page) instead of rebuilding and sorting the list of all copies.
+
+    The result is the text and metadata of the first copy by path and page, the number of
+    copies, and the first `MAX_SOURCES` distinct paths.
+    """
+
+    def __init__(self, copies: Dict[Tuple[str, str], list]):
+        # (path, page) -> [count, text, metadata] of the copies found there
+        self.copies = copies
+
+    @classmethod
+    def neutral(cls) -> "ChunkCopies":
+        return cls({})
+
+    @classmethod
+    def from_row(cls, row) -> "ChunkCopies":
+        text, metadata = row
+        metadata = metadata.as_dict()
+        return cls({(str(metadata.get("path", "")), str(metadata.get("page", ""))): [1, text, metadata]})
+
+    def update(self, other: "ChunkCopies") -> None:
+        for key, (count, text, metadata) in other.copies.items():
+            if key in self.copies:
+                self.copies[key][0] += count
+            else:
+                self.copies[key] = [count, text, metadata]
+
+    def retract(self, other: "ChunkCopies") -> None:
+        for key, (count, _, _) in other.copies.items():
+            self.copies[key][0] -= count
+            if self.copies[key][0] <= 0:
+                del self.copies[key]
+
+    def compute_result(self) -> tuple:
+        if not self.copies:
+            return "", pw.Json({}), 0, ()
+        first = min(self.copies)
+        _, text, metadata = self.copies[first]
+        paths = heapq.nsmallest(MAX_SOURCES, {path for path, _ in self.copies})
+        return text, pw.Json(metadata), sum(count for count, _, _ in self.copies.values()), tuple(paths)
+
+
+@pw.udf(deterministic=True)
+def merge_metadata(metadata: pw.Json, copies: int, paths: tuple, max_sources: int) -> pw.Json:
+    # the first copy keeps its metadata as is; the first paths are listed under "sources" if asked for
+    merged = {**metadata.as_dict(), "copies": copies}
+    if max_sources:
+        merged["sources"] = list(paths[:max_sources])
+    return pw.Json(merged)
+
+
+@pw.udf
+def add_dedup_stats(result: pw.Json, chunks, unique_chunks, files) -> pw.Json:
+    chunks = chunks or 0
+    unique_chunks = unique_chunks or 0
+    return pw.Json({
+        **result.as_dict(),
+        "indexed_file_count": files or 0,
+        "chunk_count": chunks,
+        "unique_chunk_count": unique_chunks,
+        "dedup_ratio": 1 - unique_chunks / chunks if chunks else 0.0,
+    })
+
+
+class DedupDocumentStore(DocumentStore):
+    """
+    `DocumentStore` that indexes every distinct chunk once.
+
+    Between the splitter and the index, chunks are grouped by the hash of their normalized text,
+    so boilerplate repeated across filings (disclaimers, standard notes, headers) is embedded once
+    and stored once in the index. The indexed chunk carries the metadata of its first copy (by
+    path) plus `copies`, the number of copies, and with `max_sources` set the first paths
+    containing it under `sources`; the paths are left out by default, as every retrieved chunk
+    carries them. Path filters match the first copy's path. Removing a document updates the
+    copies of its shared chunks and drops the chunks no other document contains.
+
+    The statistics endpoint additionally reports `indexed_file_count`, the number of distinct
+    paths that have been parsed and split into chunks, `chunk_count`, `unique_chunk_count` and
+    `dedup_ratio`, the share of chunks that were not embedded.
+
+    Attributes:
+        max_sources (int): Number of source paths listed under `sources`, at most `MAX_SOURCES`; 0 lists none.
+    """
+
+    def __init__(self, *args, max_sources: int = 0, **kwargs):
+        """
+        Args:
+            *args: Arguments of `DocumentStore`.
+            max_sources (int, optional): Number of source paths listed under `sources`, at most
+                `MAX_SOURCES`; 0 lists none. Defaults to 0.
+            **kwargs: Keyword arguments of `DocumentStore`.
+        """
+        # set before DocumentStore.__init__, which builds the pipeline
+        self.max_sources = min(max_sources, MAX_SOURCES)
+        super().__init__(*args, **kwargs)
+
+    def split_docs(self, post_processed_docs: pw.Table) -> pw.Table:
+        chunks = super().split_docs(post_processed_docs).with_columns(
+            _chunk_hash=pw.apply_with_type(chunk_hash, str, pw.this.text)
+        )
+        unique_chunks = chunks.groupby(pw.this._chunk_hash).reduce(
+            copies=pw.reducers.udf_reducer(ChunkCopies)(pw.this.text, pw.this.metadata),
+        ).select(
+            text=pw.apply_with_type(lambda copies: copies[0], str, pw.this.copies),
+            metadata=merge_metadata(pw.this.copies[1], pw.this.copies[2], pw.this.copies[3], self.max_sources),
+        )
+        # files with at least one chunk; a file without any text never gets one
+        files = chunks.select(
+            path=pw.apply_with_type(lambda metadata: str(metadata.as_dict().get("path", "")), str, pw.this.metadata)
+        ).groupby(pw.this.path).reduce(pw.this.path)
+        self.chunk_stats = chunks.reduce(chunks=pw.reducers.count()).join_left(
+            unique_chunks.reduce(unique_chunks=pw.reducers.count()), id=pw.left.id
+        ).select(pw.left.chunks, pw.right.unique_chunks).join_left(
+            files.reduce(files=pw.reducers.count()), id=pw.left.id
+        ).select(pw.left.chunks, pw.left.unique_chunks, pw.right.files)
+        return unique_chunks
+
+    @pw.table_transformer
+    def statistics_query(self, info_queries: pw.Table) -> pw.Table:
+        results = super().statistics_query(info_queries)
+        return results.join_left(self.chunk_stats, id=results.id).select(
+            result=add_dedup_stats(pw.left.result, pw.right.chunks, pw.right.unique_chunks, pw.right.files)
+        )
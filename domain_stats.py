@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import threading
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+
+
+class DomainStats:
+    """
+    Persistent per-domain statistics of page fetches, used to avoid slow and useless hosts.
+
+    For every domain the most recent fetches are kept with their latency, whether they succeeded
+    and whether they yielded useful content. From these the scraper derives a read timeout per
+    domain, skips domains that almost always fail or return nothing, and fetches the remaining
+    URLs in order of expected value (useful content per second).
+
+    Attributes:
+        path (Optional[str]): JSON file the statistics are loaded from and saved to; None keeps them in memory.
+        window (int): Number of most recent fetches kept per domain.
+        timeout (Tuple[float, float]): Default (connect, read) timeout in seconds.
+        min_samples (int): Fetches needed before a domain's own statistics are used.
+        skip_threshold (float): Domains whose share of useful fetches is at most this are skipped.
+        retry_after (float): Seconds after which a skipped domain is tried again.
+    """
+
+    def __init__(self, path: Optional[str] = "./domain_stats.json", window: int = 50, timeout: Tuple[float, float] = (5.0, 10.0),
+                 min_samples: int = 3, skip_threshold: float = 0.1, retry_after: float = 24 * 3600):
+        """
+        Args:
+            path (Optional[str], optional): JSON file for the statistics; None keeps them in memory. Defaults to "./domain_stats.json".
+            window (int, optional): Number of most recent fetches kept per domain. Defaults to 50.
+            timeout (Tuple[float, float], optional): Default (connect, read) timeout in seconds. Defaults to (5, 10).
+            min_samples (int, optional): Fetches needed before a domain's statistics are used. Defaults to 3.
+            skip_threshold (float, optional): Domains with at most this share of useful fetches are skipped. Defaults to 0.1.
+            retry_after (float, optional): Seconds after which a skipped domain is tried again. Defaults to one day.
+        """
+        self.path = path
+        self.window = window
+        self.timeout = timeout
+        self.min_samples = min_samples
+        self.skip_threshold = skip_threshold
+        self.retry_after = retry_after
+        # domain -> {"samples": [[latency, ok, useful], ...], "last_fetch": timestamp}
+        self.domains: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    @staticmethod
+    def domain(url: str) -> str:
+        """
+        Args:
+            url (str): A page URL.
+
+        Returns:
+            str: The lowercase host name without a leading "www.".
+        """
+        host = (urlparse(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def record(self, url: str, latency: float, ok: bool, useful: bool) -> None:
+        """
+        Records one fetch.
+
+        Args:
+            url (str): The fetched URL.
+            latency (float): Duration of the fetch in seconds.
+            ok (bool): Whether the page was downloaded.
+            useful (bool): Whether the page had usable content.
+        """
+        with self._lock:
+            entry = self.domains.setdefault(self.domain(url), {"samples": [], "last_fetch": 0})
+            entry["samples"].append([round(latency, 3), ok, useful and ok])
+            del entry["samples"][:-self.window]
+            entry["last_fetch"] = time.time()
+
+    def summary(self, domain: str) -> Dict:
+        """
+        Args:
+            domain (str): A domain as returned by `domain`.
+
+        Returns:
+            Dict: Number of samples, failure rate, useful-content yield and p50/p95 latency of the domain.
+        """
+        with self._lock:
+            entry = self.domains.get(domain, {"samples": [], "last_fetch": 0})
+            samples = list(entry["samples"])
+            last_fetch = entry["last_fetch"]
+        if not samples:
+            return {"samples": 0, "failure_rate": 0.0, "yield": None, "p50_latency": None, "p95_latency": None, "last_fetch": last_fetch}
+        latencies = sorted(latency for latency, ok, _ in samples if ok) or sorted(latency for latency, _, _ in samples)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+
+        return {
+            "samples": len(samples),
+            "failure_rate": sum(1 for _, ok, _ in samples if not ok) / len(samples),
+            "yield": sum(1 for _, _, useful in samples if useful) / len(samples),
+            "p50_latency": percentile(50),
+            "p95_latency": percentile(95),
+            "last_fetch": last_fetch,
+        }
+
+    def timeout_for(self, url: str) -> Tuple[float, float]:
+        """
+        Returns a (connect, read) timeout for the URL: the default for unknown domains, otherwise
+        twice the domain's p95 latency, clamped between 2 seconds and the default read timeout.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            Tuple[float, float]: The timeout to pass to `requests`.
+        """
+        summary = self.summary(self.domain(url))
+        connect, read = self.timeout
+        if summary["samples"] < self.min_samples or summary["failure_rate"] == 1.0:
+            return self.timeout
+        return connect, min(read, max(2.0, 2 * summary["p95_latency"]))
+
+    def should_skip(self, url: str) -> bool:
+        """
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            bool: True if the domain rarely yields useful content and was fetched within `retry_after` seconds.
+        """
+        summary = self.summary(self.domain(url))
+        if summary["samples"] < self.min_samples:
+            return False
+        if time.time() - summary["last_fetch"] >= self.retry_after:
+            return False
+        return summary["yield"] <= self.skip_threshold
+
+    def expected_value(self, url: str) -> float:
+        """
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            float: Expected useful fetches per second of the domain; unknown domains get a neutral prior.
+        """
+        summary = self.summary(self.domain(url))
+        if summary["samples"] < self.min_samples:
+            return 0.5 / 1.0
+        return summary["yield"] / max(summary["p50_latency"], 0.05)
+
+    def order(self, urls: List[str]) -> List[str]:
+        """
+        Drops the URLs of skipped domains and sorts the rest by expected value, best first.
+
+        Args:
+            urls (List[str]): Candidate URLs in search result order.
+
+        Returns:
+            List[str]: The URLs to fetch; ties keep the search result order.
+        """
+        return sorted((url for url in urls if not self.should_skip(url)), key=self.expected_value, reverse=True)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            Dict[str, Dict]: Summary, timeout and skip decision of every known domain.
+        """
+        with self._lock:
+            domains = list(self.domains)
+        snapshot = {}
+        for domain in domains:
+            url = "http://" + domain
+            snapshot[domain] = {**self.summary(domain), "timeout": self.timeout_for(url), "skipped": self.should_skip(url)}
+        return snapshot
+
+    def load(self) -> None:
+        """
+        Loads the statistics from `path`, ignoring an unreadable file.
+        """
+        try:
+            with open(self.path) as f:
+                domains = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self.domains = domains
+
+    def save(self) -> None:
+        """
+        Writes the statistics to `path` atomically.
+        """
+        if not self.path:
+            return
+        # concurrent searches save at the same time; one save at a time stages and replaces the file
+        with self._save_lock:
+            with self._lock:
+                payload = json.dumps(self.domains)
+            staged = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(staged, "w") as f:
+                f.write(payload)
+            os.replace(staged, self.path)
+
+
+if __name__ == "__main__":
+    # python domain_stats.py [path]: prints the statistics collected by the scraper
+    stats = DomainStats(sys.argv[1] if len(sys.argv) > 1 else "./domain_stats.json")
+    rows = sorted(stats.snapshot().items(), key=lambda item: -item[1]["samples"])
+    print(f"{'domain':<40} {'n':>4} {'fail':>6} {'yield':>6} {'p50':>7} {'p95':>7} {'read':>6}  skip")
+    for domain, s in rows:
+        print(f"{domain:<40} {s['samples']:>4} {s['failure_rate']:>6.2f} {s['yield']:>6.2f} "
+              f"{s['p50_latency']:>6.2f}s {s['p95_latency']:>6.2f}s {s['timeout'][1]:>5.1f}s  {s['skipped']}")
@@ -0,0 +1,212 @@
+"""
+The document index server: parses, embeds and indexes the documents and answers retrievals.
+
+Every named collection has its own sources, index and REST server; the servers listen on
+consecutive ports from `--port`, in the order of the collections, followed by the web result
+cache. The index server runs as its own process, started by `main.py` or on its own, so that
+the Pathway workers can be scaled without the agent loop:
+
+    pathway spawn --threads 4 --processes 4 python index_server.py --port 8000 \
+        --collection acme=./data/acme/ --collection globex=./data/globex/ --web-cache ./web_cache/
+
+Threads split the Rust-side work (grouping, joins, indexing) but share the process' Python
+interpreter, so parsing and embedding only scale with the number of processes. The REST server
+is opened by the first process. See benchmarks/bench_workers.py.
+"""
+import os
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+
+import pathway as pw
+from pathway.xpacks.llm import llms, splitters
+from pathway.xpacks.llm.question_answering import AdaptiveRAGQuestionAnswerer
+from pathway.udfs import DiskCache, ExponentialBackoffRetryStrategy
+
+from pdf_parsing import CachedOpenParse, OpenAITableArgs
+from index_state import persistence_config
+from indexing import ann_factory, hybrid_retriever_factory
+from dedup_store import DedupDocumentStore
+from batch_embedder import BatchedOpenAIEmbedder
+from web_cache import WebCacheParser
+
+
+# Set embedding_dimensions (e.g. 512) to embed with text-embedding-3-small shortened to that many
+# dimensions; the vector index stores float32 vectors, so this shrinks it compared to ada-002's 1536
+embedding_dimensions = None
+# Chunks embedded at the same time are sent in batched requests, a few at a time per process and
+# within the account's rate limits, which are split between the processes
+embedding_limits = dict(max_in_flight=4, requests_per_minute=3000, tokens_per_minute=1_000_000)
+
+# Chunks are indexed by BM25 and by embedding; the two rankings are fused with weighted
+# reciprocal rank fusion, so exact tickers, form items and figures are found as well as
+# paraphrased questions. Set one weight to 0 to use a single index. main.py derives the
+# threshold of its speculative web search from these weights (`indexing.weak_match_dist`); with
+# a single index it only speculates on retrievals without any chunk.
+bm25_weight = 1.0
+vector_weight = 1.0
+# Name of the collection of cached web results, served after the document collections
+WEB_CACHE_COLLECTION = "web_cache"
+
+# The vector index is an HNSW graph (usearch), whose query time stays flat as the corpus grows;
+# raise expansion_search for recall, set reserved_space near the expected number of chunks.
+# "bruteforce" is exact but scans every chunk, see benchmarks/bench_ann.py
+ann_backend = "usearch"
+
+
+def process_count() -> int:
+    """
+    Returns:
+        int: Number of Pathway worker processes of this run, as set by `pathway spawn`.
+    """
+    return max(1, int(os.environ.get("PATHWAY_PROCESSES", "1")))
+
+
+def collection_ports(names: List[str], port: int = 8000) -> Dict[str, int]:
+    """
+    Args:
+        names (List[str]): Names of the collections, in server order.
+        port (int, optional): Port of the first collection. Defaults to 8000.
+
+    Returns:
+        Dict[str, int]: The port of every collection.
+    """
+    return {name: port + i for i, name in enumerate(names)}
+
+
+def build_apps(collections: Dict[str, str], web_cache_path: Optional[str] = None) -> Dict[str, AdaptiveRAGQuestionAnswerer]:
+    """
+    Builds the indexing pipeline and the question answerer of every collection.
+
+    The collections share the embedder (and its rate limits), the parser and the LLM, but each
+    has its own sources, deduplication and index.
+
+    Args:
+        collections (Dict[str, str]): Folder of the documents of every collection, by name.
+        web_cache_path (Optional[str], optional): Folder of the cached web results, indexed as the
+            `web_cache` collection; None to index the documents only. Defaults to None.
+
+    Returns:
+        Dict[str, AdaptiveRAGQuestionAnswerer]: The question answerers by collection, to be served with `run_server`.
+    """
+    # Initialize necessary components for processing text and generating responses
+    text_splitter = splitters.TokenCountSplitter(max_tokens=400)
+    if embedding_dimensions:
+        embedder = BatchedOpenAIEmbedder(model="text-embedding-3-small", dimensions=embedding_dimensions, cache_strategy=DiskCache(), **embedding_limits)
+    else:
+        embedder = BatchedOpenAIEmbedder(cache_strategy=DiskCache(), **embedding_limits)
+
+    # Set up the LLM (Large Language Model) for response generation
+    chat = llms.OpenAIChat(
+        model="gpt-4o",
+        retry_strategy=ExponentialBackoffRetryStrategy(max_retries=6),  # Retry strategy for failed requests
+        cache_strategy=DiskCache(),  # Caching to avoid redundant API calls
+        temperature=0.05,  # Set low temperature for consistent responses
+    )
+
+    # Settings of the table parser's LLM (same model as `chat`); they are sent to the worker
+    # processes, which build their own OpenAIChat, so the table pages are parsed in parallel
+    table_args = OpenAITableArgs(model="gpt-4o", temperature=0.05)
+    # Parse results are cached per document and page hash in ./parse_cache/, and only pages with
+    # tables go through OpenParse and its LLM table parser; the CPUs are shared by the processes
+    parser = CachedOpenParse(table_args=table_args, workers=max(1, (os.cpu_count() or 1) // process_count()))
+
+    knn_factory = ann_factory(embedder, backend=ann_backend, reserved_space=10000, expansion_search=256)
+    retriever_factory = hybrid_retriever_factory(embedder, bm25_weight=bm25_weight, vector_weight=vector_weight, knn_factory=knn_factory)
+
+    # Load data from the folder of every collection; the persistent id is the collection name
+    folders = [(name, path, parser) for name, path in collections.items()]
+    if web_cache_path:
+        # web cache entries are plain text; everything else still goes through OpenParse
+        folders.append((WEB_CACHE_COLLECTION, web_cache_path, WebCacheParser(parser)))
+
+    apps = {}
+    for name, path, collection_parser in folders:
+        source = pw.io.fs.read(path=path, format="binary", with_metadata=True, persistent_id=name)
+        # Set up document store with sources, retriever, splitter, and parser; chunks repeated across
+        # documents (disclaimers, standard notes, headers) are embedded and indexed once
+        doc_store = DedupDocumentStore(
+            [source],
+            retriever_factory=retriever_factory,
+            splitter=text_splitter,
+            parser=collection_parser
+        )
+        # Initialize the Adaptive RAG (Retrieval Augmented Generation) question-answering system
+        apps[name] = AdaptiveRAGQuestionAnswerer(
+            llm=chat,
+            indexer=doc_store,
+        )
+    return apps
+
+
+def run_server(apps: Dict[str, AdaptiveRAGQuestionAnswerer], host: str = "0.0.0.0", port: int = 8000, cache_dir: str = "./Cache") -> None:
+    """
+    Builds the REST server of every collection and runs the pipeline until it is stopped.
+
+    The inputs are persisted in `cache_dir`, so a restart replays the indexed files from the
+    snapshot and only processes files that changed since. Delete it after changing the pipeline,
+    the collections or the number of workers, since a snapshot only fits the pipeline that wrote it.
+
+    Args:
+        apps (Dict[str, AdaptiveRAGQuestionAnswerer]): The question answerers built by `build_apps`.
+        host (str, optional): Host of the REST servers. Defaults to "0.0.0.0".
+        port (int, optional): Port of the first collection's server. Defaults to 8000.
+        cache_dir (str, optional): Persistent storage of the inputs and caches. Defaults to "./Cache".
+    """
+    for name, app_port in collection_ports(list(apps), port).items():
+        apps[name].build_server(host=host, port=app_port)
+    # app.run_server() would only enable UDF caching; run with full input persistence instead
+    pw.run(monitoring_level=pw.MonitoringLevel.NONE, persistence_config=persistence_config(cache_dir))
+
+
+def start_index_server(threads: int = 1, processes: int = 1, host: str = "0.0.0.0", port: int = 8000,
+                       collections: Optional[Dict[str, str]] = None, web_cache_path: Optional[str] = None,
+                       cache_dir: str = "./Cache") -> subprocess.Popen:
+    """
+    Starts the index server in the background with `pathway spawn`.
+
+    The server inherits the environment, so the OpenAI and Pathway license keys set by
+    `config.key` are passed on.
+
+    Args:
+        threads (int, optional): Pathway worker threads per process. Defaults to 1.
+        processes (int, optional): Pathway worker processes. Defaults to 1.
+        host (str, optional): Host of the REST server. Defaults to "0.0.0.0".
+        port (int, optional): Port of the first collection's server. Defaults to 8000.
+        collections (Optional[Dict[str, str]], optional): Folder of every collection, by name.
+            Defaults to one collection, `documents`, of ./data/.
+        web_cache_path (Optional[str], optional): Folder of the cached web results. Defaults to None.
+        cache_dir (str, optional): Persistent storage of the inputs and caches. Defaults to "./Cache".
+
+    Returns:
+        subprocess.Popen: The `pathway spawn` process; terminate it to stop the server.
+    """
+    command: List[str] = [
+        sys.executable, "-m", "pathway", "spawn", "--threads", str(threads), "--processes", str(processes),
+        sys.executable, os.path.abspath(__file__), "--host", host, "--port", str(port), "--cache", cache_dir,
+    ]
+    for name, path in (collections or {"documents": "./data/"}).items():
+        command += ["--collection", f"{name}={path}"]
+    if web_cache_path:
+        command += ["--web-cache", web_cache_path]
+    return subprocess.Popen(command)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--collection", action="append", metavar="NAME=PATH",
+                        help="a collection and the folder of its documents; repeat for several (default: documents=./data/)")
+    parser.add_argument("--web-cache", default=None, help="folder of the cached web results")
+    parser.add_argument("--cache", default="./Cache", help="persistent storage")
+    args = parser.parse_args()
+
+    collections = dict(collection.split("=", 1) for collection in args.collection or ["documents=./data/"])
+    apps = build_apps(collections, args.web_cache)
+    run_server(apps, host=args.host, port=args.port, cache_dir=args.cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import time
+from typing import Dict, Optional
+
+import requests
+import pathway as pw
+
+
+def persistence_config(path: str = "./Cache", snapshot_interval_ms: int = 5000) -> pw.persistence.Config:
+    """
+    Builds the Pathway persistence configuration of the document index.
+
+    The named input connectors (`persistent_id`) store their offsets and a snapshot of the data
+    they read, so after a restart the indexed files are replayed from the snapshot and only new,
+    changed or deleted files are read from disk. The same storage holds the `DiskCache` of the
+    embedder, so the replayed chunks are embedded from the cache instead of the OpenAI API.
+
+    Args:
+        path (str, optional): Directory of the persistent storage. Defaults to "./Cache", the storage
+            Pathway's servers use for UDF caching, so existing cached embeddings are kept.
+        snapshot_interval_ms (int, optional): How often the input snapshot is updated. Defaults to 5000.
+
+    Returns:
+        pw.persistence.Config: Configuration to pass to `pw.run`.
+    """
+    return pw.persistence.Config(
+        pw.persistence.Backend.filesystem(path),
+        snapshot_interval_ms=snapshot_interval_ms,
+        persistence_mode=pw.PersistenceMode.PERSISTING,
+    )
+
+
+def count_input_files(*paths: str) -> int:
+    """
+    Counts the files Pathway will index from the given directories.
+
+    Args:
+        *paths (str): Directories read by `pw.io.fs.read`.
+
+    Returns:
+        int: Number of regular, non-hidden files below the directories.
+    """
+    count = 0
+    for path in paths:
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            count += sum(1 for name in files if not name.startswith("."))
+    return count
+
+
+def wait_until_ready(client, expected_files: int, timeout: float = 600.0, interval: float = 0.5) -> Dict:
+    """
+    Blocks until the document server answers and has indexed the expected number of files.
+
+    The server is ready once its statistics report at least `expected_files` files split into
+    chunks (`indexed_file_count` of `DedupDocumentStore`, summed over the collections by
+    `ShardedRAGClient`) and, if any files are expected, a retrieval returns a document, i.e. the
+    chunks are being embedded. `file_count` is not used: it counts parsed elements (about one per
+    page), and the input files listed by `pw_list_documents` are not parsed yet.
+
+    Args:
+        client (RAGClient): Client of the question answering server.
+        expected_files (int): Number of input files present at startup, see `count_input_files`.
+        timeout (float, optional): Seconds to wait before giving up. Defaults to 600.
+        interval (float, optional): Seconds between two polls. Defaults to 0.5.
+
+    Returns:
+        Dict: The last statistics reported by the server.
+
+    Raises:
+        TimeoutError: If the server is not ready within `timeout` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    stats: Optional[Dict] = None
+    while time.monotonic() < deadline:
+        try:
+            stats = client.statistics()
+            if stats.get("indexed_file_count", 0) >= expected_files and (expected_files == 0 or client.retrieve("ready", k=1)):
+                return stats
+        except (requests.RequestException, ValueError):
+            # the REST server is not listening yet
+            pass
+        time.sleep(interval)
+    raise TimeoutError(f"Document server not ready after {timeout}s (expected {expected_files} files, last statistics: {stats})")
@@ -0,0 +1,247 @@
+from typing import Callable, List, Optional
+
+import pathway as pw
+from pathway.stdlib.indexing import BruteForceKnnFactory, LshKnnFactory, TantivyBM25Factory, UsearchKnnFactory
+from pathway.stdlib.indexing.nearest_neighbors import BruteForceKnnMetricKind, USearchMetricKind
+from pathway.stdlib.indexing.colnames import _INDEX_REPLY, _MATCHED_ID, _QUERY_ID, _SCORE
+from pathway.stdlib.indexing.data_index import InnerIndex
+from pathway.stdlib.indexing.hybrid_index import HybridIndex, HybridIndexFactory
+from pathway.stdlib.indexing.retrievers import InnerIndexFactory
+
+
+class WeightedHybridIndex(HybridIndex):
+    """
+    `HybridIndex` with weighted reciprocal rank fusion.
+
+    Every retriever is asked for `candidates` times the requested number of matches, and a row at
+    rank `r` of retriever `i` scores `weights[i] / (k + r)`. The scores are summed over the
+    retrievers and the best rows are returned, so a document found by both the lexical and the
+    vector index ranks above one found by a single index.
+    """
+
+    def __init__(self, retrievers: List[InnerIndex], weights: Optional[List[float]] = None, k: float = 60, candidates: int = 2):
+        """
+        Args:
+            retrievers (List[InnerIndex]): The indices to combine.
+            weights (Optional[List[float]], optional): Weight of every retriever. Defaults to equal weights.
+            k (float, optional): Rank constant of the fusion. Defaults to 60.
+            candidates (int, optional): Multiple of the requested matches fetched from every retriever. Defaults to 2.
+        """
+        super().__init__(retrievers, k)
+        self.weights = list(weights) if weights is not None else [1.0] * len(retrievers)
+        if len(self.weights) != len(retrievers):
+            raise ValueError("WeightedHybridIndex needs one weight per retriever.")
+        self.candidates = candidates
+
+    def _combine_results(
+        self,
+        query_retriever: Callable[[InnerIndex], pw.Table],
+        query_table: pw.Table,
+        number_of_matches: pw.ColumnExpression | int,
+        *,
+        as_of_now: bool,
+    ) -> pw.Table:
+        @pw.udf(deterministic=True)
+        def enumerate_results(results: list[tuple[pw.Pointer, float]]) -> list[tuple[int, pw.Pointer]]:
+            return [(i, x[0]) for i, x in enumerate(results, start=1)]
+
+        def query_single_retriever(retriever: InnerIndex, weight: float) -> pw.Table:
+            results = (
+                query_retriever(retriever)
+                .select(
+                    **{
+                        _INDEX_REPLY: enumerate_results(pw.this[_INDEX_REPLY]),
+                        _QUERY_ID: pw.this.id,
+                    },
+                )
+                .flatten(pw.this[_INDEX_REPLY])
+                .select(
+                    **{
+                        _MATCHED_ID: pw.this[_INDEX_REPLY].get(1),
+                        _SCORE: weight / (self.k + pw.this[_INDEX_REPLY].get(0)),
+                        _QUERY_ID: pw.this[_QUERY_ID],
+                    }
+                )
+            )
+            if as_of_now:
+                results = results._forget_immediately()
+            return results
+
+        results = pw.Table.concat_reindex(
+            *[query_single_retriever(retriever, weight) for retriever, weight in zip(self.retrievers, self.weights)]
+        )
+        removed_duplicates = results.groupby(results[_QUERY_ID], results[_MATCHED_ID]).reduce(
+            pw.this[_QUERY_ID],
+            pw.this[_MATCHED_ID],
+            _pw_groupby_sort_key=-pw.reducers.sum(pw.this[_SCORE]),
+            **{_SCORE: pw.reducers.sum(pw.this[_SCORE])},
+        )
+
+        @pw.udf(deterministic=True)
+        def limit_results(results: tuple, count: int) -> tuple:
+            return results[:count]
+
+        grouped_by_query = removed_duplicates.groupby(
+            pw.this[_QUERY_ID],
+            sort_by=pw.this._pw_groupby_sort_key,
+            id=pw.this[_QUERY_ID],
+        ).reduce(**{_INDEX_REPLY: pw.reducers.tuple(pw.make_tuple(pw.this[_MATCHED_ID], pw.this[_SCORE]))})
+
+        if isinstance(number_of_matches, pw.ColumnExpression):
+            number_of_matches_table = query_table.select(_pw_number_of_matches=number_of_matches)
+            if as_of_now:
+                number_of_matches_table = number_of_matches_table._forget_immediately()
+            grouped_by_query.promise_universe_is_subset_of(number_of_matches_table)
+            number_of_matches = number_of_matches_table.restrict(grouped_by_query)._pw_number_of_matches
+
+        limited_results = grouped_by_query.select(**{_INDEX_REPLY: limit_results(pw.this[_INDEX_REPLY], number_of_matches)})
+        if as_of_now:
+            limited_results = limited_results._filter_out_results_of_forgetting()
+        return limited_results
+
+    def query(self, query_column: pw.ColumnReference, *, number_of_matches: pw.ColumnExpression | int = 3,
+              metadata_filter: pw.ColumnExpression | None = None) -> pw.Table:
+        def query_retriever(retriever: InnerIndex) -> pw.Table:
+            return retriever.query(
+                query_column,
+                number_of_matches=number_of_matches * self.candidates,
+                metadata_filter=metadata_filter,
+            )
+
+        return self._combine_results(query_retriever, query_column.table, number_of_matches, as_of_now=False)
+
+    def query_as_of_now(self, query_column: pw.ColumnReference, *, number_of_matches: pw.ColumnExpression | int = 3,
+                        metadata_filter: pw.ColumnExpression | None = None) -> pw.Table:
+        def query_retriever(retriever: InnerIndex) -> pw.Table:
+            return retriever.query_as_of_now(
+                query_column,
+                number_of_matches=number_of_matches * self.candidates,
+                metadata_filter=metadata_filter,
+            )
+
+        return self._combine_results(query_retriever, query_column.table, number_of_matches, as_of_now=True)
+
+
+class WeightedHybridIndexFactory(HybridIndexFactory):
+    """
+    Factory of `WeightedHybridIndex`, usable as the `retriever_factory` of a `DocumentStore`.
+    """
+
+    def __init__(self, retriever_factories: List[InnerIndexFactory], weights: Optional[List[float]] = None, k: float = 60, candidates: int = 2):
+        """
+        Args:
+            retriever_factories (List[InnerIndexFactory]): Factories of the indices to combine.
+            weights (Optional[List[float]], optional): Weight of every index. Defaults to equal weights.
+            k (float, optional): Rank constant of the fusion. Defaults to 60.
+            candidates (int, optional): Multiple of the requested matches fetched from every index. Defaults to 2.
+        """
+        super().__init__(retriever_factories, k)
+        self.weights = weights
+        self.candidates = candidates
+
+    def build_inner_index(self, data_column: pw.ColumnReference, metadata_column: pw.ColumnExpression | None = None) -> InnerIndex:
+        retrievers = [factory.build_inner_index(data_column, metadata_column) for factory in self.retriever_factories]
+        return WeightedHybridIndex(retrievers, self.weights, self.k, self.candidates)
+
+
+ANN_BACKENDS = ("usearch", "lsh", "bruteforce")
+
+
+def ann_factory(embedder: Optional[pw.UDF] = None, backend: str = "usearch", dimensions: Optional[int] = None,
+                reserved_space: int = 1000, connectivity: int = 16, expansion_add: int = 128, expansion_search: int = 256,
+                n_or: int = 20, n_and: int = 10, bucket_length: float = 10.0) -> InnerIndexFactory:
+    """
+    Builds the vector index factory of the document store.
+
+    `usearch` is an HNSW graph: queries visit a few hundred nodes instead of every chunk, so query
+    time grows with the logarithm of the corpus size. `connectivity` (edges per node) and
+    `expansion_add` trade build time and memory for graph quality, `expansion_search` trades query
+    time for recall. `lsh` hashes vectors into buckets and is cheaper to build but less accurate,
+    `bruteforce` is exact and scans every vector, which is only worth it for small corpora.
+
+    The indexes store float32 vectors, so their memory is set by the number of dimensions. Use an
+    embedder with fewer dimensions (e.g. text-embedding-3-small with `dimensions=512` instead of
+    ada-002's 1536) to shrink the index.
+
+    Args:
+        embedder (Optional[pw.UDF], optional): Embedder of the chunks and queries; None if the data column holds vectors.
+        backend (str, optional): One of "usearch", "lsh" and "bruteforce". Defaults to "usearch".
+        dimensions (Optional[int], optional): Number of dimensions. Defaults to those of `embedder`.
+        reserved_space (int, optional): Initial capacity in vectors; set it near the corpus size to avoid regrowing. Defaults to 1000.
+        connectivity (int, optional): HNSW edges per node. Defaults to 16.
+        expansion_add (int, optional): HNSW candidate list size while adding. Defaults to 128.
+        expansion_search (int, optional): HNSW candidate list size while searching. Defaults to 256.
+        n_or (int, optional): Number of LSH hash tables. Defaults to 20.
+        n_and (int, optional): Number of hash functions per LSH table. Defaults to 10.
+        bucket_length (float, optional): Width of the LSH buckets. Defaults to 10.
+
+    Returns:
+        InnerIndexFactory: The configured index factory.
+
+    Raises:
+        ValueError: If `backend` is unknown.
+    """
+    if backend == "usearch":
+        return UsearchKnnFactory(dimensions=dimensions, reserved_space=reserved_space, metric=USearchMetricKind.COS,
+                                 connectivity=connectivity, expansion_add=expansion_add, expansion_search=expansion_search,
+                                 embedder=embedder)
+    if backend == "lsh":
+        return LshKnnFactory(dimensions=dimensions, n_or=n_or, n_and=n_and, bucket_length=bucket_length,
+                             distance_type="cosine", embedder=embedder)
+    if backend == "bruteforce":
+        return BruteForceKnnFactory(dimensions=dimensions, reserved_space=reserved_space,
+                                    metric=BruteForceKnnMetricKind.COS, embedder=embedder)
+    raise ValueError(f"Unknown ANN backend {backend!r}, expected one of {ANN_BACKENDS}.")
+
+
+def weak_match_dist(bm25_weight: float = 1.0, vector_weight: float = 1.0, k: float = 60) -> Optional[float]:
+    """
+    The best `dist` above which a hybrid retrieval is weak, for `hybrid_retriever_factory` with
+    the same weights.
+
+    The hybrid `dist` is the negated fusion score: -(bm25_weight + vector_weight) / (k + 1) for a
+    chunk ranked first by both indexes, and at best -max(weights) / (k + 1) for one found by a
+    single index. The threshold lies halfway, -(max(weights) + min(weights) / 2) / (k + 1), so a
+    retrieval is weak when its best chunk was not found near the top of both rankings.
+
+    Args:
+        bm25_weight (float, optional): Weight of the BM25 ranking. Defaults to 1.0.
+        vector_weight (float, optional): Weight of the vector ranking. Defaults to 1.0.
+        k (float, optional): Rank constant of the fusion. Defaults to 60.
+
+    Returns:
+        Optional[float]: The threshold, or None if one weight is 0: a single index returns its own
+        distance (cosine distance or negated BM25 score), which has no rank-based threshold.
+    """
+    if bm25_weight <= 0 or vector_weight <= 0:
+        return None
+    return -(max(bm25_weight, vector_weight) + min(bm25_weight, vector_weight) / 2) / (k + 1)
+
+
+def hybrid_retriever_factory(embedder: pw.UDF, bm25_weight: float = 1.0, vector_weight: float = 1.0,
+                             k: float = 60, candidates: int = 2, knn_factory: Optional[InnerIndexFactory] = None) -> InnerIndexFactory:
+    """
+    Builds the retriever factory of the document store: a BM25 index and a vector index fused
+    with weighted reciprocal rank fusion. BM25 finds the exact tickers, form items and figures
+    that embeddings tend to blur, while the vector index handles paraphrased questions.
+
+    Args:
+        embedder (pw.UDF): Embedder of the vector index.
+        bm25_weight (float, optional): Weight of the BM25 ranking. Defaults to 1.0.
+        vector_weight (float, optional): Weight of the vector ranking; 0 together with bm25_weight 0 is not allowed. Defaults to 1.0.
+        k (float, optional): Rank constant of the fusion. Defaults to 60.
+        candidates (int, optional): Multiple of the requested matches fetched from every index. Defaults to 2.
+        knn_factory (Optional[InnerIndexFactory], optional): Vector index factory. Defaults to a usearch HNSW index over `embedder`.
+
+    Returns:
+        InnerIndexFactory: The hybrid factory, or the single index if one weight is 0.
+    """
+    if bm25_weight <= 0 and vector_weight <= 0:
+        raise ValueError("At least one of bm25_weight and vector_weight must be positive.")
+    knn_factory = knn_factory or UsearchKnnFactory(embedder=embedder)
+    if bm25_weight <= 0:
+        return knn_factory
+    bm25_factory = TantivyBM25Factory()
+    if vector_weight <= 0:
+        return bm25_factory
+    return WeightedHybridIndexFactory([bm25_factory, knn_factory], [bm25_weight, vector_weight], k, candidates)
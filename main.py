@@ -2,16 +2,28 @@ import os
 import pathway as pw
 from pathway.xpacks.llm import llms, embedders, prompts, parsers, splitters
 from pathway.xpacks.llm.question_answering import BaseRAGQuestionAnswerer, RAGClient, AdaptiveRAGQuestionAnswerer
-from pathway.xpacks.llm.vector_store import VectorStoreServer
 from pathway.udfs import ExponentialBackoffRetryStrategy
 from pathway.udfs import DiskCache, ExponentialBackoffRetryStrategy 
 from openai import OpenAI
 import threading
 from serpapi.google_search import GoogleSearch as search
+from serpapi.serp_api_client_exception import SerpApiClientException
 from bs4 import BeautifulSoup
 import requests
 from llm import OpenAIClient
 from scraper import ContentScraper, GoogleSerperAPI
+from index_state import count_input_files, wait_until_ready
+from index_server import start_index_server, collection_ports, WEB_CACHE_COLLECTION, bm25_weight, vector_weight
+from indexing import weak_match_dist
+from collection_router import Collection, ShardedRAGClient
+from quote_fast_path import QuoteFastPath
+from query_complexity import is_simple_query
+from subtask_stream import SubtaskPrefetcher
+from speculative_search import SpeculativeSearch
+from retrieval_cache import CachedRAGClient
+from context_selection import ContextSelector
+from web_cache import WebResultCache
+from search_provider import SearchRouter, SerperProvider, SerpApiProvider, SearchProviderError
 from guardrail import GuardrailChecker
 from conversational_agent import ConversationalPipeline
 from grade import grade_doc
@@ -20,6 +32,7 @@ import google.generativeai as genai
 from config import key
 import time
 import os
+import atexit
 import aiohttp
 from typing import Any, Dict, List, Optional
 
@@ -27,67 +40,127 @@ from typing import Any, Dict, List, Optional
 cred = key("Enter SERP API KEY", "Enter GEMINI API KEY", "ENTER OPENAI API KEY", "ENTER PATHWAY LICENSE KEY", "ENTER SERPER API KEY")
 
 
-# Initialize necessary components for processing text and generating responses
-text_splitter = splitters.TokenCountSplitter(max_tokens=400)  
-embedder = embedders.OpenAIEmbedder(cache_strategy=DiskCache())  
+# Web search results are written back into ./web_cache/, which is indexed as a second source
+# so that later questions on the same topic are answered locally; entries expire after the TTL
+cache_web_results = True
+web_cache_ttl = 24 * 3600
+if cache_web_results:
+    web_cache = WebResultCache("./web_cache/", ttl=web_cache_ttl)
+    web_cache.start_purger()
 
-# Load data from the specified folder
-folder = pw.io.fs.read(path="./data/", format="binary", with_metadata=True)
-sources = [folder]
+# Documents are split into named collections (e.g. per client or filing type), each with its own
+# sources, index and server; a question is routed to the collections whose keywords it mentions,
+# or fanned out to all of them in parallel, and the results are merged. For example:
+#   collections = {"acme": "./data/acme/", "globex": "./data/globex/"}
+#   collection_keywords = {"acme": ["acme", "acme corp"], "globex": ["globex", "gbx"]}
+collections = {"documents": "./data/"}
+collection_keywords = {"documents": []}
 
-# Set up the LLM (Large Language Model) for response generation
-chat = llms.OpenAIChat(  
-    model="gpt-4o",
-    retry_strategy=ExponentialBackoffRetryStrategy(max_retries=6),  # Retry strategy for failed requests
-    cache_strategy=DiskCache(), # Caching to avoid redundant API calls
-    temperature=0.05, # Set low temperature for consistent responses
-)
-
-table_args = {
-    "parsing_algorithm": "llm",
-    "llm": chat,
-    "prompt": prompts.DEFAULT_MD_TABLE_PARSE_PROMPT,
-}
-parser = parsers.OpenParse(table_args=table_args)
-
-# Set up document store with sources, embedder, splitter, and parser
-doc_store = VectorStoreServer(
-    *sources,
-    embedder=embedder,
-    splitter=text_splitter,
-    parser=parser
-)
-
-
-# Initialize the Adaptive RAG (Retrieval Augmented Generation) question-answering system
-app = AdaptiveRAGQuestionAnswerer(  
-    llm=chat,
-    indexer=doc_store,
-)
-
-# Define server host and port
+# Define server host and port (of the first collection; the others follow)
 app_host = "0.0.0.0"
 app_port = 8000
 
-def start_server():
-    """
-    Starts the Adaptive RAG Question Answerer server. 
-    This method builds and runs the server in a separate thread.
-    """
-    app.build_server(host=app_host, port=app_port)
-    app.run_server()
-
-
-# Run the server in a separate thread to allow for real-time question answering
-server_thread = threading.Thread(target=start_server, name="AdaptiveRAGQuestionAnswerer")
-server_thread.daemon = True
-server_thread.start()
+# The documents are parsed, embedded and indexed by the index server (index_server.py) in its own
+# process, with pathway_threads worker threads in each of pathway_processes processes. Threads
+# speed up the Rust-side work (grouping, indexing), processes also parsing and embedding, see
+# benchmarks/bench_workers.py; the defaults use 4 threads per 8 cores (4 x 4 on 32 cores). Set
+# INDEX_SERVER to host:port to use an index server that is already running instead.
+pathway_threads = int(os.environ.get("PATHWAY_THREADS", min(4, os.cpu_count() or 1)))
+pathway_processes = int(os.environ.get("PATHWAY_PROCESSES", max(1, (os.cpu_count() or 1) // 8)))
+index_server_address = os.environ.get("INDEX_SERVER")
+if index_server_address:
+    app_host, app_port = index_server_address.rsplit(":", 1)
+    app_port = int(app_port)
+else:
+    index_server = start_index_server(
+        threads=pathway_threads,
+        processes=pathway_processes,
+        host=app_host,
+        port=app_port,
+        collections=collections,
+        web_cache_path=web_cache.path if cache_web_results else None,
+        cache_dir="./Cache",
+    )
+    atexit.register(index_server.terminate)
+
+# Create a client for interacting with the RAG server; repeated retrievals (subtasks equal to the
+# question, popular questions) are served from a cache until the index changes
+collection_paths = dict(collections)
+if cache_web_results:
+    collection_paths[WEB_CACHE_COLLECTION] = web_cache.path
+client = CachedRAGClient(ShardedRAGClient([
+    Collection(
+        name,
+        RAGClient(host=app_host, port=port),
+        path=collection_paths[name],
+        keywords=collection_keywords.get(name, ()),
+        always=name == WEB_CACHE_COLLECTION,  # cached web results may answer any question
+    )
+    for name, port in collection_ports(list(collection_paths), app_port).items()
+]), max_entries=1024)
+
+# Wait until the files present at startup are indexed (restored from the snapshot after a restart)
+start = time.time()
+index_paths = list(collection_paths.values())
+try:
+    # a remote index server's files are not known here; wait until it answers
+    stats = wait_until_ready(client, 0 if index_server_address else count_input_files(*index_paths))
+    print(f"Index ready in {time.time() - start:.1f}s: {stats.get('indexed_file_count', 0)} files, "
+          f"{stats.get('unique_chunk_count', 0)} of {stats.get('chunk_count', 0)} chunks embedded (dedup ratio {stats.get('dedup_ratio', 0.0):.1%})")
+except TimeoutError as e:
+    # e.g. a file without any text is never counted; answer from what is indexed so far
+    print(e)
+
+# Each stage retrieves more chunks than it needs and keeps a diverse subset (maximal marginal
+# relevance), cut where the relevance drops; adjacent chunks of one section are near-identical
+context_selectors = {
+    "question": ContextSelector(candidates=8, max_k=3),  # grading the question
+    "subtask": ContextSelector(candidates=8, max_k=3),  # analysts' context
+    "follow_up": ContextSelector(candidates=8, max_k=2),  # added to the context already retrieved
+}
 
-import time
-time.sleep(2)
+# Keep one Serper client (and its pooled connections) alive across questions, and route web
+# searches through providers that are health-tracked and failed over with a circuit breaker
+serper_scraper = GoogleSerperAPI(cred.serper_api_key)
+serp_scraper = ContentScraper(cred.serp_api_key)
+web_search = SearchRouter([
+    SerperProvider(serper_scraper),
+    SerpApiProvider(serp_scraper),
+])
+# Query both providers at once and keep the first usable answer (costs a second search)
+race_web_search = False
+
+# Quote questions ("what is AAPL trading at") are answered from a quote cache fed by the SERP API
+# stock price search, without retrieval or any LLM call; quotes are reused for quote_ttl seconds
+quote_ttl = 30
+quote_fast_path = QuoteFastPath(serp_scraper, ttl=quote_ttl)
+
+# Questions the local complexity heuristic finds simple are not decomposed into subtasks; simple
+# questions (also when the leader leaves subtask 2 empty) are answered in one synthesis call
+skip_simple_decomposition = True
+
+# Decompositions are streamed: the context of a subtask is fetched as soon as the next subtask's
+# label has been generated, while the leader is still writing the next subtask
+def search_subtask(subtask):
+    # one web search per subtask; searches run concurrently, each returns the provider it used
+    results, sources, provider = web_search.search_detailed([subtask], race=race_web_search)
+    return results[0], sources[0], provider
+
+prefetchers = {
+    "subtask": SubtaskPrefetcher(lambda subtask: [item['text'] for item in context_selectors["subtask"].retrieve(client, subtask)], empty=[]),
+    "follow_up": SubtaskPrefetcher(lambda subtask: [item['text'] for item in context_selectors["follow_up"].retrieve(client, subtask)], empty=[]),
+    "web": SubtaskPrefetcher(search_subtask, empty=([], [], None)),
+}
 
-# Create a client for interacting with the RAG server
-client = RAGClient(host=app_host, port=app_port)
+# A question whose best retrieved chunk is farther than speculative_dist_threshold is usually graded
+# as not answerable from the documents; its web search is started during grading, alongside the
+# other web searches, and used or dropped once the grade is known. The threshold is derived from
+# the fusion weights of index_server.py (the best chunk was not found near the top of both BM25
+# and the vector ranking); with a single index only empty retrievals are speculated on. Set
+# speculate_web_search = False to always wait for the grade
+speculate_web_search = True
+speculative_dist_threshold = weak_match_dist(bm25_weight, vector_weight)
+speculative_search = SpeculativeSearch(search_subtask, dist_threshold=speculative_dist_threshold)
 
 print("Server is running. You can now ask questions. Type 'exit' to stop.")
 while True:
@@ -98,7 +171,26 @@ while True:
     
     # Exit condition for the loop
     if question.lower() == "exit":
+        print("Retrieval cache:", client.metrics())
+        print("Collection routing:", client.routing_metrics())
+        print("Quote fast path:", quote_fast_path.metrics())
+        print("Subtask prefetch:", {name: prefetcher.metrics() for name, prefetcher in prefetchers.items()})
+        print("Speculative web search:", speculative_search.metrics())
         break
+    for prefetcher in prefetchers.values():
+        prefetcher.clear()
+
+    # Answer quote questions directly; they match a fixed template, so the guardrail is skipped
+    try:
+      quote = quote_fast_path.answer(question)
+    except (requests.RequestException, SerpApiClientException, ValueError) as e:
+      # the quote search failed; answer through the full pipeline instead
+      print(f"Quote fast path failed ({type(e).__name__}: {e}), using the full pipeline")
+      quote = None
+    if quote is not None:
+        print("Response: ", quote)
+        continue
+
     # response = client.pw_ai_answer(question)
     # print("Response:", response)
     
@@ -109,8 +201,14 @@ while True:
         continue
       
     # Retrieve context from the RAG server
-    docs = client.retrieve(question)
+    docs = context_selectors["question"].retrieve(client, question)
     texts = [item['text'] for item in docs]
+
+    # If the retrieval is weak, search the web for the question while it is graded; a question that
+    # is sure to be decomposed is searched per subtask, so it is not speculated on
+    speculation = None
+    if(speculate_web_search and (is_simple_query(question) or not skip_simple_decomposition)):
+        speculation = speculative_search.start(question, docs)
     
     # Grade the retrieved context against the query
     status = grader.grade_document(question, texts)
@@ -123,49 +221,55 @@ while True:
 
 
     if(status.lower() == "yes"):
+        speculative_search.settle(speculation, used=False)
         print("Response: ", "Correct")
         print("Entering Leader-Analyst chain")
 
 
-        # If the query can be answered accurately, divide the task into subtasks
-        subtask_1, subtask_2 = leader_analyst.divide_correct_task_into_subtasks(question, texts)
+        # If the query can be answered accurately, divide the task into subtasks (unless it is simple)
+        if(skip_simple_decomposition and is_simple_query(question)):
+          subtask_1, subtask_2 = question, ""
+        else:
+          subtask_1, subtask_2 = leader_analyst.divide_correct_task_into_subtasks(question, texts, on_subtask=prefetchers["subtask"].start)
 
-        print(f"""Query : {question} divided into two subtasks\n
-        Subtask_1 : {subtask_1}\n
-        Subtask_2 : {subtask_2}""")
+        if(subtask_2 == ""):
+          print("Simple query: answering in one call")
+        else:
+          print(f"""Query : {question} divided into two subtasks\n
+          Subtask_1 : {subtask_1}\n
+          Subtask_2 : {subtask_2}""")
 
-        # Retrieve context for each subtask
-        context_a = client.retrieve(subtask_1)
-        context_a = [item['text'] for item in context_a]
+        # Retrieve context for each subtask; the question's own context was retrieved for grading
+        if(subtask_1 == question):
+          context_a = texts
+        else:
+          context_a = prefetchers["subtask"].result(subtask_1)
 
-        context_b = []
-        if(subtask_2!=""):
-          context_b = client.retrieve(subtask_2)
-          context_b = [item['text'] for item in context_b]
+        context_b = prefetchers["subtask"].result(subtask_2)
 
         # Run the leader-analyst pipeline to generate a response
         final_response = leader_analyst.run_pipeline(question, context_a, context_b, subtask_1, subtask_2)
         # print("Response: ", final_response)
 
-        # Check if a follow-up task is required
-        follow_up_status = leader_analyst.check_follow_up(question, context_a + context_b, final_response)
+        # Check if a follow-up task is required; a simple query has no subtasks to follow up on
+        follow_up_status = "No"
+        if(subtask_2 != ""):
+          follow_up_status = leader_analyst.check_follow_up(question, context_a + context_b, final_response)
         print("Follow-up status: ", follow_up_status)
 
         
         # If follow-up is needed, further divide the query and retrieve additional context
         if(follow_up_status == "Yes" and subtask_2 != ""):  
 
-          subtask_3, subtask_4 = leader_analyst.generate_new_subtasks(question, subtask_1, subtask_2, texts)
+          subtask_3, subtask_4 = leader_analyst.generate_new_subtasks(question, subtask_1, subtask_2, texts, on_subtask=prefetchers["follow_up"].start)
 
           print(f"""Query : {question} further divided into two more subtasks:\n
           Subtask_3 : {subtask_3}\n
           Subtask_4 : {subtask_4}""")
 
-          context_c = client.retrieve(subtask_3)
-          context_c = [item['text'] for item in context_c]
+          context_c = prefetchers["follow_up"].result(subtask_3)
 
-          context_d = client.retrieve(subtask_4)
-          context_d = [item['text'] for item in context_d]
+          context_d = prefetchers["follow_up"].result(subtask_4)
 
 
           context = []
@@ -198,142 +302,70 @@ while True:
         print("Response: ", status)
         print("Entering leader-analyst chain")
         print("Doing web-search to find the answer")
+        if(speculation is not None):
+          prefetchers["web"].adopt(question, speculation)
         
-        # Use web scraping APIs to fetch additional information
-        web_scraper = GoogleSerperAPI(cred.serper_api_key)
-        flag = 1
-        if(web_scraper.initialised and flag):
-          print("\nUsing SERPER API FOR WEB SEARCH\n")
-          subtask_1, subtask_2 = leader_analyst.divide_incorrect_task_into_subtasks(question)
-          print(f"""Query : {question} divided into two subtasks\n
-          Subtask_1 : {subtask_1}\n
-          Subtask_2 : {subtask_2}""")
-
-          context_a = web_scraper.search(subtask_1)
-          context_b = ""
-          if(subtask_2 != ""):
-            context_b = web_scraper.search(subtask_2)
-          
-          # Run the pipeline with the web-scraped context
-          final_response = leader_analyst.run_pipeline(question, context_a, context_b, subtask_1, subtask_2)
-          
-          context = []
-          context.extend(context_a)
-          context.extend(context_b)
-          
-          follow_up_status = leader_analyst.check_follow_up(question, context, final_response)
-          print("Follow-up status: ", follow_up_status)
-          
-          # Handle follow-up queries
-          if(follow_up_status == "Yes" and subtask_2 != ""):
-            subtask_3, subtask_4 = leader_analyst.generate_new_subtasks(question, subtask_1, subtask_2, texts)
-            print(f"""Query : {question} further divided into two more subtasks:\n
-            Subtask_3 : {subtask_3}\n
-            Subtask_4 : {subtask_4}""")
-            
-            context_c = web_scraper.search(subtask_3)
-            context_d = ""
-            if(subtask_4 != ""):
-              context_d = web_scraper.search(subtask_4)
-            
-            final_response = leader_analyst.run_pipeline_if_needed(question, context_c, context_d, subtask_3, subtask_4, final_response, context)
-            print("Response: ", final_response)
-            # Ask the user for feedback on the generated response (Human in the Loop)
-            feedback = str(input("\n\nAre you satisfied with the response? \n\n Please answer Yes or No: \n"))
-            if(feedback.lower()=="yes"):
-              print("Query Resolved")
-            else:
-              print("Please enter the refined version of the query along with additional context")
-          else:
-            print("Response: ", final_response)
-            # Ask the user for feedback on the generated response (Human in the Loop)
-            feedback = str(input("\n\nAre you satisfied with the response? \n\n Please answer Yes or No: \n"))
-            if(feedback.lower()=="yes"):
-              print("Query Resolved")
-            else:
-              print("Please enter the refined version of the query along with additional context")
-                    
-          
-        else :  
-          # Fallback to SERPER API
-          print("SERPER API FAILED. FALLBACK INITIATED. USING SERP API FOR WEB SEARCH")
-          
-          # Initialize the web scraper with the SERP API key
-          web_scraper = ContentScraper(cred.serp_api_key)
-          
-          # Divide the original incorrect query into two subtasks for further processing
-          subtask_1, subtask_2 = leader_analyst.divide_incorrect_task_into_subtasks(question)
-
+        # Divide the original incorrect query into two subtasks for further processing (unless it is simple)
+        if(skip_simple_decomposition and is_simple_query(question)):
+          subtask_1, subtask_2 = question, ""
+        else:
+          subtask_1, subtask_2 = leader_analyst.divide_incorrect_task_into_subtasks(question, on_subtask=prefetchers["web"].start)
+        # The speculative search is the search of Subtask 1 if the question is kept as it is
+        speculative_search.settle(speculation, used=(subtask_1 == question))
+        if(subtask_2 == ""):
+          print("Simple query: answering in one call")
+        else:
           print(f"""Query : {question} divided into two subtasks\n
           Subtask_1 : {subtask_1}\n
           Subtask_2 : {subtask_2}""")
 
-           # Fetch the context for Subtask 1 and Subtask 2 from the SERP API by performing a Google search
-          source_description_list_a, ai_overview_context_a = web_scraper.search_google(subtask_1)
-          all_content_a, context_a = web_scraper.get_content_from_urls(source_description_list_a)
-          stock_info_a = web_scraper.get_stock_price(subtask_1)
-
-          source_description_list_b, ai_overview_context_b = web_scraper.search_google(subtask_2)
-          all_content_b, context_b = web_scraper.get_content_from_urls(source_description_list_b)
-          stock_info_b = web_scraper.get_stock_price(subtask_2)
-
-          # Merge all relevant contexts (content and stock info) for both subtasks
-          context_a.extend(ai_overview_context_a)
-          context_a.extend(stock_info_a)
-          context_b.extend(ai_overview_context_b)
-          context_b.extend(stock_info_b)
-
-          # Run the leader-analyst pipeline using the contexts for both subtasks
-          final_response = leader_analyst.run_pipeline(question, context_a, context_b, subtask_1, subtask_2)
-          # print("Response: ", final_response)
+        # Collect the context for Subtask 1 and Subtask 2, searched while the subtasks were generated
+        try:
+          context_a, urls_a, provider_a = prefetchers["web"].result(subtask_1)
+          context_b, urls_b, provider_b = prefetchers["web"].result(subtask_2)
+        except SearchProviderError as e:
+          print(f"Web search failed: {e}")
+          continue
+        print(f"\nWeb search served by {provider_a}\n")
+        if cache_web_results:
+          web_cache.write(subtask_1, context_a, source=urls_a, provider=provider_a)
+          web_cache.write(subtask_2, context_b, source=urls_b, provider=provider_b)
+
+        # Run the leader-analyst pipeline using the contexts for both subtasks
+        final_response = leader_analyst.run_pipeline(question, context_a, context_b, subtask_1, subtask_2)
 
-          
-          # Combine the contexts for both subtasks into a single context list
-          context = []
-          context.extend(context_a)
-          context.extend(context_b)
+        # Combine the contexts for both subtasks into a single context list
+        context = []
+        context.extend(context_a)
+        context.extend(context_b)
+        follow_up_status = "No"
+        if(subtask_2 != ""):
           follow_up_status = leader_analyst.check_follow_up(question, context, final_response)
-          print("Follow-up status: ", follow_up_status)
-
-          # If a follow-up is needed, further divide the query and retrieve additional context
-          if(follow_up_status == "Yes" and subtask_2 != ""):
-            subtask_3, subtask_4 = leader_analyst.generate_new_subtasks(question, subtask_1, subtask_2, texts)
-
-            print(f"""Query : {question} further divided into two more subtasks:\n
-            Subtask_3 : {subtask_3}\n
-            Subtask_4 : {subtask_4}""")
-
-            # Fetch content and stock information for the new subtasks
-            source_description_list_c, ai_overview_context_c = web_scraper.search_google(subtask_3)
-            all_content_c, context_c = web_scraper.get_content_from_urls(source_description_list_c)
-            stock_info_c = web_scraper.get_stock_price(subtask_3)
-
-            source_description_list_d, ai_overview_context_d = web_scraper.search_google(subtask_4)
-            all_content_d, context_d = web_scraper.get_content_from_urls(source_description_list_d)
-            stock_info_d = web_scraper.get_stock_price(subtask_4)
+        print("Follow-up status: ", follow_up_status)
 
-            # Merge the contexts and stock information for the new subtasks
-            context_c.extend(ai_overview_context_c)
-            context_c.extend(stock_info_c)
-            context_d.extend(ai_overview_context_d)
-            context_d.extend(stock_info_d)
+        # If a follow-up is needed, further divide the query and retrieve additional context
+        if(follow_up_status == "Yes" and subtask_2 != ""):
+          subtask_3, subtask_4 = leader_analyst.generate_new_subtasks(question, subtask_1, subtask_2, texts, on_subtask=prefetchers["web"].start)
+          print(f"""Query : {question} further divided into two more subtasks:\n
+          Subtask_3 : {subtask_3}\n
+          Subtask_4 : {subtask_4}""")
 
-            # Print the final response after the follow-up processing
+          try:
+            context_c, urls_c, provider_c = prefetchers["web"].result(subtask_3)
+            context_d, urls_d, provider_d = prefetchers["web"].result(subtask_4)
+            print(f"\nWeb search served by {provider_c}\n")
+            if cache_web_results:
+              web_cache.write(subtask_3, context_c, source=urls_c, provider=provider_c)
+              web_cache.write(subtask_4, context_d, source=urls_d, provider=provider_d)
             final_response = leader_analyst.run_pipeline_if_needed(question, context_c, context_d, subtask_3, subtask_4, final_response, context)
-
-            print("Response: ", final_response)
-            
-            # Ask the user for feedback on the generated response (Human in the Loop)
-            feedback = str(input("\n\nAre you satisfied with the response? \n\n Please answer Yes or No: \n"))
-            if(feedback.lower()=="yes"):
-              print("Query Resolved")
-            else:
-              print("Please enter the refined version of the query along with additional context")
-          else:
-            print("Response: ", final_response)
-            # Ask the user for feedback on the generated response (Human in the Loop)
-            feedback = str(input("\n\nAre you satisfied with the response? \n\n Please answer Yes or No: \n"))
-            if(feedback.lower()=="yes"):
-              print("Query Resolved")
-            else:
-              print("Please enter the refined version of the query along with additional context")
+          except SearchProviderError as e:
+            # keep the first answer if no provider can serve the follow-up
+            print(f"Web search failed: {e}")
+
+        print("Response: ", final_response)
+        # Ask the user for feedback on the generated response (Human in the Loop)
+        feedback = str(input("\n\nAre you satisfied with the response? \n\n Please answer Yes or No: \n"))
+        if(feedback.lower()=="yes"):
+          print("Query Resolved")
+        else:
+          print("Please enter the refined version of the query along with additional context")
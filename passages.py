@@ -0,0 +1,192 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+# Frequent words that carry no signal for ranking passages against a subtask
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in is it its of on or that the this to was
+were what when where which who why will with does did do can about into than then there
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens, dropping stopwords.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[str]: The tokens in order of appearance.
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def split_passages(paragraphs: List[str], max_chars: int = 400, min_chars: int = 80) -> List[str]:
+    """
+    Turns the paragraphs of a page into passages of a bounded size.
+
+    Paragraphs longer than `max_chars` are split on sentence boundaries. Consecutive paragraphs
+    shorter than `min_chars` (menu entries, captions, banners) are grouped into passages of their
+    own, so they do not dilute the passages holding the actual content. Repeated passages are dropped.
+
+    Args:
+        paragraphs (List[str]): Paragraph texts in page order.
+        max_chars (int, optional): Maximum length of a passage. Defaults to 400.
+        min_chars (int, optional): Paragraphs shorter than this are grouped together. Defaults to 80.
+
+    Returns:
+        List[str]: The passages in page order.
+    """
+    passages = []
+
+    def pack(pieces):
+        # joins pieces into passages of at most max_chars characters
+        current = ""
+        for piece in pieces:
+            # a single piece longer than max_chars is hard-wrapped
+            while len(piece) > max_chars:
+                if current:
+                    passages.append(current)
+                    current = ""
+                passages.append(piece[:max_chars])
+                piece = piece[max_chars:]
+            if current and len(current) + 1 + len(piece) > max_chars:
+                passages.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+        if current:
+            passages.append(current)
+
+    short = []
+    for paragraph in paragraphs:
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if len(paragraph) < min_chars:
+            short.append(paragraph)
+            continue
+        pack(short)
+        short = []
+        pack(SENTENCE_PATTERN.split(paragraph))
+    pack(short)
+    return list(dict.fromkeys(passages))
+
+
+class PassageRanker:
+    """
+    Ranks passages against a query with Okapi BM25, scoring all passages at once with numpy.
+
+    Attributes:
+        k1 (float): Term frequency saturation.
+        b (float): Strength of the passage length normalisation.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1 (float, optional): Term frequency saturation. Defaults to 1.5.
+            b (float, optional): Strength of the passage length normalisation. Defaults to 0.75.
+        """
+        self.k1 = k1
+        self.b = b
+
+    def score(self, query: str, passages: List[str]) -> np.ndarray:
+        """
+        Computes the BM25 score of every passage for the query.
+
+        Args:
+            query (str): The query, e.g. a subtask.
+            passages (List[str]): The candidate passages.
+
+        Returns:
+            np.ndarray: One score per passage; 0 for passages without any query term.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores = np.zeros(len(passages))
+        if not terms or not passages:
+            return scores
+        term_ids = {term: i for i, term in enumerate(terms)}
+
+        # one (passage, term) pair per occurrence of a query term
+        lengths = np.empty(len(passages))
+        rows, cols = [], []
+        for row, passage in enumerate(passages):
+            tokens = tokenize(passage)
+            lengths[row] = len(tokens)
+            for token in tokens:
+                col = term_ids.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        if not rows:
+            return scores
+
+        tf = np.bincount(
+            np.asarray(rows) * len(terms) + np.asarray(cols),
+            minlength=len(passages) * len(terms),
+        ).reshape(len(passages), len(terms)).astype(float)
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(lengths.mean(), 1.0))
+        return (tf * (self.k1 + 1) / (tf + norm[:, None])) @ idf
+
+    def select(self, query: str, passages: List[str], k: int = 3, char_budget: int = 800) -> List[str]:
+        """
+        Picks the best passages for the query that fit in the character budget.
+
+        Passages are taken in order of score until `k` passages are chosen or the budget is used
+        up, and returned in page order. If no passage contains a query term, the leading passages
+        are returned instead.
+
+        Args:
+            query (str): The query, e.g. a subtask.
+            passages (List[str]): The candidate passages.
+            k (int, optional): Maximum number of passages. Defaults to 3.
+            char_budget (int, optional): Maximum total length of the chosen passages. Defaults to 800.
+
+        Returns:
+            List[str]: The chosen passages in page order.
+        """
+        scores = self.score(query, passages)
+        if scores.any():
+            candidates = [i for i in np.argsort(-scores, kind="stable") if scores[i] > 0]
+        else:
+            candidates = range(len(passages))
+
+        chosen = []
+        used = 0
+        for i in candidates:
+            if len(chosen) == k:
+                break
+            if used + len(passages[i]) > char_budget:
+                continue
+            chosen.append(i)
+            used += len(passages[i])
+        return [passages[i] for i in sorted(chosen)]
+
+
+def select_passages(query: Optional[str], paragraphs: List[str], k: int = 3, char_budget: int = 800,
+                    ranker: Optional[PassageRanker] = None) -> str:
+    """
+    Extracts the passages of a page that are most relevant to the query.
+
+    Args:
+        query (Optional[str]): The query; without one the page is truncated to `char_budget` characters.
+        paragraphs (List[str]): Paragraph texts of the page in page order.
+        k (int, optional): Maximum number of passages. Defaults to 3.
+        char_budget (int, optional): Maximum length of the result. Defaults to 800.
+        ranker (Optional[PassageRanker], optional): Ranker to use. Defaults to a BM25 ranker with default parameters.
+
+    Returns:
+        str: The chosen passages joined by spaces.
+    """
+    if not query:
+        return " ".join(paragraphs)[:char_budget]
+    ranker = ranker or PassageRanker()
+    return " ".join(ranker.select(query, split_passages(paragraphs), k, char_budget))
@@ -0,0 +1,541 @@
+import os
+import json
+import hashlib
+import logging
+import pickle
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import pathway as pw
+
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(contents: bytes) -> str:
+    """
+    Args:
+        contents (bytes): A document or page.
+
+    Returns:
+        str: The SHA-256 hex digest of the contents.
+    """
+    return hashlib.sha256(contents).hexdigest()
+
+
+# Arguments that do not change the parse result and must not end up in a fingerprint
+UNHASHED_ARGS = ("api_key", "api_base", "organization", "base_url", "cache_strategy", "retry_strategy", "executor")
+
+
+def _stable(value, depth: int = 0):
+    # a JSON-serializable, run-independent description of a configuration value
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {str(key): _stable(item, depth + 1) for key, item in sorted(value.items(), key=lambda item: str(item[0]))
+                if key not in UNHASHED_ARGS}
+    if isinstance(value, (list, tuple)):
+        return [_stable(item, depth + 1) for item in value]
+    description = {"class": f"{type(value).__module__}.{type(value).__qualname__}"}
+    if depth < 4:
+        # pw.UDF wrappers such as llms.OpenAIChat keep their call arguments (model, temperature, ...) in `kwargs`
+        attributes = getattr(value, "kwargs", None)
+        if not isinstance(attributes, dict):
+            attributes = {key: item for key, item in getattr(value, "__dict__", {}).items() if not key.startswith("_")}
+        description.update(_stable(attributes, depth + 1))
+    return description
+
+
+def config_fingerprint(config: Dict) -> str:
+    """
+    Fingerprints a parser configuration, e.g. the OpenParse table arguments with their LLM and prompt.
+
+    Objects are described by their class and their public attributes (the call arguments of
+    `pw.UDF`s), so the fingerprint is the same across runs; credentials and caching or retry
+    settings are left out.
+
+    Args:
+        config (Dict): The configuration.
+
+    Returns:
+        str: The first 16 hex digits of its SHA-256.
+    """
+    return hashlib.sha256(json.dumps(_stable(config), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def page_key(doc, page) -> str:
+    """
+    Computes the cache key of a page from its content stream and the raw data of its images.
+
+    The key does not depend on how the page is serialized, so a page gets the same key whether
+    it is read from the whole document or from a page range, and it stays the same when other
+    pages of the document change.
+
+    Args:
+        doc (fitz.Document): The document holding the page.
+        page (fitz.Page): The page.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    digest = hashlib.sha256(page.read_contents())
+    for image in page.get_images(full=True):
+        digest.update(doc.xref_stream_raw(image[0]) or b"")
+    return digest.hexdigest()
+
+
+def page_pdf(doc, number: int) -> bytes:
+    """
+    Args:
+        doc (fitz.Document): The document.
+        number (int): The 0-based page index.
+
+    Returns:
+        bytes: A PDF holding only that page.
+    """
+    import fitz
+
+    with fitz.open() as single:
+        single.insert_pdf(doc, from_page=number, to_page=number)
+        return single.tobytes(garbage=3, deflate=True)
+
+
+def split_ranges(contents: bytes, pages_per_range: int) -> List[Tuple[int, bytes]]:
+    """
+    Splits a PDF into PDFs of consecutive pages.
+
+    Args:
+        contents (bytes): The PDF.
+        pages_per_range (int): Number of pages per range.
+
+    Returns:
+        List[Tuple[int, bytes]]: The 1-based number of the first page and the PDF of every range.
+    """
+    import fitz
+
+    ranges = []
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        for first in range(0, doc.page_count, pages_per_range):
+            with fitz.open() as part:
+                part.insert_pdf(doc, from_page=first, to_page=min(first + pages_per_range, doc.page_count) - 1)
+                ranges.append((first + 1, part.tobytes(garbage=1)))
+    return ranges
+
+
+def load_entry(cache_dir: Optional[str], key: str) -> Optional[Dict]:
+    """
+    Args:
+        cache_dir (Optional[str]): The parse cache directory, or None if caching is disabled.
+        key (str): A document or page key.
+
+    Returns:
+        Optional[Dict]: The cached parse result, or None on a miss.
+    """
+    if not cache_dir:
+        return None
+    try:
+        with open(os.path.join(cache_dir, key + ".json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def inspect_range(contents: bytes, first_page: int = 1, cache_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Inspects the pages of a PDF: looks them up in the parse cache, and for misses extracts the
+    text and counts the tables with PyMuPDF's table finder, which is far cheaper than OpenParse's
+    rendering and table-transformer detection. Runs in the worker processes of `PageInspector`.
+
+    Args:
+        contents (bytes): A PDF or a page range of one.
+        first_page (int, optional): The 1-based number of its first page in the whole document. Defaults to 1.
+        cache_dir (Optional[str], optional): The parse cache directory. Defaults to None.
+
+    Returns:
+        List[Dict]: For every page its `number` and `key`, and either the cached `entry` or the
+        extracted `text`, the number of `tables` and, for pages with tables, the single-page `pdf`.
+    """
+    import fitz
+
+    pages = []
+    with fitz.open(stream=contents, filetype="pdf") as doc:
+        for index, page in enumerate(doc):
+            key = page_key(doc, page)
+            record = {"number": first_page + index, "key": key, "entry": load_entry(cache_dir, key)}
+            if record["entry"] is None:
+                record["text"] = page.get_text("text")
+                record["tables"] = len(page.find_tables().tables)
+                record["pdf"] = page_pdf(doc, index) if record["tables"] else None
+            pages.append(record)
+    return pages
+
+
+class OpenAITableArgs:
+    """
+    Picklable `table_args` of OpenParse's LLM table parser.
+
+    The `table_args` dict holds an `llms.OpenAIChat`, which cannot be sent to worker processes;
+    this object holds only its settings and builds the dict in every process that parses tables.
+
+    Attributes:
+        model (str): The vision model.
+        prompt (Optional[str]): The table parsing prompt; None for `prompts.DEFAULT_MD_TABLE_PARSE_PROMPT`.
+        max_retries (int): Retries of a failed LLM call.
+        chat_kwargs (Dict): Other arguments of `llms.OpenAIChat`, e.g. `temperature`.
+    """
+
+    def __init__(self, model: str = "gpt-4o", prompt: Optional[str] = None, max_retries: int = 6, **chat_kwargs):
+        """
+        Args:
+            model (str, optional): The vision model. Defaults to "gpt-4o".
+            prompt (Optional[str], optional): The table parsing prompt. Defaults to the Markdown table prompt.
+            max_retries (int, optional): Retries of a failed LLM call. Defaults to 6.
+            **chat_kwargs: Other arguments of `llms.OpenAIChat`, e.g. `temperature`.
+        """
+        self.model = model
+        self.prompt = prompt
+        self.max_retries = max_retries
+        self.chat_kwargs = chat_kwargs
+
+    def __call__(self) -> Dict:
+        """
+        Returns:
+            Dict: The `table_args` of `parsers.OpenParse`.
+        """
+        from pathway.udfs import ExponentialBackoffRetryStrategy
+        from pathway.xpacks.llm import llms, prompts
+
+        chat = llms.OpenAIChat(model=self.model, retry_strategy=ExponentialBackoffRetryStrategy(max_retries=self.max_retries),
+                               **self.chat_kwargs)
+        return {
+            "parsing_algorithm": "llm",
+            "llm": chat,
+            "prompt": self.prompt if self.prompt is not None else prompts.DEFAULT_MD_TABLE_PARSE_PROMPT,
+        }
+
+
+class TableParser:
+    """
+    Parses the single-page PDFs of pages with tables with OpenParse.
+
+    The OpenParse instance is built on first use in every process, so the parser can be sent to
+    the worker processes of `PageInspector` if its arguments are picklable (`table_args` given as
+    an `OpenAITableArgs` rather than a dict holding an LLM).
+
+    Attributes:
+        table_args (Optional[Union[Dict, Callable[[], Dict]]]): Table parser arguments of `parsers.OpenParse`, or a picklable function building them.
+        openparse_kwargs (Dict): Other arguments of `parsers.OpenParse`.
+        fingerprint (str): `config_fingerprint` of the configuration.
+    """
+
+    def __init__(self, table_args: Optional[Union[Dict, Callable[[], Dict]]] = None, **openparse_kwargs):
+        """
+        Args:
+            table_args (Optional[Union[Dict, Callable[[], Dict]]], optional): Table parser arguments, or a picklable function building them.
+            **openparse_kwargs: Other arguments of `parsers.OpenParse`, e.g. `image_args` or `processing_pipeline`.
+        """
+        self.table_args = table_args
+        self.openparse_kwargs = openparse_kwargs
+        self.fingerprint = config_fingerprint({"table_args": self._table_args(), **openparse_kwargs})
+        self._openparse = None
+        self._lock = threading.Lock()
+
+    def _table_args(self) -> Optional[Dict]:
+        return self.table_args() if callable(self.table_args) else self.table_args
+
+    def __getstate__(self) -> Dict:
+        state = dict(self.__dict__)
+        state["_openparse"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def is_picklable(self) -> bool:
+        """
+        Returns:
+            bool: Whether the parser can be sent to worker processes.
+        """
+        try:
+            pickle.dumps(self)
+            return True
+        except Exception:
+            return False
+
+    def parse(self, pdf: bytes) -> List[List]:
+        """
+        Args:
+            pdf (bytes): A single-page PDF.
+
+        Returns:
+            List[List]: The page's chunks as [text, metadata] pairs.
+        """
+        with self._lock:
+            if self._openparse is None:
+                # imported here so that processes that never parse tables do not load the LLM xpack
+                from pathway.xpacks.llm import parsers
+
+                self._openparse = parsers.OpenParse(table_args=self._table_args(), **self.openparse_kwargs)
+        return [[chunk, dict(metadata)] for chunk, metadata in self._openparse.func(pdf)]
+
+
+# The table parsers of a worker process by fingerprint, so OpenParse is built once per process
+_worker_table_parsers: Dict[str, TableParser] = {}
+
+
+def parse_table_page(table_parser: TableParser, pdf: bytes) -> List[List]:
+    """
+    Parses a page with tables in a worker process of `PageInspector`.
+
+    Args:
+        table_parser (TableParser): The parser; an equal one built earlier in this process is reused.
+        pdf (bytes): The single-page PDF.
+
+    Returns:
+        List[List]: The page's chunks as [text, metadata] pairs.
+    """
+    return _worker_table_parsers.setdefault(table_parser.fingerprint, table_parser).parse(pdf)
+
+
+class PageInspector:
+    """
+    Runs `inspect_range` over page ranges of a document in a process pool.
+
+    Page inspection (text extraction and table finding) is CPU-bound, so a document is split into
+    ranges of `pages_per_range` pages that are inspected in parallel by `workers` processes; the
+    pages are returned in document order. With one worker everything runs in the calling process.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        pages_per_range (int): Number of pages inspected per task.
+        cache_dir (Optional[str]): The parse cache directory.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pages_per_range: int = 4, cache_dir: Optional[str] = None):
+        """
+        Args:
+            workers (Optional[int], optional): Number of worker processes. Defaults to the number of CPUs.
+            pages_per_range (int, optional): Number of pages inspected per task. Defaults to 4.
+            cache_dir (Optional[str], optional): The parse cache directory. Defaults to None.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_range = pages_per_range
+        self.cache_dir = cache_dir
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs Pathway's engine threads is not safe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def inspect(self, contents: bytes) -> List[Dict]:
+        """
+        Args:
+            contents (bytes): The PDF.
+
+        Returns:
+            List[Dict]: The `inspect_range` records of all pages, in page order.
+        """
+        if self.workers <= 1:
+            return inspect_range(contents, 1, self.cache_dir)
+        ranges = split_ranges(contents, self.pages_per_range)
+        if len(ranges) == 1:
+            return inspect_range(contents, 1, self.cache_dir)
+        pool = self._get_pool()
+        futures = [pool.submit(inspect_range, part, first, self.cache_dir) for first, part in ranges]
+        return [page for future in futures for page in future.result()]
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Runs another task, e.g. `parse_table_page`, in the worker processes.
+
+        Args:
+            fn (Callable): A picklable function.
+            *args: Its picklable arguments.
+
+        Returns:
+            Future: The running task.
+        """
+        return self._get_pool().submit(fn, *args)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+class ParseStats:
+    """
+    Counters of the work done and saved by `CachedOpenParse`.
+    """
+
+    FIELDS = (
+        "documents", "documents_reused", "pages", "pages_reused",
+        "pages_text_only", "pages_with_tables", "tables_parsed", "tables_reused",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for field, count in counts.items():
+                self.counts[field] += count
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: The counters, plus `llm_calls_saved` (tables whose LLM parse was reused)
+            and `pages_skipped` (pages that did not go through OpenParse).
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        counts["llm_calls_saved"] = counts["tables_reused"]
+        counts["pages_skipped"] = counts["pages_reused"] + counts["pages_text_only"]
+        return counts
+
+    def report(self) -> str:
+        s = self.snapshot()
+        return (
+            f"{s['documents']} documents ({s['documents_reused']} unchanged), {s['pages']} pages: "
+            f"{s['pages_reused']} reused, {s['pages_text_only']} text only, {s['pages_with_tables']} with tables; "
+            f"{s['tables_parsed']} tables sent to the LLM, {s['llm_calls_saved']} LLM calls saved"
+        )
+
+
+class CachedOpenParse(pw.UDF):
+    """
+    OpenParse with a content-hash parse cache, a text-only fast path and parallel page inspection and table parsing.
+
+    Parse results are stored on disk under the SHA-256 of every document and of every page, so
+    restarting or touching an unchanged file reuses the earlier output, and in a changed document
+    only the changed pages are parsed again. The cache directory is namespaced by a fingerprint of
+    the parser configuration (`table_args`, including the LLM and prompt, and the other OpenParse
+    arguments), so changing it parses the documents again instead of serving stale results.
+
+    Pages are first inspected with PyMuPDF in a process pool (`PageInspector`): pages without
+    tables are indexed with their extracted text, and only pages with tables go through OpenParse
+    and its LLM table parser. The table pages of a document are parsed concurrently: in the same
+    process pool if the `TableParser` can be sent to it (`table_args` given as `OpenAITableArgs`),
+    otherwise in `table_threads` threads of the calling process. Chunks are returned in page
+    order, so the splitter and embedder see the document as before.
+
+    Attributes:
+        cache_dir (Optional[str]): Directory holding the cached parse results of this configuration; None disables the cache.
+        inspector (PageInspector): Process pool inspecting page ranges and, if possible, parsing table pages.
+        table_parser (TableParser): Parses the pages with tables.
+        stats (ParseStats): Pages, tables and LLM calls parsed and saved so far.
+    """
+
+    def __init__(self, table_args: Optional[Union[Dict, Callable[[], Dict]]] = None, cache_dir: Optional[str] = "./parse_cache/",
+                 workers: Optional[int] = None, pages_per_range: int = 4, table_threads: int = 4,
+                 table_parser: Optional[TableParser] = None, **openparse_kwargs):
+        """
+        Args:
+            table_args (Optional[Union[Dict, Callable[[], Dict]]], optional): Table parser arguments passed to
+                `parsers.OpenParse`, or a picklable function building them such as `OpenAITableArgs`.
+            cache_dir (Optional[str], optional): Directory for cached parse results; None disables the cache. Defaults to "./parse_cache/".
+            workers (Optional[int], optional): Processes inspecting page ranges and parsing table pages in parallel. Defaults to the number of CPUs.
+            pages_per_range (int, optional): Number of pages per parallel task. Defaults to 4.
+            table_threads (int, optional): Threads parsing table pages if the table parser cannot run in the processes. Defaults to 4.
+            table_parser (Optional[TableParser], optional): Parser of the table pages to use instead of one built from `table_args`.
+            **openparse_kwargs: Other arguments of `parsers.OpenParse`, e.g. `image_args` or `processing_pipeline`.
+        """
+        super().__init__(deterministic=True)
+        self.table_parser = table_parser or TableParser(table_args, **openparse_kwargs)
+        if cache_dir:
+            cache_dir = os.path.join(cache_dir, self.table_parser.fingerprint)
+            os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.inspector = PageInspector(workers, pages_per_range, cache_dir)
+        self.stats = ParseStats()
+        self._tables_in_pool = self.inspector.workers > 1 and self.table_parser.is_picklable()
+        if not self._tables_in_pool:
+            self._table_threads = ThreadPoolExecutor(max_workers=table_threads, thread_name_prefix="table-parse")
+
+    def _load(self, key: str) -> Optional[Dict]:
+        return load_entry(self.cache_dir, key)
+
+    def _store(self, key: str, entry: Dict) -> None:
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, key + ".json")
+        staged = f"{path}.{threading.get_ident()}.tmp"
+        with open(staged, "w") as f:
+            json.dump(entry, f)
+        os.replace(staged, path)
+
+    def submit_table_page(self, record: Dict) -> Future:
+        """
+        Starts parsing a page with tables that is not in the cache.
+
+        Args:
+            record (Dict): The page as returned by `inspect_range`.
+
+        Returns:
+            Future: The page's chunks as [text, metadata] pairs.
+        """
+        if self._tables_in_pool:
+            return self.inspector.submit(parse_table_page, self.table_parser, record["pdf"])
+        return self._table_threads.submit(self.table_parser.parse, record["pdf"])
+
+    def parse_page(self, record: Dict, table_chunks: Optional[Future] = None) -> Dict:
+        """
+        Parses one page that is not in the cache.
+
+        Args:
+            record (Dict): The page as returned by `inspect_range`.
+            table_chunks (Optional[Future], optional): The parse of a page with tables started by
+                `submit_table_page`; started here if not given.
+
+        Returns:
+            Dict: The page's chunks as [text, metadata] pairs and its number of tables.
+        """
+        if record["tables"]:
+            chunks = (table_chunks or self.submit_table_page(record)).result()
+        else:
+            chunks = [[record["text"], {}]] if record["text"].strip() else []
+        return {"chunks": chunks, "tables": record["tables"]}
+
+    def __wrapped__(self, contents: bytes) -> list[tuple[str, dict]]:
+        doc_key = content_hash(contents)
+        entry = self._load(doc_key)
+        if entry is not None:
+            self.stats.add(documents=1, documents_reused=1, pages=entry["pages"],
+                           pages_reused=entry["pages"], tables_reused=entry["tables"])
+            return [tuple(chunk) for chunk in entry["chunks"]]
+
+        chunks = []
+        tables = 0
+        pages = self.inspector.inspect(contents)
+        # all table pages are parsed at once; the results are collected in page order
+        table_chunks = {record["number"]: self.submit_table_page(record)
+                        for record in pages if record["entry"] is None and record["tables"]}
+        for record in pages:
+            page_entry = record["entry"]
+            if page_entry is not None:
+                self.stats.add(pages=1, pages_reused=1, tables_reused=page_entry["tables"])
+            else:
+                page_entry = self.parse_page(record, table_chunks.get(record["number"]))
+                if page_entry["tables"]:
+                    self.stats.add(pages=1, pages_with_tables=1, tables_parsed=page_entry["tables"])
+                else:
+                    self.stats.add(pages=1, pages_text_only=1)
+                self._store(record["key"], page_entry)
+            # cached pages may have moved within a changed document, so the number is set here
+            chunks.extend([text, {**metadata, "page": record["number"]}] for text, metadata in page_entry["chunks"])
+            tables += page_entry["tables"]
+
+        self._store(doc_key, {"chunks": chunks, "pages": len(pages), "tables": tables})
+        self.stats.add(documents=1)
+        logger.info(f"CachedOpenParse: {self.stats.report()}")
+        return [tuple(chunk) for chunk in chunks]
@@ -0,0 +1,58 @@
+import re
+from typing import List
+
+# Phrases that ask for several things, a comparison, a trend or an explanation
+COMPLEX_MARKERS = re.compile(r"\b(?:" + "|".join((
+    r"compare[ds]?", r"comparison", r"versus", r"vs\.?", r"differ(?:ence|ences|ent)?", r"relative to",
+    r"and how", r"and why", r"and what", r"and its", r"as well as", r"along with", r"both", r"respectively", r"each of",
+    r"why", r"explain", r"analy[sz]e", r"impact", r"affect(?:ed|s)?", r"drivers?", r"caused?",
+    r"trends?", r"over the (?:past|last)", r"since", r"between", r"evolv(?:e|ed)", r"changed?",
+    r"outlook", r"forecast", r"recommend", r"should (?:i|we)", r"pros and cons", r"strateg(?:y|ies)",
+)) + r")\b", re.IGNORECASE)
+
+YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+TICKER = re.compile(r"(?<![\w$])\$?[A-Z]{2,5}\b")
+
+
+def complexity_signals(query: str, max_words: int = 20) -> List[str]:
+    """
+    Args:
+        query (str): The user's question.
+        max_words (int, optional): Longest question still considered simple. Defaults to 20.
+
+    Returns:
+        List[str]: Why the question may need decomposition; empty for a simple question.
+    """
+    signals = []
+    words = query.split()
+    if len(words) > max_words:
+        signals.append("long")
+    if query.count("?") > 1 or ";" in query:
+        signals.append("several questions")
+    marker = COMPLEX_MARKERS.search(query)
+    if marker:
+        signals.append(f"'{marker.group(0).lower()}'")
+    if len(set(YEAR.findall(query))) > 1:
+        signals.append("several years")
+    if len(set(TICKER.findall(query)) - {"I", "US", "USD", "CEO", "CFO", "EPS", "ETF", "GDP", "IPO", "SEC"}) > 1:
+        signals.append("several tickers")
+    if re.search(r"\w, [\w ]+?,? (?:and|or) \w", query):
+        signals.append("list")
+    return signals
+
+
+def is_simple_query(query: str, max_words: int = 20) -> bool:
+    """
+    Cheap local check whether a question can be answered in one step, so its decomposition into
+    subtasks can be skipped. It is conservative: short, single-part factual questions ("What was
+    Apple's revenue in 2023?") are simple; comparisons, explanations, trends, lists and
+    questions about several years or tickers are not.
+
+    Args:
+        query (str): The user's question.
+        max_words (int, optional): Longest question still considered simple. Defaults to 20.
+
+    Returns:
+        bool: Whether the question is simple.
+    """
+    return not complexity_signals(query, max_words)
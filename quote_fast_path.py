@@ -0,0 +1,231 @@
+import re
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Company names and common spellings of frequently asked tickers; extend with `aliases`
+DEFAULT_ALIASES = {
+    "apple": "AAPL", "microsoft": "MSFT", "alphabet": "GOOGL", "google": "GOOGL", "amazon": "AMZN",
+    "nvidia": "NVDA", "meta": "META", "facebook": "META", "tesla": "TSLA", "netflix": "NFLX",
+    "berkshire hathaway": "BRK.B", "berkshire": "BRK.B", "jpmorgan": "JPM", "jp morgan": "JPM",
+    "visa": "V", "mastercard": "MA", "walmart": "WMT", "exxon": "XOM", "exxon mobil": "XOM",
+    "johnson & johnson": "JNJ", "johnson and johnson": "JNJ", "procter & gamble": "PG",
+    "coca cola": "KO", "coca-cola": "KO", "pepsi": "PEP", "pepsico": "PEP", "intel": "INTC", "amd": "AMD",
+    "oracle": "ORCL", "salesforce": "CRM", "adobe": "ADBE", "ibm": "IBM", "disney": "DIS", "boeing": "BA",
+    "goldman sachs": "GS", "morgan stanley": "MS", "bank of america": "BAC", "citigroup": "C",
+    "wells fargo": "WFC", "paypal": "PYPL", "uber": "UBER", "airbnb": "ABNB", "broadcom": "AVGO",
+    "qualcomm": "QCOM", "costco": "COST", "mcdonalds": "MCD", "mcdonald's": "MCD", "nike": "NKE",
+    "starbucks": "SBUX", "pfizer": "PFE", "moderna": "MRNA", "chevron": "CVX", "at&t": "T", "verizon": "VZ",
+}
+
+# The company or ticker slot of a quote question
+_NAME = r"(?P<name>\$?[a-z0-9][a-z0-9.&'\- ]{0,40}?)"
+_STOCK = r"(?: (?:stock|shares?|share price|stock price|equity))?"
+_NOW = r"(?: (?:today|now|right now|currently|at the moment))?"
+# Templates that would also match product and fare questions ("how much does netflix cost",
+# "visa price") need a stock word, a share count or a ticker with a dollar sign
+_STOCK_WORD = r" (?:stock|shares?|share price|stock price|equity)"
+_DOLLAR_TICKER = r"(?P<name>\$[a-z][a-z.]{0,6})"
+
+# Whole-question templates; anything else (history, comparisons, why/how questions) is not a quote.
+# "worth" and "value of" are left out: they ask for valuations or constants ("the value of PI")
+QUOTE_TEMPLATES = [re.compile("^" + template + "$") for template in (
+    r"(?:what(?:'s| is)|whats|tell me|give me|show me|get me)(?: the)?(?: current| latest| live| today's)?(?: stock| share)? (?:price|quote) (?:of|for|on) " + _NAME + _STOCK + _NOW,
+    r"(?:what(?:'s| is| are)|whats|where(?:'s| is| are)) " + _NAME + _STOCK + r" (?:trading|priced|quoted) at" + _NOW,
+    r"(?:what(?:'s| is| are)|whats)(?: the)? " + _NAME + _STOCK + r" (?:price|quote|share price|stock price)" + _NOW,
+    r"how much (?:is|are|does) (?:one|a) share of " + _NAME + _STOCK + r"(?: cost| trading at| going for)?" + _NOW,
+    r"how much (?:is|are|does) " + _NAME + _STOCK_WORD + r"(?: cost| trading at| going for)?" + _NOW,
+    r"how much (?:is|are|does) " + _DOLLAR_TICKER + _STOCK + r"(?: cost| trading at| going for)?" + _NOW,
+    r"(?:current |latest |live )?(?:stock |share )?(?:price|quote) (?:of|for|on) " + _NAME + _STOCK + _NOW,
+    r"" + _NAME + r" (?:stock|share) (?:price|quote)" + _NOW,
+    r"" + _DOLLAR_TICKER + r"(?: (?:stock|share))? (?:price|quote)" + _NOW,
+)]
+
+_TICKER = re.compile(r"^\$?([A-Z]{1,5}(?:\.[A-Z])?)$")
+_SUFFIXES = re.compile(r"(?:'s|,? (?:inc|incorporated|corp|corporation|co|company|ltd|plc|group|holdings)\.?)+$")
+
+
+def quote_name(question: str) -> Optional[str]:
+    """
+    Detects a quote question by matching the whole question against `QUOTE_TEMPLATES`.
+
+    Args:
+        question (str): The question.
+
+    Returns:
+        Optional[str]: The company or ticker slot, lowercased, or None if the question is not a
+        quote question.
+    """
+    text = re.sub(r"\s+", " ", question).strip().rstrip("?!. ").lower()
+    for template in QUOTE_TEMPLATES:
+        match = template.match(text)
+        if match:
+            return match.group("name").strip()
+    return None
+
+
+class TickerResolver:
+    """
+    Resolves the company slot of a quote question to a ticker, without any API call.
+
+    A name is resolved through the alias table (company names), or taken as a ticker if it is
+    written with a dollar sign (`$aapl`, `$BRK.B`) or is the ticker of a known company (`AAPL`,
+    `aapl`). Other capitalized words (`IT`, `PI`, `A`) are not taken for tickers, and anything
+    else is left unresolved, so the question goes through the full pipeline.
+
+    Attributes:
+        aliases (Dict[str, str]): Lowercased company names and their tickers.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            aliases (Optional[Dict[str, str]], optional): Company names and their tickers, added to `DEFAULT_ALIASES`.
+        """
+        self.aliases = {**DEFAULT_ALIASES, **{name.lower(): ticker.upper() for name, ticker in (aliases or {}).items()}}
+        self.tickers = set(self.aliases.values())
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        Args:
+            name (str): The lowercased company or ticker slot.
+
+        Returns:
+            Optional[str]: The ticker, or None if the name is not known.
+        """
+        name = _SUFFIXES.sub("", name.strip()).strip()
+        if name.startswith("$"):
+            return name[1:].upper() if _TICKER.match(name[1:].upper()) else None
+        if name in self.aliases:
+            return self.aliases[name]
+        # tickers without a dollar sign, in any case, only of known companies
+        if name.upper() in self.tickers:
+            return name.upper()
+        return None
+
+
+class QuoteCache:
+    """
+    Short-lived cache of stock price answers by ticker.
+
+    A quote is fetched at most once per ticker within `ttl` seconds; concurrent requests for the
+    same ticker wait for one fetch. Empty answers are cached as well, so a ticker without an
+    answer box does not cost a search per question.
+
+    Attributes:
+        fetch (Callable[[str], List[str]]): Returns the stock price lines of a ticker.
+        ttl (float): Seconds a quote is served from the cache.
+    """
+
+    def __init__(self, fetch: Callable[[str], List[str]], ttl: float = 30.0):
+        """
+        Args:
+            fetch (Callable[[str], List[str]]): Returns the stock price lines of a ticker, e.g. through `ContentScraper.get_stock_price`.
+            ttl (float, optional): Seconds a quote is served from the cache. Defaults to 30.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, List[str]]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "misses": 0}
+
+    def get(self, ticker: str) -> Tuple[List[str], float]:
+        """
+        Args:
+            ticker (str): The ticker.
+
+        Returns:
+            Tuple[List[str], float]: The stock price lines and the time they were fetched.
+        """
+        with self._lock:
+            ticker_lock = self._locks.setdefault(ticker, threading.Lock())
+        with ticker_lock:
+            entry = self._entries.get(ticker)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                with self._lock:
+                    self.counts["hits"] += 1
+                return entry[1], entry[0]
+            with self._lock:
+                self.counts["misses"] += 1
+            lines = list(self.fetch(ticker))
+            fetched_at = time.time()
+            self._entries[ticker] = (fetched_at, lines)
+            return lines, fetched_at
+
+
+class QuoteFastPath:
+    """
+    Answers quote questions ("what is AAPL trading at") without the agent pipeline.
+
+    The question is matched against quote templates locally, the company is resolved to a ticker
+    with `TickerResolver`, and the price comes from a `QuoteCache` fed by
+    `ContentScraper.get_stock_price`. No LLM is called: a cached quote is answered in well under
+    a millisecond, an uncached one costs one SERP API search. Questions that do not match a
+    template, name an unknown company or get no price fall through to the full pipeline.
+
+    Only questions that consist of a quote template and a company name are answered, so the
+    guardrail check can be skipped for them.
+
+    Attributes:
+        resolver (TickerResolver): Resolves company names to tickers.
+        cache (QuoteCache): The quote cache.
+        counts (Dict[str, int]): Questions answered and fallen through, by reason.
+    """
+
+    def __init__(self, scraper, ttl: float = 30.0, aliases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            scraper (ContentScraper): Scraper whose `get_stock_price` feeds the cache.
+            ttl (float, optional): Seconds a quote is served from the cache. Defaults to 30.
+            aliases (Optional[Dict[str, str]], optional): Additional company names and tickers. Defaults to None.
+        """
+        self.resolver = TickerResolver(aliases)
+        self.cache = QuoteCache(lambda ticker: scraper.get_stock_price(f"{ticker} stock price"), ttl=ttl)
+        self.counts = {"answered": 0, "not_quote": 0, "unknown_ticker": 0, "no_price": 0}
+
+    def answer(self, question: str) -> Optional[str]:
+        """
+        Args:
+            question (str): The user's question.
+
+        Returns:
+            Optional[str]: The quote answer, or None if the question needs the full pipeline.
+        """
+        name = quote_name(question)
+        if name is None:
+            self.counts["not_quote"] += 1
+            return None
+        ticker = self.resolver.resolve(name)
+        if ticker is None:
+            self.counts["unknown_ticker"] += 1
+            return None
+        lines, fetched_at = self.cache.get(ticker)
+        if not lines:
+            self.counts["no_price"] += 1
+            return None
+        self.counts["answered"] += 1
+        return format_quote(ticker, lines, fetched_at)
+
+    def metrics(self) -> Dict:
+        """
+        Returns:
+            Dict: The answer counts and the cache hits and misses.
+        """
+        return {**self.counts, **self.cache.counts}
+
+
+def format_quote(ticker: str, lines: List[str], fetched_at: float) -> str:
+    """
+    Args:
+        ticker (str): The ticker.
+        lines (List[str]): The stock price lines of `ContentScraper.get_stock_price`.
+        fetched_at (float): When the lines were fetched.
+
+    Returns:
+        str: The price sentence, other details of the answer box, and the time of the quote.
+    """
+    lines = [str(line).strip() for line in lines if str(line).strip()]
+    # the formatted price sentence comes last; show it first
+    lines = lines[-1:] + lines[:-1]
+    return "{} ({}, as of {}).".format(" ".join(lines).rstrip("."), ticker, time.strftime("%H:%M:%S", time.localtime(fetched_at)))
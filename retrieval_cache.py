@@ -0,0 +1,158 @@
+import re
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_query(query: str) -> str:
+    """
+    Args:
+        query (str): A retrieval query.
+
+    Returns:
+        str: The query lowercased, with surrounding punctuation dropped and whitespace collapsed.
+    """
+    return re.sub(r"\s+", " ", query).strip().strip("?!.,;:").strip().lower()
+
+
+class CachedRAGClient:
+    """
+    `RAGClient` with an LRU cache of retrieval results in front of `retrieve`.
+
+    Results are keyed by the normalized query and the retrieval parameters, and tagged with the
+    version of the index: the file count and the last modification and indexing times reported by
+    the server's statistics. When Pathway ingests, changes or removes a document the version
+    changes and older entries are no longer served. A hit saves the embedding API call of the
+    query and the KNN search on the server; checking the version is a statistics request, which
+    needs neither, and can be skipped for `version_ttl` seconds. If the client routes queries to
+    collections (`ShardedRAGClient.route`), only the version of the collections a query is routed
+    to is checked, so a routed question asks one server rather than all of them.
+
+    The statistics change when a document is parsed, which is before its chunks are embedded, so
+    results are not cached within `settle_time` seconds of the last indexing.
+
+    Other `RAGClient` methods are passed through.
+
+    Attributes:
+        client (RAGClient): The wrapped client.
+        max_entries (int): Maximum number of cached results.
+        version_ttl (float): Seconds the index version is reused before asking the server again.
+        settle_time (float): Seconds after the last indexing during which results are not cached.
+    """
+
+    def __init__(self, client, max_entries: int = 1024, version_ttl: float = 0.0, settle_time: float = 5.0):
+        """
+        Args:
+            client (RAGClient): The client to wrap.
+            max_entries (int, optional): Maximum number of cached results. Defaults to 1024.
+            version_ttl (float, optional): Seconds the index version is reused; 0 checks it on every call. Defaults to 0.
+            settle_time (float, optional): Seconds after the last indexing during which results are not cached. Defaults to 5.
+        """
+        self.client = client
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.settle_time = settle_time
+        self._entries: "OrderedDict[Tuple, Tuple[Tuple, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # collections (None for the whole index) -> (version, time checked)
+        self._versions: Dict[Optional[Tuple[str, ...]], Tuple[Tuple, float]] = {}
+        self.counts = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "uncached": 0}
+
+    def __getattr__(self, name):
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def index_version(self, refresh: bool = False, collections: Optional[Tuple[str, ...]] = None) -> Tuple:
+        """
+        Args:
+            refresh (bool, optional): Ask the server even within `version_ttl`. Defaults to False.
+            collections (Optional[Tuple[str, ...]], optional): Collections of a `ShardedRAGClient`
+                to check. Defaults to None, the whole index.
+
+        Returns:
+            Tuple: The file count, last modification and last indexing time of the index.
+        """
+        now = time.monotonic()
+        with self._lock:
+            checked = self._versions.get(collections)
+            if not refresh and checked is not None and now - checked[1] < self.version_ttl:
+                return checked[0]
+        stats = self.client.statistics(collections=list(collections)) if collections else self.client.statistics()
+        version = (stats.get("file_count"), stats.get("last_modified"), stats.get("last_indexed"))
+        with self._lock:
+            self._versions[collections] = (version, now)
+        return version
+
+    def _settled(self, version: Tuple) -> bool:
+        last_indexed = version[2]
+        return last_indexed is None or time.time() - last_indexed >= self.settle_time
+
+    def retrieve(self, query: str, k: int = 3, metadata_filter: Optional[str] = None,
+                 filepath_globpattern: Optional[str] = None, **kwargs) -> List[Dict]:
+        """
+        Same as `RAGClient.retrieve`, served from the cache when the index has not changed.
+
+        Args:
+            query (str): The query.
+            k (int, optional): Number of documents. Defaults to 3.
+            metadata_filter (Optional[str], optional): JMESPath metadata filter. Defaults to None.
+            filepath_globpattern (Optional[str], optional): Glob pattern of file paths. Defaults to None.
+            **kwargs: Other arguments of the wrapped client, e.g. `collections` of `ShardedRAGClient`.
+
+        Returns:
+            List[Dict]: The retrieved documents with their text, metadata and distance.
+        """
+        key = (normalize_query(query), k, metadata_filter, filepath_globpattern, repr(sorted(kwargs.items())))
+        collections = None
+        if hasattr(self.client, "route"):
+            # route once here; the client then searches the collections whose version was checked
+            collections = tuple(self.client.route(query, metadata_filter, filepath_globpattern, kwargs.pop("collections", None)))
+            kwargs["collections"] = list(collections)
+        version = self.index_version(collections=collections)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.counts["hits"] += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._entries[key]
+                self.counts["stale"] += 1
+            self.counts["misses"] += 1
+
+        docs = self.client.retrieve(query, k=k, metadata_filter=metadata_filter, filepath_globpattern=filepath_globpattern, **kwargs)
+        if not self._settled(version):
+            with self._lock:
+                self.counts["uncached"] += 1
+            return docs
+        with self._lock:
+            self._entries[key] = (version, copy.deepcopy(docs))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counts["evictions"] += 1
+        return docs
+
+    def invalidate(self) -> None:
+        """
+        Drops all cached results and forces a version check on the next call.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def metrics(self) -> Dict:
+        """
+        Returns:
+            Dict: Hits, misses, stale entries dropped, evictions, results not cached while the index
+            settled, the hit rate and the number of cached entries.
+        """
+        with self._lock:
+            counts = dict(self.counts)
+            counts["entries"] = len(self._entries)
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        return counts
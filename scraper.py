@@ -2,9 +2,16 @@ import requests
 from bs4 import BeautifulSoup
 import os
 from serpapi.google_search import GoogleSearch as search
+from serpapi.google_search import AsyncGoogleSearch as async_search
 import os
+import time
+import asyncio
 import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Any, Dict, List, Optional
+from passages import PassageRanker, select_passages
+from domain_stats import DomainStats
 
 class ContentScraper:
     
@@ -13,39 +20,59 @@ class ContentScraper:
 
     Attributes:
         serp_api_key (str): The API key to authenticate requests to the SERP API.
+        passage_ranker (PassageRanker): BM25 ranker used to keep the passages relevant to a subtask.
+        domain_stats (DomainStats): Per-domain latency, failure and content statistics used to skip, time out and order fetches.
     """
+
+    # Only these top-level keys of the SERP API responses are decoded
+    SEARCH_KEYS = ("knowledge_graph", "related_questions", "ai_overview")
+    STOCK_KEYS = ("answer_box",)
+
+    # At most PASSAGE_K passages and CHAR_BUDGET characters of every scraped page are kept
+    PASSAGE_K = 3
+    CHAR_BUDGET = 800
+    # Pages with less paragraph text than this count as not useful in the domain statistics
+    MIN_USEFUL_CHARS = 200
     
-    def __init__(self, serp_api_key):
+    def __init__(self, serp_api_key, domain_stats=None):
         """
         Initializes the ContentScraper with a SERP API key.
 
         Args:
             serp_api_key (str): The API key used to authenticate requests to the SERP API.
+            domain_stats (DomainStats, optional): Per-domain fetch statistics. Defaults to statistics persisted in ./domain_stats.json.
         """
         self.serp_api_key = serp_api_key
+        self.passage_ranker = PassageRanker()
+        self.domain_stats = domain_stats if domain_stats is not None else DomainStats()
         
 
-    def scrape_content(self, url):
+    def scrape_content(self, url, query=None):
         """
         Scrapes and extracts the textual content from a webpage.
 
         Args:
             url (str): The URL of the webpage to scrape.
+            query (str, optional): The subtask the content is fetched for. If given, only the passages
+                most relevant to it are kept instead of the start of the page.
 
         Returns:
-            str: The first 800 characters of the webpage's content if successful.
+            str: Up to `CHAR_BUDGET` characters of the webpage's content if successful.
             None: If the request fails or the webpage content cannot be retrieved.
         """
         
+        start = time.monotonic()
         try:
-            response = requests.get(url)
+            response = requests.get(url, timeout=self.domain_stats.timeout_for(url))
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
-            paragraphs = soup.find_all('p')
-            content = ' '.join(paragraph.text for paragraph in paragraphs)
-            return content[:800]
+            paragraphs = [paragraph.text for paragraph in soup.find_all('p')]
         except requests.RequestException:
+            self.domain_stats.record(url, time.monotonic() - start, ok=False, useful=False)
             return None
+        useful = sum(len(paragraph.strip()) for paragraph in paragraphs) >= self.MIN_USEFUL_CHARS
+        self.domain_stats.record(url, time.monotonic() - start, ok=True, useful=useful)
+        return select_passages(query, paragraphs, self.PASSAGE_K, self.CHAR_BUDGET, self.passage_ranker)
 
     def search_google(self, query):
         """
@@ -60,14 +87,43 @@ class ContentScraper:
                 - list: A list of text snippets from the AI overview section of the search results.
         """
         
-        params = {
+        store = search(self._search_params(query)).get_dict_keys(self.SEARCH_KEYS)
+        return self._parse_search_results(store)
+
+    async def async_search_google(self, query):
+        """
+        Asynchronous counterpart of `search_google`, using the shared asyncio SERP API session.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            tuple: Same as `search_google`.
+        """
+        
+        store = await async_search(self._search_params(query)).get_dict_keys(self.SEARCH_KEYS)
+        return self._parse_search_results(store)
+
+    def _search_params(self, query):
+        """
+        Builds the SERP API parameters for the Google Finance search used by `search_google`.
+        """
+        return {
             "engine": "google_finance",
             "q": query,
             "api_key": self.serp_api_key
         }
 
-        store = search(params).get_dict()
+    def _parse_search_results(self, store):
+        """
+        Extracts sources, descriptions and AI overview snippets from a SERP API response.
+
+        Args:
+            store (dict): The SERP API response.
 
+        Returns:
+            tuple: Same as `search_google`.
+        """
         source_description_list = []
 
         if 'knowledge_graph' in store and store['knowledge_graph'] is not None:
@@ -99,12 +155,16 @@ class ContentScraper:
 
         return source_description_list, ai_overview_context
 
-    def get_content_from_urls(self, source_description_list):
+    def get_content_from_urls(self, source_description_list, query=None):
         """
         Fetches and compiles content from a list of URLs.
 
+        URLs of domains that rarely yield content are skipped, and the rest are fetched in order
+        of expected value according to `domain_stats`, which is saved afterwards.
+
         Args:
             source_description_list (list): A list of dictionaries containing source URLs and their descriptions.
+            query (str, optional): The subtask the content is fetched for, used to select relevant passages.
 
         Returns:
             tuple:
@@ -112,16 +172,17 @@ class ContentScraper:
                 - list: A list of content strings from the URLs.
         """
         
-        urls = [item["source"] for item in source_description_list]
+        urls = self.domain_stats.order([item["source"] for item in source_description_list if isinstance(item["source"], str) and item["source"]])
         all_content = []
         context = []
 
         for url in urls:
-            content = self.scrape_content(url)
+            content = self.scrape_content(url, query)
             if content:
                 all_content.append({"url": url, "content": content})
                 context.append(content)
 
+        self.domain_stats.save()
         return all_content, context
     
     def get_stock_price(self, query):
@@ -129,13 +190,30 @@ class ContentScraper:
         Gets stock price information if present in the store dictionary.
         Returns a list containing a formatted statement with stock price information.
         """
-        params = {
+        store = search(self._stock_params(query)).get_dict_keys(self.STOCK_KEYS)
+        return self._parse_stock_price(store)
+
+    async def async_get_stock_price(self, query):
+        """
+        Asynchronous counterpart of `get_stock_price`, using the shared asyncio SERP API session.
+        """
+        store = await async_search(self._stock_params(query)).get_dict_keys(self.STOCK_KEYS)
+        return self._parse_stock_price(store)
+
+    def _stock_params(self, query):
+        """
+        Builds the SERP API parameters for the Google search used by `get_stock_price`.
+        """
+        return {
             "engine": "google",
             "q": query,
             "api_key": self.serp_api_key
         }
 
-        store = search(params).get_dict()
+    def _parse_stock_price(self, store):
+        """
+        Formats the stock price information found in the answer box of a SERP API response.
+        """
         stock_info = []
         if "answer_box" in store and store["answer_box"]:
             answer_box = store["answer_box"]
@@ -158,6 +236,41 @@ class ContentScraper:
         # Return empty list if stock price information is not found
         return stock_info
 
+    async def async_search_all(self, queries):
+        """
+        Runs the finance search and the stock price search for every query concurrently.
+
+        Args:
+            queries (list): The search queries, e.g. all subtasks of a question. Empty queries are skipped.
+
+        Returns:
+            list: One `(source_description_list, ai_overview_context, stock_info)` tuple per query, in the same order.
+        """
+
+        async def run(query):
+            if not query:
+                return [], [], []
+            (source_description_list, ai_overview_context), stock_info = await asyncio.gather(
+                self.async_search_google(query), self.async_get_stock_price(query)
+            )
+            return source_description_list, ai_overview_context, stock_info
+
+        return list(await asyncio.gather(*(run(query) for query in queries)))
+
+    def search_all(self, queries):
+        """
+        Synchronous entry point for `async_search_all`. Runs on a fresh event loop and closes
+        that loop's SERP API session afterwards; searches running in other threads keep theirs.
+        """
+
+        async def run():
+            try:
+                return await self.async_search_all(queries)
+            finally:
+                await async_search.close()
+
+        return asyncio.run(run())
+
 
 
 
@@ -166,16 +279,25 @@ class GoogleSerperAPI:
     A Python client for interacting with the Serper.dev API to perform Google searches 
     and retrieve search results.
 
+    A single instance keeps one pooled `requests.Session` and one `aiohttp.ClientSession`
+    alive for its whole lifetime, so repeated searches reuse open HTTPS connections.
+
     Attributes:
         api_key (str): The API key used to authenticate with the Serper.dev API.
         k (int): The number of search results to retrieve. Defaults to 10.
         gl (str): Geolocation of the search. Defaults to "us" (United States).
         hl (str): Language of the search results. Defaults to "en" (English).
         search_type (str): The type of search to perform (e.g., "search", "images"). Defaults to "search".
+        pool_size (int): Maximum number of pooled connections kept open to Serper.dev. Defaults to 10.
+        base_url (str): Root URL of the Serper.dev API. Defaults to "https://google.serper.dev".
         initialised (bool): Indicates whether the instance is initialized with an API key.
     """
+
+    # HTTP statuses of a batch request that single-query requests can still succeed after:
+    # a malformed or too large batch payload, or an endpoint without batch support
+    BATCH_REJECTED_STATUSES = (400, 404, 405, 413, 422)
     
-    def __init__(self, api_key: Optional[str] = None, k: int = 10, gl: str = "us", hl: str = "en", search_type: str = "search"):
+    def __init__(self, api_key: Optional[str] = None, k: int = 10, gl: str = "us", hl: str = "en", search_type: str = "search", pool_size: int = 10, base_url: str = "https://google.serper.dev"):
         """
         Initializes the GoogleSerperAPI class with the provided API key and search configuration.
 
@@ -185,6 +307,8 @@ class GoogleSerperAPI:
             gl (str, optional): Geolocation for the search. Defaults to "us".
             hl (str, optional): Language for the search results. Defaults to "en".
             search_type (str, optional): Type of search (e.g., "search", "images"). Defaults to "search".
+            pool_size (int, optional): Maximum number of pooled connections. Defaults to 10.
+            base_url (str, optional): Root URL of the API, e.g. a local stand-in server. Defaults to "https://google.serper.dev".
 
         Raises:
             ValueError: If the API key is not provided or available in the environment variables.
@@ -196,8 +320,91 @@ class GoogleSerperAPI:
         self.gl = gl
         self.hl = hl
         self.search_type = search_type
+        self.pool_size = pool_size
+        self.base_url = base_url.rstrip("/")
+
+        self.session = requests.Session()
+        self.session.headers.update(self._headers())
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._async_session = None
+        self._async_loop = None
+
         self.initialised = True
 
+    def _headers(self) -> Dict[str, str]:
+        """
+        Builds the headers sent with every request to the Serper.dev API.
+
+        Returns:
+            Dict[str, str]: The authentication and content-type headers.
+        """
+        return {
+            "X-API-KEY": self.api_key,
+            "Content-Type": "application/json",
+        }
+
+    def _url(self) -> str:
+        """
+        Returns:
+            str: The Serper.dev endpoint for the configured search type.
+        """
+        return f"{self.base_url}/{self.search_type}"
+
+    def _build_params(self, search_term: str, **kwargs: Any) -> Dict:
+        """
+        Builds the JSON payload for a single search query.
+
+        Args:
+            search_term (str): The search query.
+            **kwargs: Additional parameters for the search request.
+
+        Returns:
+            Dict: The payload for the Serper.dev API.
+        """
+        return {
+            "q": search_term,
+            "gl": self.gl,
+            "hl": self.hl,
+            "num": self.k,
+            **kwargs,
+        }
+
+    async def _get_async_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the long-lived `aiohttp.ClientSession`, creating it on first use.
+
+        The session is recreated if it was closed or belongs to a different event loop
+        (e.g. after a previous `asyncio.run`).
+
+        Returns:
+            aiohttp.ClientSession: The pooled asynchronous session.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._async_session
+        if session is None or session.closed or self._async_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            session = aiohttp.ClientSession(headers=self._headers(), connector=connector)
+            self._async_session = session
+            self._async_loop = loop
+        return session
+
+    def close(self) -> None:
+        """
+        Closes the pooled synchronous session.
+        """
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled asynchronous session, if one was opened.
+        """
+        if self._async_session is not None and not self._async_session.closed:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_loop = None
+
     def _make_request(self, search_term: str, **kwargs: Any) -> Dict:
         """
         Makes a synchronous HTTP POST request to the Serper.dev API.
@@ -213,19 +420,8 @@ class GoogleSerperAPI:
             requests.HTTPError: If the request fails.
         """
         
-        headers = {
-            "X-API-KEY": self.api_key,
-            "Content-Type": "application/json",
-        }
-        url = f"https://google.serper.dev/{self.search_type}"
-        params = {
-            "q": search_term,
-            "gl": self.gl,
-            "hl": self.hl,
-            "num": self.k,
-            **kwargs,
-        }
-        response = requests.post(url, headers=headers, json=params)
+        params = self._build_params(search_term, **kwargs)
+        response = self.session.post(self._url(), json=params)
         response.raise_for_status()
         return response.json()
 
@@ -244,22 +440,61 @@ class GoogleSerperAPI:
             aiohttp.ClientResponseError: If the request fails.
         """
         
-        headers = {
-            "X-API-KEY": self.api_key,
-            "Content-Type": "application/json",
-        }
-        url = f"https://google.serper.dev/{self.search_type}"
-        params = {
-            "q": search_term,
-            "gl": self.gl,
-            "hl": self.hl,
-            "num": self.k,
-            **kwargs,
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=params, headers=headers) as response:
-                response.raise_for_status()
-                return await response.json()
+        params = self._build_params(search_term, **kwargs)
+        session = await self._get_async_session()
+        async with session.post(self._url(), json=params) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    def _make_batch_request(self, search_terms: List[str], **kwargs: Any) -> List[Dict]:
+        """
+        Sends several queries in one HTTP POST request using Serper's batch payload
+        (a JSON list of query objects).
+
+        Args:
+            search_terms (List[str]): The search queries.
+            **kwargs: Additional parameters applied to every query.
+
+        Returns:
+            List[Dict]: One JSON response per query, in the same order.
+
+        Raises:
+            requests.HTTPError: If the request fails.
+            ValueError: If the response is not a list with one result per query.
+        """
+        
+        payload = [self._build_params(term, **kwargs) for term in search_terms]
+        response = self.session.post(self._url(), json=payload)
+        response.raise_for_status()
+        results = response.json()
+        if not isinstance(results, list) or len(results) != len(search_terms):
+            raise ValueError("Serper.dev did not return one result per batched query.")
+        return results
+
+    async def _make_async_batch_request(self, search_terms: List[str], **kwargs: Any) -> List[Dict]:
+        """
+        Asynchronous counterpart of `_make_batch_request`.
+
+        Args:
+            search_terms (List[str]): The search queries.
+            **kwargs: Additional parameters applied to every query.
+
+        Returns:
+            List[Dict]: One JSON response per query, in the same order.
+
+        Raises:
+            aiohttp.ClientResponseError: If the request fails.
+            ValueError: If the response is not a list with one result per query.
+        """
+        
+        payload = [self._build_params(term, **kwargs) for term in search_terms]
+        session = await self._get_async_session()
+        async with session.post(self._url(), json=payload) as response:
+            response.raise_for_status()
+            results = await response.json()
+        if not isinstance(results, list) or len(results) != len(search_terms):
+            raise ValueError("Serper.dev did not return one result per batched query.")
+        return results
 
     def get_results(self, query: str, **kwargs: Any) -> Dict:
         """
@@ -287,6 +522,56 @@ class GoogleSerperAPI:
         """
         return await self._make_async_request(query, **kwargs)
 
+    def get_batch_results(self, queries: List[str], **kwargs: Any) -> List[Dict]:
+        """
+        Retrieves search results for several queries at once.
+
+        The queries are sent in a single batch request. If the endpoint rejects the batch
+        (`BATCH_REJECTED_STATUSES`) or does not return one result per query, the queries are sent
+        concurrently over the pooled session instead. Other errors (authentication, rate limits,
+        timeouts, server errors) would fail the single requests as well and are raised.
+
+        Args:
+            queries (List[str]): The search queries.
+            **kwargs: Additional parameters for the search requests.
+
+        Returns:
+            List[Dict]: One JSON response per query, in the same order.
+        """
+        if len(queries) == 1:
+            return [self._make_request(queries[0], **kwargs)]
+        try:
+            return self._make_batch_request(queries, **kwargs)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in self.BATCH_REJECTED_STATUSES:
+                raise
+        except ValueError:
+            pass
+        with ThreadPoolExecutor(max_workers=min(len(queries), self.pool_size)) as executor:
+            return list(executor.map(lambda query: self._make_request(query, **kwargs), queries))
+
+    async def get_async_batch_results(self, queries: List[str], **kwargs: Any) -> List[Dict]:
+        """
+        Asynchronously retrieves search results for several queries at once.
+
+        Args:
+            queries (List[str]): The search queries.
+            **kwargs: Additional parameters for the search requests.
+
+        Returns:
+            List[Dict]: One JSON response per query, in the same order.
+        """
+        if len(queries) == 1:
+            return [await self._make_async_request(queries[0], **kwargs)]
+        try:
+            return await self._make_async_batch_request(queries, **kwargs)
+        except aiohttp.ClientResponseError as e:
+            if e.status not in self.BATCH_REJECTED_STATUSES:
+                raise
+        except ValueError:
+            pass
+        return list(await asyncio.gather(*(self._make_async_request(query, **kwargs) for query in queries)))
+
     def parse_snippets(self, results: Dict) -> List[str]:
         """
         Extracts search result snippets from the JSON response.
@@ -304,6 +589,18 @@ class GoogleSerperAPI:
                     snippets.append(item["snippet"])
         return snippets or ["No good results found."]
 
+    def parse_links(self, results: Dict) -> List[str]:
+        """
+        Extracts the URLs of the search results whose snippets `parse_snippets` returns.
+
+        Args:
+            results (Dict): The JSON response from the Serper.dev API.
+
+        Returns:
+            List[str]: The result URLs, in rank order.
+        """
+        return [item["link"] for item in results.get("organic", [])[:self.k] if "snippet" in item and item.get("link")]
+
     def search(self, query: str, **kwargs: Any) -> str:
         """
         Performs a synchronous search and returns concatenated search result snippets.
@@ -331,3 +628,36 @@ class GoogleSerperAPI:
         """
         results = await self.get_async_results(query, **kwargs)
         return " ".join(self.parse_snippets(results))
+
+    def batch_search(self, queries: List[str], **kwargs: Any) -> List[str]:
+        """
+        Performs several searches in one round trip and returns the concatenated snippets per query.
+
+        Empty queries are not sent and yield an empty string.
+
+        Args:
+            queries (List[str]): The search queries.
+            **kwargs: Additional parameters for the search requests.
+
+        Returns:
+            List[str]: Concatenated search result snippets for each query, in the same order.
+        """
+        non_empty = [query for query in queries if query]
+        results = iter(self.get_batch_results(non_empty, **kwargs) if non_empty else [])
+        return [" ".join(self.parse_snippets(next(results))) if query else "" for query in queries]
+
+    async def async_batch_search(self, queries: List[str], **kwargs: Any) -> List[str]:
+        """
+        Asynchronously performs several searches in one round trip and returns the
+        concatenated snippets per query.
+
+        Args:
+            queries (List[str]): The search queries.
+            **kwargs: Additional parameters for the search requests.
+
+        Returns:
+            List[str]: Concatenated search result snippets for each query, in the same order.
+        """
+        non_empty = [query for query in queries if query]
+        results = iter(await self.get_async_batch_results(non_empty, **kwargs) if non_empty else [])
+        return [" ".join(self.parse_snippets(next(results))) if query else "" for query in queries]
@@ -0,0 +1,475 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class SearchProviderError(Exception):
+    """
+    Raised when no search provider returned a usable result.
+    """
+    pass
+
+
+class ProviderHealth:
+    """
+    Rolling latency and error statistics of a search provider.
+
+    Attributes:
+        window (int): Number of most recent calls taken into account.
+    """
+
+    def __init__(self, window: int = 50):
+        """
+        Initializes an empty rolling window.
+
+        Args:
+            window (int, optional): Number of most recent calls to keep. Defaults to 50.
+        """
+        self.window = window
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        """
+        Records the outcome of one call.
+
+        Args:
+            latency (float): Duration of the call in seconds.
+            ok (bool): Whether the call returned a usable result.
+        """
+        with self._lock:
+            self._calls.append((latency, ok))
+
+    def error_rate(self) -> float:
+        """
+        Returns:
+            float: Share of failed calls in the window, 0.0 if there were no calls.
+        """
+        with self._lock:
+            calls = list(self._calls)
+        if not calls:
+            return 0.0
+        return sum(1 for _, ok in calls if not ok) / len(calls)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Args:
+            percentile (float): Percentile between 0 and 100.
+
+        Returns:
+            Optional[float]: Latency percentile of successful calls in seconds, or None if there were none.
+        """
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(percentile / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            Dict: Number of calls, error rate and p50/p95 latency.
+        """
+        with self._lock:
+            calls = len(self._calls)
+        return {
+            "calls": calls,
+            "error_rate": self.error_rate(),
+            "p50_latency": self.latency_percentile(50),
+            "p95_latency": self.latency_percentile(95),
+        }
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops sending traffic to a failing provider.
+
+    The breaker opens after `failure_threshold` consecutive failures, or when the rolling error
+    rate reaches `error_rate_threshold`. After `reset_timeout` seconds it lets one trial call
+    through (half-open) and closes again if that call succeeds.
+
+    `is_available` only reads the state, so providers can be ranked without side effects;
+    `acquire` is called when a call is really sent and takes the half-open trial slot.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, error_rate_threshold: float = 0.5, min_calls: int = 10, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open the breaker. Defaults to 3.
+            error_rate_threshold (float, optional): Rolling error rate that opens the breaker. Defaults to 0.5.
+            min_calls (int, optional): Calls needed before the error rate is taken into account. Defaults to 10.
+            reset_timeout (float, optional): Seconds to wait before a trial call. Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """
+        Returns:
+            bool: Whether a call could be sent to the provider now: the breaker is closed, or open
+            for longer than `reset_timeout` so that a trial call is due.
+        """
+        with self._lock:
+            return self.state == self.CLOSED or (
+                self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout)
+
+    def acquire(self) -> bool:
+        """
+        Takes the permission to send a call; moves a due open breaker to half-open for the trial call.
+
+        Returns:
+            bool: Whether the call may be sent; False while the breaker is open or a trial call is in flight.
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self, health: ProviderHealth) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            calls = health.snapshot()["calls"]
+            too_many_errors = calls >= self.min_calls and health.error_rate() >= self.error_rate_threshold
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold or too_many_errors:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class SearchProvider:
+    """
+    Base class of a web search provider used by `SearchRouter`.
+
+    Subclasses implement `search`, which returns a list of context strings for every query, and
+    may implement `search_with_sources` to also return the URLs the context was taken from.
+    """
+
+    name = "provider"
+
+    def search(self, queries: Sequence[str]) -> List[List[str]]:
+        raise NotImplementedError
+
+    def search_with_sources(self, queries: Sequence[str]) -> Tuple[List[List[str]], List[List[str]]]:
+        """
+        Args:
+            queries (Sequence[str]): The search queries.
+
+        Returns:
+            Tuple[List[List[str]], List[List[str]]]: Context strings and source URLs for every query.
+        """
+        return self.search(queries), [[] for _ in queries]
+
+    def is_usable(self, results: List[List[str]]) -> bool:
+        """
+        Args:
+            results (List[List[str]]): Result of `search`.
+
+        Returns:
+            bool: Whether at least one non-empty query got some context.
+        """
+        return any(results)
+
+
+class SerperProvider(SearchProvider):
+    """
+    Search provider backed by `GoogleSerperAPI`. Every query is answered with its concatenated snippets.
+    """
+
+    name = "serper"
+    EMPTY_RESULT = "No good results found."
+
+    def __init__(self, client):
+        """
+        Args:
+            client (GoogleSerperAPI): The Serper.dev client.
+        """
+        self.client = client
+
+    def search(self, queries: Sequence[str]) -> List[List[str]]:
+        return self.search_with_sources(queries)[0]
+
+    def search_with_sources(self, queries: Sequence[str]) -> Tuple[List[List[str]], List[List[str]]]:
+        non_empty = [query for query in queries if query]
+        responses = iter(self.client.get_batch_results(non_empty) if non_empty else [])
+        results, sources = [], []
+        for query in queries:
+            response = next(responses) if query else {}
+            text = " ".join(self.client.parse_snippets(response)) if query else ""
+            results.append([text] if text and text != self.EMPTY_RESULT else [])
+            sources.append(self.client.parse_links(response) if results[-1] else [])
+        return results, sources
+
+
+class SerpApiProvider(SearchProvider):
+    """
+    Search provider backed by `ContentScraper`. Every query is answered with the scraped page
+    content, the AI overview snippets and the stock price information.
+    """
+
+    name = "serpapi"
+
+    def __init__(self, scraper):
+        """
+        Args:
+            scraper (ContentScraper): The SERP API scraper.
+        """
+        self.scraper = scraper
+
+    def search(self, queries: Sequence[str]) -> List[List[str]]:
+        return self.search_with_sources(queries)[0]
+
+    def search_with_sources(self, queries: Sequence[str]) -> Tuple[List[List[str]], List[List[str]]]:
+        results, sources = [], []
+        for query, (source_description_list, ai_overview_context, stock_info) in zip(queries, self.scraper.search_all(list(queries))):
+            all_content, context = self.scraper.get_content_from_urls(source_description_list, query)
+            context.extend(ai_overview_context)
+            context.extend(stock_info)
+            results.append(context)
+            sources.append([item["url"] for item in all_content])
+        return results, sources
+
+
+class SearchRouter:
+    """
+    Sends web searches to the healthiest provider and fails over automatically.
+
+    Every provider has a rolling `ProviderHealth` and a `CircuitBreaker`. Providers with an open
+    breaker are skipped, and the remaining ones are tried in order of preference, with providers
+    whose median latency exceeds `latency_budget` moved to the end. A call that raises, returns
+    nothing usable or exceeds `timeout` counts as a failure and the next provider is tried. With `race=True` the two best providers are queried at the
+    same time and the first usable result wins.
+
+    Calls that time out cannot be interrupted and keep running in the background. A provider
+    with `max_abandoned` such calls still running is skipped until they finish, so hanging calls
+    occupy at most `max_abandoned` workers per provider and later searches do not queue behind them.
+
+    Attributes:
+        providers (List[SearchProvider]): Providers in order of preference.
+        timeout (float): Seconds to wait for a provider before failing over.
+        latency_budget (float): Median latency in seconds above which a provider is tried last.
+        last_provider (Optional[str]): Name of the provider that served the last search.
+        max_abandoned (int): Timed-out calls of a provider that may still be running before it is skipped.
+    """
+
+    def __init__(self, providers: List[SearchProvider], timeout: float = 15.0, latency_budget: float = 5.0, window: int = 50,
+                 failure_threshold: int = 3, error_rate_threshold: float = 0.5, reset_timeout: float = 30.0,
+                 max_abandoned: int = 2):
+        """
+        Args:
+            providers (List[SearchProvider]): Providers in order of preference.
+            timeout (float, optional): Seconds to wait for a provider before failing over. Defaults to 15.
+            latency_budget (float, optional): Median latency in seconds above which a provider is tried last. Defaults to 5.
+            window (int, optional): Number of calls in the rolling health window. Defaults to 50.
+            failure_threshold (int, optional): Consecutive failures that open a breaker. Defaults to 3.
+            error_rate_threshold (float, optional): Rolling error rate that opens a breaker. Defaults to 0.5.
+            reset_timeout (float, optional): Seconds before an open breaker allows a trial call. Defaults to 30.
+            max_abandoned (int, optional): Timed-out calls of a provider that may still be running before it is skipped. Defaults to 2.
+        """
+        if not providers:
+            raise ValueError("At least one search provider is required.")
+        self.providers = providers
+        self.timeout = timeout
+        self.latency_budget = latency_budget
+        self.health = {provider.name: ProviderHealth(window) for provider in providers}
+        self.breakers = {
+            provider.name: CircuitBreaker(failure_threshold, error_rate_threshold, reset_timeout=reset_timeout)
+            for provider in providers
+        }
+        self.last_provider = None
+        self.max_abandoned = max_abandoned
+        self._abandoned = {provider.name: 0 for provider in providers}
+        self._lock = threading.Lock()
+        # calls that lose a race or time out keep running in the background; timed-out calls are
+        # capped per provider, so two workers per provider always remain for live calls
+        self._executor = ThreadPoolExecutor(max_workers=(2 + max_abandoned) * len(providers), thread_name_prefix="search-provider")
+
+    def _ranked_providers(self) -> List[SearchProvider]:
+        """
+        Returns:
+            List[SearchProvider]: Providers whose breaker allows a call and that have fewer than
+            `max_abandoned` timed-out calls running; providers whose median latency exceeds
+            `latency_budget` come last, otherwise the preference order is kept.
+        """
+        def is_slow(provider):
+            latency = self.health[provider.name].latency_percentile(50)
+            return latency is not None and latency > self.latency_budget
+
+        with self._lock:
+            abandoned = dict(self._abandoned)
+        available = [provider for provider in self.providers
+                     if self.breakers[provider.name].is_available() and abandoned[provider.name] < self.max_abandoned]
+        # sorted() is stable, so providers keep their preference order within each group
+        return sorted(available, key=is_slow)
+
+    def _call(self, provider: SearchProvider, queries: Sequence[str]) -> Tuple[Optional[Tuple[List[List[str]], List[List[str]]]], float, bool]:
+        """
+        Runs one provider call.
+
+        Returns:
+            Tuple[Optional[Tuple[List[List[str]], List[List[str]]]], float, bool]: The context strings
+            and source URLs (None if the call raised), the latency in seconds and whether the results
+            are usable.
+        """
+        start = time.monotonic()
+        try:
+            results = provider.search_with_sources(queries)
+            ok = provider.is_usable(results[0])
+        except Exception as e:
+            print(f"Search provider {provider.name} failed: {e}")
+            results, ok = None, False
+        return results, time.monotonic() - start, ok
+
+    def _record(self, provider: SearchProvider, latency: float, ok: bool) -> None:
+        self.health[provider.name].record(latency, ok)
+        if ok:
+            self.breakers[provider.name].record_success()
+        else:
+            self.breakers[provider.name].record_failure(self.health[provider.name])
+
+    def _submit(self, provider: SearchProvider, queries: Sequence[str], force: bool = False) -> Optional[Future]:
+        # the breaker's permission is taken here, when the call is really sent
+        if not self.breakers[provider.name].acquire() and not force:
+            return None
+        future = self._executor.submit(self._call, provider, queries)
+        future.abandoned = False
+
+        def record(future):
+            # calls that lost a race are still recorded, calls that timed out already were
+            with self._lock:
+                if future.abandoned:
+                    self._abandoned[provider.name] -= 1
+                    return
+            _, latency, ok = future.result()
+            self._record(provider, latency, ok)
+
+        future.add_done_callback(record)
+        return future
+
+    def _abandon(self, provider: SearchProvider, future: Future) -> bool:
+        """
+        Gives up on a call that exceeded the timeout and records it as a failure.
+
+        Returns:
+            bool: False if the call finished in the meantime and its result can still be used.
+        """
+        with self._lock:
+            if future.done():
+                return False
+            future.abandoned = True
+            self._abandoned[provider.name] += 1
+        print(f"Search provider {provider.name} timed out after {self.timeout}s")
+        future.cancel()
+        self._record(provider, self.timeout, False)
+        return True
+
+    def search(self, queries: Sequence[str], race: bool = False) -> List[List[str]]:
+        """
+        Searches all queries with the best available provider.
+
+        Args:
+            queries (Sequence[str]): The search queries; empty queries get an empty context.
+            race (bool, optional): Query the two best providers concurrently and keep the first usable result. Defaults to False.
+
+        Returns:
+            List[List[str]]: Context strings for every query, in the same order.
+
+        Raises:
+            SearchProviderError: If no provider returned a usable result.
+        """
+        results, _, provider = self.search_detailed(queries, race)
+        self.last_provider = provider
+        return results
+
+    def search_detailed(self, queries: Sequence[str], race: bool = False) -> Tuple[List[List[str]], List[List[str]], str]:
+        """
+        Like `search`, but also returns the source URLs and the provider that served the search.
+        Unlike `last_provider`, the provider is returned with its own results, so concurrent
+        searches do not mix them up.
+
+        Args:
+            queries (Sequence[str]): The search queries; empty queries get an empty context.
+            race (bool, optional): Query the two best providers concurrently and keep the first usable result. Defaults to False.
+
+        Returns:
+            Tuple[List[List[str]], List[List[str]], str]: Context strings and source URLs for every
+            query, in the same order, and the name of the provider.
+
+        Raises:
+            SearchProviderError: If no provider returned a usable result.
+        """
+        providers = self._ranked_providers()
+        force = not providers
+        if force:
+            # every breaker is open: try the providers anyway rather than failing the question
+            providers = list(self.providers)
+
+        if race and len(providers) > 1:
+            pending = {}
+            for provider in providers[:2]:
+                future = self._submit(provider, queries, force)
+                if future is not None:
+                    pending[future] = provider
+            deadline = time.monotonic() + self.timeout
+            while pending:
+                done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    # past the deadline: give up on the calls still running, once each
+                    for future, provider in list(pending.items()):
+                        if self._abandon(provider, future):
+                            del pending[future]
+                    done = set(pending)
+                    if not done:
+                        break
+                for future in done:
+                    provider = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    results, _, ok = future.result()
+                    if ok:
+                        return results[0], results[1], provider.name
+            providers = providers[2:]
+
+        for provider in providers:
+            future = self._submit(provider, queries, force)
+            if future is None:
+                # another search took the half-open trial call in the meantime
+                continue
+            try:
+                results, _, ok = future.result(timeout=self.timeout)
+            except TimeoutError:
+                if self._abandon(provider, future):
+                    continue
+                results, _, ok = future.result()
+            if ok:
+                return results[0], results[1], provider.name
+
+        raise SearchProviderError("No search provider returned a usable result.")
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            Dict[str, Dict]: Health snapshot and breaker state of every provider.
+        """
+        return {
+            provider.name: {**self.health[provider.name].snapshot(), "state": self.breakers[provider.name].state,
+                            "abandoned_running": self._abandoned[provider.name]}
+            for provider in self.providers
+        }
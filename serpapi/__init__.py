@@ -1,15 +1,16 @@
 from .serp_api_client import SerpApiClient
-from .baidu_search import BaiduSearch
-from .google_search import GoogleSearch
-from .yahoo_search import YahooSearch
-from .bing_search import BingSearch
-from .yandex_search import YandexSearch
-from .google_scholar_search import GoogleScholarSearch
-from .ebay_search import EbaySearch
-from .home_depot_search import HomeDepotSearch
-from .youtube_search import YoutubeSearch
-from .duck_duck_go_search import DuckDuckGoSearch
-from .walmart_search import WalmartSearch
-from .naver_search import NaverSearch
-from .apple_app_store_search import AppleAppStoreSearch
-
+from .async_serp_api_client import AsyncSerpApiClient
+from .object_view import ObjectView, ListView
+from .baidu_search import BaiduSearch, AsyncBaiduSearch
+from .google_search import GoogleSearch, AsyncGoogleSearch
+from .yahoo_search import YahooSearch, AsyncYahooSearch
+from .bing_search import BingSearch, AsyncBingSearch
+from .yandex_search import YandexSearch, AsyncYandexSearch
+from .google_scholar_search import GoogleScholarSearch, AsyncGoogleScholarSearch
+from .ebay_search import EbaySearch, AsyncEbaySearch
+from .home_depot_search import HomeDepotSearch, AsyncHomeDepotSearch
+from .youtube_search import YoutubeSearch, AsyncYoutubeSearch
+from .duck_duck_go_search import DuckDuckGoSearch, AsyncDuckDuckGoSearch
+from .walmart_search import WalmartSearch, AsyncWalmartSearch
+from .naver_search import NaverSearch, AsyncNaverSearch
+from .apple_app_store_search import AppleAppStoreSearch, AsyncAppleAppStoreSearch
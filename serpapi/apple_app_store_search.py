@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 from serpapi.constant import *
 
@@ -18,3 +19,18 @@ class AppleAppStoreSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by youtube search engine")
+
+
+class AsyncAppleAppStoreSearch(AsyncSerpApiClient):
+    """AsyncAppleAppStoreSearch is the asyncio variant of AppleAppStoreSearch.
+    ```python
+    from serpapi import AsyncAppleAppStoreSearch
+    data = await AsyncAppleAppStoreSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncAppleAppStoreSearch, self).__init__(params_dict, APPLE_APP_STORE_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by youtube search engine")
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+import weakref
+import aiohttp
+from serpapi.serp_api_client import SerpApiClient, DEFAULT_TIMEOUT, RETRY_STATUS_CODES
+from serpapi.serp_api_client_exception import SerpApiClientException
+from serpapi import selective_decode
+
+class AsyncSerpApiClient(object):
+    """AsyncSerpApiClient is the asyncio variant of SerpApiClient.
+    ```python
+    from serpapi import AsyncSerpApiClient
+    search = AsyncSerpApiClient({
+        "q": "Coffee",
+        "location": "Austin,Texas",
+        "engine": "google",
+        "api_key": "<your private key>"
+        })
+    data = await search.get_dict()
+    ```
+
+    All instances running on the same event loop share one aiohttp.ClientSession,
+    and at most MAX_CONCURRENCY requests are in flight on that loop at any time.
+    Every event loop (e.g. one per thread calling asyncio.run) has its own session.
+
+    https://serpapi.com/search-api
+    """
+
+    BACKEND = "https://serpapi.com"
+    SERP_API_KEY = None
+
+    MAX_CONCURRENCY = 10
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    # see SerpApiClient: smaller responses are read whole, and at most DRAIN_BYTES are read
+    # after the requested keys, so the connection goes back to the pool
+    STREAM_MIN_BYTES = 256 * 1024
+    DRAIN_BYTES = 256 * 1024
+    # event loop -> (aiohttp.ClientSession, asyncio.Semaphore); entries go away with their loop
+    _sessions = weakref.WeakKeyDictionary()
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, params_dict, engine = None, timeout = DEFAULT_TIMEOUT):
+        self.params_dict = params_dict
+        self.engine = engine
+        self.timeout = timeout
+
+    # request construction is shared with the synchronous client
+    construct_url = SerpApiClient.construct_url
+
+    @classmethod
+    def get_session(cls):
+        """Returns:
+            aiohttp.ClientSession and asyncio.Semaphore shared by all clients
+            on the running event loop, created on first use
+        """
+        loop = asyncio.get_running_loop()
+        sessions = AsyncSerpApiClient._sessions
+        with AsyncSerpApiClient._sessions_lock:
+            entry = sessions.get(loop)
+            if entry is None or entry[0].closed:
+                connector = aiohttp.TCPConnector(limit=cls.MAX_CONCURRENCY)
+                entry = (aiohttp.ClientSession(connector=connector), asyncio.Semaphore(cls.MAX_CONCURRENCY))
+                sessions[loop] = entry
+        return entry
+
+    @classmethod
+    async def close(cls):
+        """Close the shared session of the running event loop; sessions of other loops are left open"""
+        loop = asyncio.get_running_loop()
+        with AsyncSerpApiClient._sessions_lock:
+            entry = AsyncSerpApiClient._sessions.pop(loop, None)
+        if entry is not None and not entry[0].closed:
+            await entry[0].close()
+
+    def _client_timeout(self):
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    async def fetch(self, read, path = '/search', params_dict = None):
+        """Send the request, retrying 429/5xx responses with exponential backoff
+        Parameters:
+            read (coroutine function): consumes the final aiohttp response
+        Returns:
+            result of read
+        """
+        url, parameter = self.construct_url(path, params_dict)
+        # aiohttp only accepts str/int/float query values
+        parameter = {key: value if isinstance(value, str) else str(value) for key, value in parameter.items()}
+        session, semaphore = self.get_session()
+        attempt = 0
+        while True:
+            async with semaphore:
+                async with session.get(url, params=parameter, timeout=self._client_timeout()) as response:
+                    if response.status not in RETRY_STATUS_CODES or attempt >= self.MAX_RETRIES:
+                        return await read(response)
+                    retry_after = response.headers.get("Retry-After")
+            delay = self.BACKOFF_FACTOR * (2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_results(self, path = '/search', params_dict = None):
+        """Returns:
+            Response text field
+        """
+        return await self.fetch(lambda response: response.text(), path, params_dict)
+
+    async def get_html(self):
+        """Returns:
+            Raw HTML search result from Gooogle
+        """
+        return await self.get_results()
+
+    async def get_json(self):
+        """Returns:
+            Formatted JSON search results using json package
+        """
+        return json.loads(await self.get_raw_json())
+
+    async def get_raw_json(self):
+        """Returns:
+            Formatted JSON search result as string
+        """
+        return await self.get_results(params_dict=dict(self.params_dict, output="json"))
+
+    async def get_dict_keys(self, keys, stream = None):
+        """Decode only the requested top-level keys of the JSON response
+        Parameters:
+            keys (list): top-level keys to return, e.g. ["answer_box"]
+            stream (bool): parse incrementally while downloading; defaults to True
+                when ijson is installed [optional]
+        Returns:
+            dict: requested keys present in the response
+
+        As in SerpApiClient.get_dict_keys, responses smaller than STREAM_MIN_BYTES are
+        read whole and up to DRAIN_BYTES are drained after a streamed one, so that its
+        connection can be reused; a larger rest is dropped with the connection.
+        """
+        if stream is None:
+            stream = selective_decode.ijson is not None
+
+        async def read(response):
+            if not stream or (response.content_length is not None and response.content_length < self.STREAM_MIN_BYTES):
+                return selective_decode.decode_keys(await response.read(), keys)
+            result = await selective_decode.async_stream_decode_keys(response.content, keys)
+            drained = 0
+            while drained <= self.DRAIN_BYTES:
+                chunk = await response.content.read(64 * 1024)
+                if not chunk:
+                    break
+                drained += len(chunk)
+            return result
+
+        return await self.fetch(read, params_dict=dict(self.params_dict, output="json"))
+
+    async def get_dictionary(self):
+        """Returns:
+            Dict with the formatted response content
+        """
+        return dict(await self.get_json())
+
+    async def get_dict(self):
+        """Returns:
+            Dict with the formatted response content
+            (alias for get_dictionary)
+        """
+        return await self.get_dictionary()
+
+    async def get_search_archive(self, search_id, format = 'json'):
+        """Retrieve search result from the Search Archive API
+        Parameters:
+            search_id (int): unique identifier for the search provided by metadata.id
+            format (string): search format: json or html [optional]
+        Returns:
+            dict|string: search result from the archive
+        """
+        result = await self.get_results("/searches/{0}.{1}".format(search_id, format))
+        if format == 'json':
+            result = json.loads(result)
+        return result
+
+    async def get_account(self):
+        """Get account information using Account API
+        Returns:
+            dict: account information
+        """
+        return json.loads(await self.get_results("/account"))
+
+    async def get_location(self, q, limit = 5):
+        """Get location using Location API
+        Parameters:
+            q (string): location (like: city name..)
+            limit (int): number of matches returned
+        Returns:
+            dict: Location matching q
+        """
+        params = {"output": "json", "q": q, "limit": limit}
+        buffer = await self.get_results('/locations.json', params)
+        return json.loads(buffer)
@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class BaiduSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class BaiduSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Baidu search engine at this time")
+
+
+class AsyncBaiduSearch(AsyncSerpApiClient):
+    """AsyncBaiduSearch is the asyncio variant of BaiduSearch.
+    ```python
+    from serpapi import AsyncBaiduSearch
+    data = await AsyncBaiduSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncBaiduSearch, self).__init__(params_dict, BAIDU_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Baidu search engine at this time")
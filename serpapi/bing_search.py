@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 
 class BingSearch(SerpApiClient):
     """BingSearch enables to search bing and parse the result.
@@ -13,3 +14,15 @@ class BingSearch(SerpApiClient):
 
     def __init__(self, params_dict):
         super(BingSearch, self).__init__(params_dict, BING_ENGINE)
+
+
+class AsyncBingSearch(AsyncSerpApiClient):
+    """AsyncBingSearch is the asyncio variant of BingSearch.
+    ```python
+    from serpapi import AsyncBingSearch
+    data = await AsyncBingSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncBingSearch, self).__init__(params_dict, BING_ENGINE)
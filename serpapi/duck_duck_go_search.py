@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 from serpapi.constant import *
 
@@ -18,3 +19,18 @@ class DuckDuckGoSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by walmart search engine")
+
+
+class AsyncDuckDuckGoSearch(AsyncSerpApiClient):
+    """AsyncDuckDuckGoSearch is the asyncio variant of DuckDuckGoSearch.
+    ```python
+    from serpapi import AsyncDuckDuckGoSearch
+    data = await AsyncDuckDuckGoSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncDuckDuckGoSearch, self).__init__(params_dict, DUCKDUCKGO_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by walmart search engine")
@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class EbaySearch(SerpApiClient):
@@ -17,3 +18,18 @@ class EbaySearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Ebay search engine at this time")
+
+
+class AsyncEbaySearch(AsyncSerpApiClient):
+    """AsyncEbaySearch is the asyncio variant of EbaySearch.
+    ```python
+    from serpapi import AsyncEbaySearch
+    data = await AsyncEbaySearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncEbaySearch, self).__init__(params_dict, EBAY_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Ebay search engine at this time")
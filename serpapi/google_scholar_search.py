@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class GoogleScholarSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class GoogleScholarSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Google scholar search engine")
+
+
+class AsyncGoogleScholarSearch(AsyncSerpApiClient):
+    """AsyncGoogleScholarSearch is the asyncio variant of GoogleScholarSearch.
+    ```python
+    from serpapi import AsyncGoogleScholarSearch
+    data = await AsyncGoogleScholarSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncGoogleScholarSearch, self).__init__(params_dict, GOOGLE_SCHOLAR_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Google scholar search engine")
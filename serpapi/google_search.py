@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 
 class GoogleSearch(SerpApiClient):
     """GoogleSearch enables to search google and parse the result.
@@ -13,3 +14,15 @@ class GoogleSearch(SerpApiClient):
 
     def __init__(self, params_dict):
         super(GoogleSearch, self).__init__(params_dict, GOOGLE_ENGINE)
+
+
+class AsyncGoogleSearch(AsyncSerpApiClient):
+    """AsyncGoogleSearch is the asyncio variant of GoogleSearch.
+    ```python
+    from serpapi import AsyncGoogleSearch
+    data = await AsyncGoogleSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncGoogleSearch, self).__init__(params_dict, GOOGLE_ENGINE)
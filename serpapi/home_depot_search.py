@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class HomeDepotSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class HomeDepotSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Home Depot search engine")
+
+
+class AsyncHomeDepotSearch(AsyncSerpApiClient):
+    """AsyncHomeDepotSearch is the asyncio variant of HomeDepotSearch.
+    ```python
+    from serpapi import AsyncHomeDepotSearch
+    data = await AsyncHomeDepotSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncHomeDepotSearch, self).__init__(params_dict, HOME_DEPOT_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Home Depot search engine")
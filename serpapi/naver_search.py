@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 from serpapi.constant import *
 
@@ -18,3 +19,18 @@ class NaverSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by youtube search engine")
+
+
+class AsyncNaverSearch(AsyncSerpApiClient):
+    """AsyncNaverSearch is the asyncio variant of NaverSearch.
+    ```python
+    from serpapi import AsyncNaverSearch
+    data = await AsyncNaverSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncNaverSearch, self).__init__(params_dict, NAVER_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by youtube search engine")
@@ -0,0 +1,114 @@
+# Lazy attribute access over a parsed SerpApi response
+#  children are wrapped only when they are accessed, and every node reuses one of
+#  two __slots__ proxy classes instead of a freshly created type
+
+def wrap(node):
+    """Return:
+        ObjectView for dicts, ListView for lists, the value itself otherwise
+    """
+    if isinstance(node, dict):
+        return ObjectView(node)
+    if isinstance(node, list):
+        return ListView(node)
+    return node
+
+class ObjectView(object):
+    """Read-only view over a dict supporting both `view.key` and `view["key"]`.
+    ```python
+    result = search.get_object()
+    result.search_metadata.id
+    result["organic_results"][0].link
+    ```
+    """
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        object.__setattr__(self, "_node", node)
+
+    def __getattr__(self, name):
+        try:
+            return wrap(self._node[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key):
+        return wrap(self._node[key])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ObjectView is read-only")
+
+    def __contains__(self, key):
+        return key in self._node
+
+    def __iter__(self):
+        return iter(self._node)
+
+    def __len__(self):
+        return len(self._node)
+
+    def __dir__(self):
+        return list(self._node.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, ObjectView):
+            return self._node == other._node
+        return self._node == other
+
+    __hash__ = None
+
+    def get(self, key, default = None):
+        if key in self._node:
+            return wrap(self._node[key])
+        return default
+
+    def keys(self):
+        return self._node.keys()
+
+    def to_dict(self):
+        """Returns:
+            underlying dict, without any copy
+        """
+        return self._node
+
+    def __repr__(self):
+        return "ObjectView({!r})".format(self._node)
+
+class ListView(object):
+    """Read-only view over a list, wrapping elements on access."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        object.__setattr__(self, "_node", node)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ListView(self._node[index])
+        return wrap(self._node[index])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ListView is read-only")
+
+    def __iter__(self):
+        for el in self._node:
+            yield wrap(el)
+
+    def __len__(self):
+        return len(self._node)
+
+    def __eq__(self, other):
+        if isinstance(other, ListView):
+            return self._node == other._node
+        return self._node == other
+
+    __hash__ = None
+
+    def to_list(self):
+        """Returns:
+            underlying list, without any copy
+        """
+        return self._node
+
+    def __repr__(self):
+        return "ListView({!r})".format(self._node)
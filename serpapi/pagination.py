@@ -1,19 +1,26 @@
+import copy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from serpapi.serp_api_client_exception import SerpApiClientException
 
-DEFAULT_START = 0 
+DEFAULT_START = 0
 DEFAULT_END = 1000000000
 DEFAULT_num = 10
+DEFAULT_WINDOW = 4
 
 # Paginate response in SearpApi
+#  up to `window` page requests are kept in flight, pages are still yielded in order
 class Pagination:
-  
-  def __init__(self, client, start = DEFAULT_START, end = DEFAULT_END, num = DEFAULT_num):
+
+  def __init__(self, client, start = DEFAULT_START, end = DEFAULT_END, num = DEFAULT_num, window = DEFAULT_WINDOW):
     # serp api client
     self.client = client
     # range
     self.start = start
     self.end = end
     self.num = num
+    # number of page requests in flight
+    self.window = window
 
     # use value from the client
     if self.start == DEFAULT_START:
@@ -31,37 +38,70 @@ class Pagination:
         raise SerpApiClientException("start: {} must be less than end: {}".format(self.start, self.end))
     if(self.start + self.num) > self.end:
         raise SerpApiClientException("start + num: {} + {} must be less than end: {}".format(self.start, self.num, self.end))
+    if self.window < 1:
+        raise SerpApiClientException("window: {} must be at least 1".format(self.window))
+
+    self._executor = None
+    self._pending = deque()
+    self._next_start = self.start
 
   def __iter__(self):
-    self.update()
+    self.close()
+    self._next_start = self.start
+    self._executor = ThreadPoolExecutor(max_workers=self.window)
+    self.prefetch()
     return self
 
-  def update(self):
-    self.client.params_dict['start'] = self.start
-    self.client.params_dict['num'] = self.num
-    if self.start > 0:
-      self.client.params_dict['start'] += 1
+  def page_params(self, start):
+    # request parameters for the page at offset start, the client is left untouched
+    params = dict(self.client.params_dict)
+    params['start'] = start
+    params['num'] = self.num
+    if start > 0:
+      params['start'] += 1
+    return params
+
+  def fetch(self, start):
+    page_client = copy.copy(self.client)
+    page_client.params_dict = self.page_params(start)
+    return page_client.get_dict()
+
+  def prefetch(self):
+    # pages ending past `end` are never returned, so they are not requested
+    while len(self._pending) < self.window and self._next_start + self.num <= self.end:
+      self._pending.append(self._executor.submit(self.fetch, self._next_start))
+      self._next_start += self.num
+
+  def close(self):
+    # drop in-flight requests once iteration stops
+    if self._executor is not None:
+      self._executor.shutdown(wait=False, cancel_futures=True)
+      self._executor = None
+    self._pending.clear()
 
   def __next__(self):
-    # update parameter
-    self.update()
+    if self._executor is None or not self._pending:
+      self.close()
+      raise StopIteration
 
-    # execute request
-    result = self.client.get_dict()
+    # wait for the oldest page
+    try:
+      result = self._pending.popleft().result()
+    except Exception:
+      self.close()
+      raise
 
     # stop if backend miss to return serpapi_pagination
     if not 'serpapi_pagination' in result:
+      self.close()
       raise StopIteration
 
     # stop if no next page
     if not 'next' in result['serpapi_pagination']:
-        raise StopIteration
-
-    # ends if no next page
-    if self.start + self.num > self.end:
-        raise StopIteration
-    
-    # increment start page
-    self.start += self.num
+      self.close()
+      raise StopIteration
+
+    # keep the window full
+    self.prefetch()
 
     return result
@@ -0,0 +1,94 @@
+# Decode only selected top-level keys of a SerpApi JSON response
+#  - ijson (optional) parses the body incrementally while it is downloaded, builds
+#    only the requested values and stops reading once all of them were seen
+#  - otherwise the whole body is decoded with orjson (optional) or json and only the
+#    requested keys are kept, without the extra dict() copy of get_dictionary
+import json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(payload):
+    """Returns:
+        payload (bytes or str) decoded with orjson when available, json otherwise
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def decode_keys(payload, keys):
+    """Decode a complete JSON body and keep the requested top-level keys
+    Parameters:
+        payload (bytes|str): response body
+        keys (iterable): top-level keys to keep
+    Returns:
+        dict: requested keys present in the response
+    """
+    data = loads(payload)
+    return {key: data[key] for key in keys if key in data}
+
+class _KeyCollector(object):
+    # feeds ijson parse events into builders for the wanted top-level keys only
+
+    def __init__(self, keys):
+        self.wanted = set(keys)
+        self.result = {}
+        self.key = None
+        self.builder = None
+        self.depth = 0
+
+    def done(self):
+        return self.builder is None and len(self.result) == len(self.wanted)
+
+    def feed(self, prefix, event, value):
+        if self.builder is None:
+            # top-level key of the response object
+            if prefix == '' and event == 'map_key' and value in self.wanted and value not in self.result:
+                self.key = value
+                self.builder = ijson.ObjectBuilder()
+            return
+        self.builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            self.depth += 1
+        elif event in ('end_map', 'end_array'):
+            self.depth -= 1
+        if self.depth == 0:
+            self.result[self.key] = self.builder.value
+            self.builder = None
+
+def stream_decode_keys(fp, keys):
+    """Incrementally decode the requested top-level keys from a file-like object
+    Parameters:
+        fp (file-like): object with read(), e.g. requests' response.raw
+        keys (iterable): top-level keys to keep
+    Returns:
+        dict: requested keys present in the response
+    """
+    collector = _KeyCollector(keys)
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        collector.feed(prefix, event, value)
+        if collector.done():
+            break
+    return collector.result
+
+async def async_stream_decode_keys(fp, keys):
+    """Asyncio variant of stream_decode_keys
+    Parameters:
+        fp (async file-like): object with an async read(), e.g. aiohttp's response.content
+        keys (iterable): top-level keys to keep
+    Returns:
+        dict: requested keys present in the response
+    """
+    collector = _KeyCollector(keys)
+    async for prefix, event, value in ijson.parse_async(fp, use_float=True):
+        collector.feed(prefix, event, value)
+        if collector.done():
+            break
+    return collector.result
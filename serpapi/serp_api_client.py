@@ -1,7 +1,12 @@
 import requests
 import json
-from serpapi.pagination import Pagination
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from serpapi.pagination import Pagination, DEFAULT_WINDOW
 from serpapi.serp_api_client_exception import SerpApiClientException
+from serpapi.object_view import ObjectView
+from serpapi import selective_decode
 
 GOOGLE_ENGINE = 'google'
 BING_ENGINE = 'bing'
@@ -13,6 +18,11 @@ YAHOO_ENGINE = 'yahoo'
 HOME_DEPOT_ENGINE = 'home_depot'
 YOUTUBE_ENGINE = 'youtube'
 
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+# responses retried with exponential backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
 class SerpApiClient(object):
     """SerpApiClient enables to query any search engines supported by SerpApi and parse the results.
     ```python
@@ -32,42 +42,91 @@ class SerpApiClient(object):
     BACKEND = "https://serpapi.com"
     SERP_API_KEY = None
 
-    def __init__(self, params_dict, engine = None, timeout = 60000):
+    # connection pool shared by every client and engine subclass
+    POOL_SIZE = 10
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    # streamed responses are only parsed incrementally from this size on, and a rest of at most
+    # DRAIN_BYTES is read after the requested keys, so the keep-alive connection can be reused
+    STREAM_MIN_BYTES = 256 * 1024
+    DRAIN_BYTES = 256 * 1024
+    _session = None
+    _session_lock = threading.Lock()
+
+    def __init__(self, params_dict, engine = None, timeout = DEFAULT_TIMEOUT):
         self.params_dict = params_dict
         self.engine = engine
         self.timeout = timeout
 
-    def construct_url(self, path = "/search"):
-        self.params_dict['source'] = 'python'
+    @classmethod
+    def create_session(cls):
+        """Returns:
+            requests.Session with a keep-alive connection pool that retries
+            429/5xx responses and connection errors with exponential backoff
+        """
+        retry = Retry(
+            total=cls.MAX_RETRIES,
+            backoff_factor=cls.BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls.POOL_SIZE, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @classmethod
+    def get_session(cls):
+        """Returns:
+            requests.Session shared by all clients, created on first use
+        """
+        if SerpApiClient._session is None:
+            with SerpApiClient._session_lock:
+                if SerpApiClient._session is None:
+                    SerpApiClient._session = cls.create_session()
+        return SerpApiClient._session
+
+    def construct_url(self, path = "/search", params_dict = None):
+        """Build the request without mutating the client parameters
+        Parameters:
+            path (string): API path
+            params_dict (dict): parameters to send instead of self.params_dict [optional]
+        Returns:
+            tuple: url and a new parameter dict
+        """
+        params = dict(self.params_dict if params_dict is None else params_dict)
+        params['source'] = 'python'
         if self.SERP_API_KEY:
-            self.params_dict['serp_api_key'] = self.SERP_API_KEY
+            params['serp_api_key'] = self.SERP_API_KEY
         if self.engine:
-            if not 'engine' in self.params_dict:
-                self.params_dict['engine'] = self.engine
-        if not 'engine' in self.params_dict:
+            if not 'engine' in params:
+                params['engine'] = self.engine
+        if not 'engine' in params:
             raise SerpApiClientException("engine must be defined in params_dict or engine")
-        return self.BACKEND + path, self.params_dict
+        return self.BACKEND + path, params
 
-    def get_response(self, path = '/search'):
+    def get_response(self, path = '/search', params_dict = None, stream = False):
         """Returns:
-            Response object provided by requests.get
+            Response object provided by the shared requests.Session
         """
         url = None
         try:
-            url, parameter = self.construct_url(path)
+            url, parameter = self.construct_url(path, params_dict)
             # print(url)
-            response = requests.get(url, parameter, timeout=self.timeout)
+            response = self.get_session().get(url, params=parameter, timeout=self.timeout, stream=stream)
             return response
         except requests.HTTPError as e:
             print("fail: " + url)
             print(e, e.response.status_code)
             raise e
 
-    def get_results(self, path='/search'):
+    def get_results(self, path='/search', params_dict = None):
         """Returns:
             Response text field
         """
-        return self.get_response(path).text
+        return self.get_response(path, params_dict).text
 
     def get_html(self):
         """Returns:
@@ -79,15 +138,13 @@ class SerpApiClient(object):
         """Returns:
             Formatted JSON search results using json package
         """
-        self.params_dict["output"] = "json"
-        return json.loads(self.get_results())
+        return json.loads(self.get_raw_json())
 
     def get_raw_json(self):
         """Returns:
             Formatted JSON search result as string
         """
-        self.params_dict["output"] = "json"
-        return self.get_results()
+        return self.get_results(params_dict=dict(self.params_dict, output="json"))
 
     def get_dictionary(self):
         """Returns:
@@ -102,16 +159,51 @@ class SerpApiClient(object):
         """
         return self.get_dictionary()
 
+    def get_dict_keys(self, keys, stream = None):
+        """Decode only the requested top-level keys of the JSON response,
+        skipping the full decode and copy done by get_dict
+        Parameters:
+            keys (list): top-level keys to return, e.g. ["answer_box"]
+            stream (bool): parse incrementally while downloading and stop once all keys
+                were read; defaults to True when ijson is installed [optional]
+        Returns:
+            dict: requested keys present in the response
+
+        A connection is only returned to the keep-alive pool once its response was read
+        to the end. Responses announced smaller than STREAM_MIN_BYTES are therefore
+        downloaded whole, and after the requested keys of a streamed one up to
+        DRAIN_BYTES are drained; a larger rest is dropped with its connection, trading a
+        new TLS handshake for not downloading it.
+        """
+        if stream is None:
+            stream = selective_decode.ijson is not None
+        params = dict(self.params_dict, output="json")
+        if not stream:
+            return selective_decode.decode_keys(self.get_response(params_dict=params).content, keys)
+        with self.get_response(params_dict=params, stream=True) as response:
+            length = response.headers.get("Content-Length")
+            if length is not None and length.isdigit() and int(length) < self.STREAM_MIN_BYTES:
+                return selective_decode.decode_keys(response.content, keys)
+            response.raw.decode_content = True
+            result = selective_decode.stream_decode_keys(response.raw, keys)
+            drained = 0
+            while drained <= self.DRAIN_BYTES:
+                chunk = response.raw.read(64 * 1024)
+                if not chunk:
+                    break
+                drained += len(chunk)
+            return result
+
     def get_object(self):
         """Returns: 
-            Dynamically created python object wrapping the result data structure
+            ObjectView giving lazy attribute and index access to the result data structure
         """
-        # iterative over response hash
-        node = self.get_dictionary()
-        # create dynamic python object
-        return self.make_pyobj("response", node)
+        return ObjectView(self.get_json())
 
     def make_pyobj(self, name, node):
+        """Eagerly convert node into dynamically created python objects
+        (one new class per node, superseded by get_object's ObjectView)
+        """
         pytype = type(name, (object, ), {})
         pyobj = pytype()
 
@@ -163,15 +255,13 @@ class SerpApiClient(object):
         Returns:
             dict: Location matching q
         """
-        self.params_dict = {}
-        self.params_dict["output"] = "json"
-        self.params_dict["q"] = q
-        self.params_dict["limit"] = limit
-        buffer = self.get_results('/locations.json')
+        params = {"output": "json", "q": q, "limit": limit}
+        buffer = self.get_results('/locations.json', params)
         return json.loads(buffer)
     
-    def pagination(self, start = 0, end = 1000000000, page_size = 10):
+    def pagination(self, start = 0, end = 1000000000, page_size = 10, window = DEFAULT_WINDOW):
         """Return:
-            Generator to iterate the search results pagination
+            Generator to iterate the search results pagination,
+            prefetching up to `window` pages concurrently
         """
-        return Pagination(self, start, end, page_size)
+        return Pagination(self, start, end, page_size, window)
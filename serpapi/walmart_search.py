@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 from serpapi.constant import *
 
@@ -18,3 +19,18 @@ class WalmartSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by walmart search engine")
+
+
+class AsyncWalmartSearch(AsyncSerpApiClient):
+    """AsyncWalmartSearch is the asyncio variant of WalmartSearch.
+    ```python
+    from serpapi import AsyncWalmartSearch
+    data = await AsyncWalmartSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncWalmartSearch, self).__init__(params_dict, WALMART_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by walmart search engine")
@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class YahooSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class YahooSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Yahoo search engine at this time")
+
+
+class AsyncYahooSearch(AsyncSerpApiClient):
+    """AsyncYahooSearch is the asyncio variant of YahooSearch.
+    ```python
+    from serpapi import AsyncYahooSearch
+    data = await AsyncYahooSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncYahooSearch, self).__init__(params_dict, YAHOO_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Yahoo search engine at this time")
@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class YandexSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class YandexSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by Yandex search engine at this time")
+
+
+class AsyncYandexSearch(AsyncSerpApiClient):
+    """AsyncYandexSearch is the asyncio variant of YandexSearch.
+    ```python
+    from serpapi import AsyncYandexSearch
+    data = await AsyncYandexSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncYandexSearch, self).__init__(params_dict, YANDEX_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by Yandex search engine at this time")
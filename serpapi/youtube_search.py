@@ -1,4 +1,5 @@
 from serpapi.serp_api_client import *
+from serpapi.async_serp_api_client import AsyncSerpApiClient
 from serpapi.serp_api_client_exception import SerpApiClientException
 
 class YoutubeSearch(SerpApiClient):
@@ -17,3 +18,18 @@ class YoutubeSearch(SerpApiClient):
 
     def get_location(self, q, limit = 5):
         raise SerpApiClientException("location is not supported by youtube search engine")
+
+
+class AsyncYoutubeSearch(AsyncSerpApiClient):
+    """AsyncYoutubeSearch is the asyncio variant of YoutubeSearch.
+    ```python
+    from serpapi import AsyncYoutubeSearch
+    data = await AsyncYoutubeSearch(params_dict).get_dict()
+    ```
+    """
+
+    def __init__(self, params_dict):
+        super(AsyncYoutubeSearch, self).__init__(params_dict, YOUTUBE_ENGINE)
+
+    async def get_location(self, q, limit = 5):
+        raise SerpApiClientException("location is not supported by youtube search engine")
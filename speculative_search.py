@@ -0,0 +1,122 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+
+class SpeculativeSearch:
+    """
+    Starts the web search of a question while its retrieved context is still being graded.
+
+    A question whose retrieval is weak (no chunk, or the best chunk's `dist` above
+    `dist_threshold`) is likely to be graded as not answerable from the documents, and then waits
+    for decomposition and web search in sequence. `start` submits the search right after
+    retrieval, so it runs during grading; `settle` records whether the answer path used it. A
+    search that is settled unused is cancelled if it has not started yet, otherwise its cost is
+    counted as wasted.
+
+    With the hybrid retriever `dist` is the negated reciprocal rank fusion score, so the threshold
+    depends on the fusion weights; `indexing.weak_match_dist` derives it from them. A single index
+    returns its own distance, which has no such threshold: with `dist_threshold` None only a
+    retrieval without any chunk is weak.
+
+    Attributes:
+        search (Callable[[str], object]): Searches the web for a question.
+        dist_threshold (Optional[float]): Best `dist` above which a retrieval is weak; None for empty retrievals only.
+        counts (Dict[str, int]): Searches started, used, cancelled before running, and wasted.
+        wasted_seconds (float): Time spent in wasted searches.
+    """
+
+    def __init__(self, search: Callable[[str], object], dist_threshold: Optional[float] = None, max_workers: int = 2):
+        """
+        Args:
+            search (Callable[[str], object]): Searches the web for a question.
+            dist_threshold (Optional[float], optional): Best `dist` above which a retrieval is weak, see
+                `indexing.weak_match_dist`. Defaults to None, only retrievals without any chunk.
+            max_workers (int, optional): Speculative searches running at once. Defaults to 2.
+        """
+        self.search = search
+        self.dist_threshold = dist_threshold
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative-search")
+        self._lock = threading.Lock()
+        self._timings: Dict[Future, Dict[str, float]] = {}
+        self.counts = {"started": 0, "used": 0, "cancelled": 0, "wasted": 0}
+        self.wasted_seconds = 0.0
+
+    def is_weak(self, docs: List[Dict]) -> bool:
+        """
+        Args:
+            docs (List[Dict]): The retrieved chunks of the question.
+
+        Returns:
+            bool: Whether no chunk was retrieved or the best one is farther than `dist_threshold`.
+        """
+        if not docs:
+            return True
+        if self.dist_threshold is None:
+            return False
+        dists = [doc["dist"] for doc in docs if "dist" in doc]
+        return bool(dists) and min(dists) > self.dist_threshold
+
+    def start(self, question: str, docs: List[Dict]) -> Optional[Future]:
+        """
+        Starts the web search of a question if its retrieval is weak.
+
+        Args:
+            question (str): The question.
+            docs (List[Dict]): The retrieved chunks of the question.
+
+        Returns:
+            Optional[Future]: The running search, or None if the retrieval is not weak.
+        """
+        if not self.is_weak(docs):
+            return None
+        timing: Dict[str, float] = {}
+
+        def run():
+            timing["start"] = time.monotonic()
+            try:
+                return self.search(question)
+            finally:
+                timing["end"] = time.monotonic()
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self.counts["started"] += 1
+            self._timings[future] = timing
+        return future
+
+    def settle(self, future: Optional[Future], used: bool) -> None:
+        """
+        Records the outcome of a speculative search; an unused search is cancelled if possible.
+
+        Args:
+            future (Optional[Future]): The search returned by `start`.
+            used (bool): Whether the answer path used its result.
+        """
+        if future is None:
+            return
+        if used or future.cancel():
+            with self._lock:
+                self.counts["used" if used else "cancelled"] += 1
+                self._timings.pop(future, None)
+            return
+        # already running: its cost is spent, account for it once it has finished
+        future.add_done_callback(self._waste)
+
+    def _waste(self, future: Future) -> None:
+        with self._lock:
+            timing = self._timings.pop(future, {})
+            self.counts["wasted"] += 1
+            self.wasted_seconds += timing.get("end", 0.0) - timing.get("start", 0.0)
+
+    def metrics(self) -> Dict:
+        """
+        Returns:
+            Dict: The counts, the share of started searches that were wasted, and the time spent in them.
+        """
+        with self._lock:
+            counts = dict(self.counts)
+            counts["wasted_seconds"] = self.wasted_seconds
+        counts["wasted_ratio"] = counts["wasted"] / counts["started"] if counts["started"] else 0.0
+        return counts
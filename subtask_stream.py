@@ -0,0 +1,182 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class SubtaskStreamParser:
+    """
+    Incremental parser of a streamed "Subtask 1: ... Subtask 2: ..." completion.
+
+    Text is fed as it arrives. A subtask is complete once the next label has been written, and
+    the last one at the end of the stream, so a subtask running over several lines is kept whole.
+    Completed subtasks are returned by `feed` and `close` exactly once, in order.
+
+    Attributes:
+        labels (Sequence[str]): The labels, e.g. ("Subtask 1:", "Subtask 2:").
+    """
+
+    def __init__(self, labels: Sequence[str]):
+        """
+        Args:
+            labels (Sequence[str]): The labels in the order the model writes them.
+        """
+        self.labels = list(labels)
+        self.text = ""
+        self.subtasks: List[Optional[str]] = [None] * len(self.labels)
+        self._next = 0  # index of the next subtask to complete
+
+    def _bounds(self, index: int) -> Optional[Tuple[int, int]]:
+        # the start of the text of subtask `index` and the start of the next label (or -1)
+        start = self.text.find(self.labels[index])
+        if start < 0:
+            return None
+        start += len(self.labels[index])
+        end = self.text.find(self.labels[index + 1], start) if index + 1 < len(self.labels) else -1
+        return start, end
+
+    def feed(self, delta: str) -> List[Tuple[int, str]]:
+        """
+        Args:
+            delta (str): The next piece of the completion.
+
+        Returns:
+            List[Tuple[int, str]]: The subtasks completed by this piece, as (index, text).
+        """
+        self.text += delta
+        completed = []
+        while self._next < len(self.labels):
+            bounds = self._bounds(self._next)
+            if bounds is None:
+                break
+            start, end = bounds
+            if end < 0:
+                # the subtask may continue until the next label or the end of the stream
+                break
+            completed.append(self._complete(self.text[start:end]))
+        return completed
+
+    def close(self) -> List[Tuple[int, str]]:
+        """
+        Completes the subtasks still open at the end of the stream.
+
+        Returns:
+            List[Tuple[int, str]]: The subtasks completed, as (index, text).
+
+        Raises:
+            ValueError: If a label is missing from the completion.
+        """
+        completed = []
+        while self._next < len(self.labels):
+            bounds = self._bounds(self._next)
+            if bounds is None:
+                raise ValueError(f"{self.labels[self._next]!r} not found in the completion: {self.text!r}")
+            start, end = bounds
+            completed.append(self._complete(self.text[start:end] if end >= 0 else self.text[start:]))
+        return completed
+
+    def _complete(self, subtask: str) -> Tuple[int, str]:
+        index = self._next
+        self.subtasks[index] = subtask.strip()
+        self._next += 1
+        return index, self.subtasks[index]
+
+
+class SubtaskPrefetcher:
+    """
+    Starts fetching the context of every subtask as soon as the streamed decomposition emits it.
+
+    Pass `start` as the `on_subtask` callback of the decomposition; the fetch (retrieval or web
+    search) then runs in the background while the model is still writing the next subtask, and
+    `result` returns its outcome. Empty subtasks are not fetched.
+
+    Attributes:
+        fetch (Callable[[str], object]): Fetches the context of a subtask.
+        counts (Dict[str, int]): Fetches started early and fetches done on demand.
+    """
+
+    def __init__(self, fetch: Callable[[str], object], empty: object = None, max_workers: int = 4):
+        """
+        Args:
+            fetch (Callable[[str], object]): Fetches the context of a subtask.
+            empty (object, optional): The context of an empty subtask. Defaults to None.
+            max_workers (int, optional): Fetches running at once. Defaults to 4.
+        """
+        self.fetch = fetch
+        self.empty = empty
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="subtask-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.counts = {"early": 0, "on_demand": 0}
+        self.overlap = 0.0
+
+    def start(self, index: int, subtask: str) -> None:
+        """
+        Starts fetching the context of a subtask in the background.
+
+        Args:
+            index (int): Position of the subtask in the decomposition (unused, for `on_subtask`).
+            subtask (str): The subtask.
+        """
+        if not subtask:
+            return
+        with self._lock:
+            if subtask not in self._futures:
+                self._futures[subtask] = self._executor.submit(self.fetch, subtask)
+                self._started[subtask] = time.monotonic()
+
+    def adopt(self, subtask: str, future: Future) -> None:
+        """
+        Uses a fetch started elsewhere, e.g. a speculative web search, as the fetch of a subtask.
+
+        Args:
+            subtask (str): The subtask.
+            future (Future): The running fetch; its result must have the type `fetch` returns.
+        """
+        with self._lock:
+            self._futures[subtask] = future
+            self._started[subtask] = time.monotonic()
+
+    def result(self, subtask: str):
+        """
+        Args:
+            subtask (str): The subtask.
+
+        Returns:
+            The context of the subtask, from the background fetch if one was started.
+
+        Raises:
+            Exception: Whatever the fetch raised.
+        """
+        if not subtask:
+            return self.empty
+        with self._lock:
+            future = self._futures.pop(subtask, None)
+            started = self._started.pop(subtask, None)
+        if future is None:
+            self.counts["on_demand"] += 1
+            return self.fetch(subtask)
+        self.counts["early"] += 1
+        # time the fetch ran before its result was asked for
+        self.overlap += time.monotonic() - started
+        return future.result()
+
+    def clear(self) -> None:
+        """
+        Drops the fetches whose result was never asked for, e.g. of the previous question.
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            self._started.clear()
+        for future in futures:
+            future.cancel()
+
+    def metrics(self) -> Dict:
+        """
+        Returns:
+            Dict: The fetches started early and on demand, and the mean seconds an early fetch ran
+            before its result was needed.
+        """
+        return {**self.counts, "mean_overlap": self.overlap / self.counts["early"] if self.counts["early"] else 0.0}
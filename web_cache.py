@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import pathway as pw
+
+
+# Every cache entry starts with this line, followed by one line of JSON metadata and the text
+MAGIC = b"%PATHWAY-WEB-CACHE v1\n"
+
+
+def encode_entry(text: str, metadata: Dict) -> bytes:
+    """
+    Serializes a cache entry.
+
+    Args:
+        text (str): The cached passages.
+        metadata (Dict): JSON-serializable metadata of the entry.
+
+    Returns:
+        bytes: The file contents.
+    """
+    return MAGIC + json.dumps(metadata).encode("utf-8") + b"\n" + text.encode("utf-8")
+
+
+def decode_entry(contents: bytes) -> Optional[Tuple[str, Dict]]:
+    """
+    Deserializes a cache entry.
+
+    Args:
+        contents (bytes): The file contents.
+
+    Returns:
+        Optional[Tuple[str, Dict]]: The text and metadata, or None if the contents are not a cache entry.
+    """
+    if not contents.startswith(MAGIC):
+        return None
+    header, _, text = contents[len(MAGIC):].partition(b"\n")
+    return text.decode("utf-8"), json.loads(header)
+
+
+class WebResultCache:
+    """
+    Writes web search results into a directory that Pathway reads as an extra document source.
+
+    Every searched subtask becomes one file holding its passages, the source and the fetch and
+    expiry times. Once indexed, later questions about the same topic are answered from the
+    local index and skip web search. Expired files are deleted by `purge_expired`, which makes
+    Pathway remove them from the index again.
+
+    Attributes:
+        path (str): Directory holding the cache entries.
+        ttl (float): Seconds a cache entry stays in the index.
+    """
+
+    def __init__(self, path: str = "./web_cache/", ttl: float = 24 * 3600):
+        """
+        Args:
+            path (str, optional): Directory holding the cache entries. Defaults to "./web_cache/".
+            ttl (float, optional): Seconds a cache entry stays in the index. Defaults to one day.
+        """
+        self.path = path
+        self.ttl = ttl
+        # entries are written next to the watched directory and moved in once complete
+        self._staging = os.path.normpath(path) + ".tmp"
+        os.makedirs(self.path, exist_ok=True)
+        os.makedirs(self._staging, exist_ok=True)
+        self._purger = None
+        self._stop = threading.Event()
+
+    def _filename(self, query: str) -> str:
+        key = " ".join(query.lower().split())
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".webcache"
+
+    def write(self, query: str, passages: List[str], source: Optional[Union[str, List[str]]] = None,
+              provider: Optional[str] = None) -> Optional[str]:
+        """
+        Stores the passages found for a query, replacing an earlier entry for the same query.
+
+        Args:
+            query (str): The searched subtask.
+            passages (List[str]): The context strings returned by the web search.
+            source (Optional[Union[str, List[str]]], optional): Where the passages come from: the URL or URLs of the pages.
+            provider (Optional[str], optional): The search provider that found them.
+
+        Returns:
+            Optional[str]: Path of the written file, or None if there was nothing to store.
+        """
+        passages = [passage for passage in passages if passage and passage.strip()]
+        if not query or not passages:
+            return None
+        fetched_at = time.time()
+        metadata = {
+            "query": query,
+            "source": source,
+            "provider": provider,
+            "fetched_at": int(fetched_at),
+            "expires_at": int(fetched_at + self.ttl),
+        }
+        filename = self._filename(query)
+        staged = os.path.join(self._staging, filename)
+        with open(staged, "wb") as f:
+            f.write(encode_entry("\n\n".join(passages), metadata))
+        target = os.path.join(self.path, filename)
+        os.replace(staged, target)
+        return target
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """
+        Deletes the expired cache entries.
+
+        Args:
+            now (Optional[float], optional): Current time as a UNIX timestamp. Defaults to `time.time()`.
+
+        Returns:
+            int: Number of deleted entries.
+        """
+        now = time.time() if now is None else now
+        purged = 0
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            try:
+                with open(path, "rb") as f:
+                    header = f.read(len(MAGIC)) + f.readline()
+                entry = decode_entry(header)
+                if entry is not None and entry[1]["expires_at"] <= now:
+                    os.remove(path)
+                    purged += 1
+            except (OSError, ValueError):
+                continue
+        return purged
+
+    def start_purger(self, interval: float = 300.0) -> None:
+        """
+        Purges expired entries every `interval` seconds in a daemon thread.
+
+        Args:
+            interval (float, optional): Seconds between two purges. Defaults to 300.
+        """
+        if self._purger is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.purge_expired()
+
+        self.purge_expired()
+        self._purger = threading.Thread(target=run, name="WebResultCachePurger", daemon=True)
+        self._purger.start()
+
+    def stop_purger(self) -> None:
+        self._stop.set()
+        self._purger = None
+
+
+class WebCacheParser(pw.UDF):
+    """
+    Parser that reads web cache entries directly and hands every other document to a fallback parser.
+
+    Web cache entries are returned as a single text with their metadata (query, source URLs,
+    provider, fetched_at, expires_at); entries that already expired but were not purged yet are skipped.
+    """
+
+    def __init__(self, fallback: Callable[[bytes], List[Tuple[str, Dict]]], **kwargs):
+        """
+        Args:
+            fallback (Callable[[bytes], List[Tuple[str, Dict]]]): Parser for all other documents, e.g. `parsers.OpenParse`.
+            **kwargs: Arguments forwarded to `pw.UDF`.
+        """
+        super().__init__(**kwargs)
+        self.fallback = fallback.func if isinstance(fallback, pw.UDF) else fallback
+
+    def __wrapped__(self, contents: bytes) -> list[tuple[str, dict]]:
+        entry = decode_entry(contents)
+        if entry is None:
+            return self.fallback(contents)
+        text, metadata = entry
+        if metadata["expires_at"] <= time.time():
+            return []
+        return [(text, metadata)]